@@ -8,6 +8,9 @@ warnings.filterwarnings("ignore")
 
 import base64
 import os
+import threading
+import time
+from collections import OrderedDict
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
@@ -25,13 +28,27 @@ except ModuleNotFoundError:
     st.stop()
 
 # Configuración
-from config import PAGE_TITLE, PAGE_ICON, LAYOUT, LEY_GARANTIAS_2026
+from config import (
+    PAGE_TITLE,
+    PAGE_ICON,
+    LAYOUT,
+    LEY_GARANTIAS_2026,
+    PERF_LOG_LEVEL,
+    FORECAST_STORE_ENABLED,
+    FORECAST_STORE_MAX_MB,
+    FORECAST_STORE_PATH,
+    FORECAST_PAGE_BUDGET,
+)
 
 # Utils
-from utils.data_loader import load_data, load_cutoff_date
-from utils.data_processor import normalize_dataframe
+from utils.data_loader import load_data_and_cutoff
+from utils.categorical import eq_mask
+from utils.filter_engine import FilterEngine, data_version
+from utils.periods import ensure_period_columns, period_key
+from utils.line_summary import build_line_summaries, summary_columns
 from utils.formatters import fmt_cop, badge_pct_html, badge_growth_html
 from utils.date_utils import business_days_left
+from utils.performance import configure_performance_logging
 from utils.distribution import (
     MONTH_ABBR,
     MONTH_HEADER,
@@ -42,6 +59,9 @@ from utils.distribution import (
 
 # Models
 from modelos.forecast_engine import ForecastEngine
+from modelos.forecast_store import ForecastStore
+from modelos.hierarchy import reconcile_bottom_up
+from modelos.mass_forecast import cell_training_series, cell_window_forecast, load_cell_forecasts
 from modelos.fianzas_adjuster import FianzasAdjuster
 from modelos.budget_2026 import Budget2026Generator
 
@@ -50,6 +70,8 @@ from componentes.sidebar import render_sidebar
 from componentes.tables import df_to_html
 from componentes.charts import render_forecast_chart
 
+configure_performance_logging(PERF_LOG_LEVEL)
+
 # ==================== CONSTANTS ====================
 # Indicadores visuales para el gráfico de ritmo comercial por sucursal
 _INDICADOR_BUEN_RITMO = "🐰⚡"   # cumplimiento_ritmo >= 90%
@@ -253,6 +275,7 @@ def _build_branch_heatmap_data(
     meses_quarter: list[int],
     ref_year: int,
     fecha_corte: pd.Timestamp,
+    cell_forecasts: dict | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Distribuye una métrica de línea hacia sucursal según el peso presupuestal.
 
@@ -261,6 +284,16 @@ def _build_branch_heatmap_data(
     ``PRESUPUESTO`` como ponderador. Devuelve el detalle ordenado por faltante
     total descendente y una segunda tabla lista para exportación con la fila
     ``TOTAL LÍNEA`` agregada al final.
+
+    Con ``cell_forecasts`` (celda -> pronóstico sin escalar del trabajo
+    masivo, o None si la celda no está guardada) la métrica Proyectado(-)
+    Pronóstico de una línea con todas sus celdas guardadas se calcula por
+    celda: presupuesto de la celda menos el pronóstico de la línea repartido
+    según el pronóstico de la celda en la ventana (real en los meses
+    cerrados). Con pesos iguales a los presupuestales el resultado es el del
+    reparto por presupuesto, y la suma por línea no cambia. El número de
+    líneas repartidas así queda en ``attrs['lineas_por_pronostico']`` del
+    detalle.
     """
     # ========== 1. OBTENER MÉTRICA TOTAL POR LÍNEA ==========
     df_res_sin_total = df_resumen.copy()
@@ -282,25 +315,28 @@ def _build_branch_heatmap_data(
     df_res_sin_total[metric_col] = pd.to_numeric(df_res_sin_total[metric_col], errors='coerce').fillna(0.0)
     
     # ✅ TOTAL POR LÍNEA (este es el valor que hay que distribuir)
-    metric_total_por_linea = df_res_sin_total.groupby('LINEA_PLUS', dropna=False)[metric_col].sum()
+    metric_total_por_linea = df_res_sin_total.groupby('LINEA_PLUS', dropna=False, observed=True)[metric_col].sum()
 
     # ========== 2. OBTENER PRESUPUESTO POR SUCURSAL × LÍNEA ==========
     if vista_mes == "Mes":
-        df_pres_suc = df_filtered[
-            (df_filtered['FECHA'] == periodo_actual) &
-            (df_filtered['FECHA'].dt.month.isin(meses_quarter))
-        ].groupby(['Suc_agrupada', 'LINEA_PLUS'], dropna=False)['PRESUPUESTO'].sum().reset_index()
+        df_ventana = df_filtered[
+            (df_filtered['PERIODO'] == period_key(periodo_actual)) &
+            (df_filtered['MES'].isin(meses_quarter))
+        ]
     elif vista_mes == "Año":
-        df_pres_suc = df_filtered[
-            (df_filtered['FECHA'].dt.year == ref_year) &
-            (df_filtered['FECHA'].dt.month.isin(meses_quarter))
-        ].groupby(['Suc_agrupada', 'LINEA_PLUS'], dropna=False)['PRESUPUESTO'].sum().reset_index()
+        df_ventana = df_filtered[
+            (df_filtered['ANIO'] == ref_year) &
+            (df_filtered['MES'].isin(meses_quarter))
+        ]
     else:
-        df_pres_suc = df_filtered[
-            (df_filtered['FECHA'].dt.year == ref_year) &
-            (df_filtered['FECHA'].dt.month <= fecha_corte.month) &
-            (df_filtered['FECHA'].dt.month.isin(meses_quarter))
-        ].groupby(['Suc_agrupada', 'LINEA_PLUS'], dropna=False)['PRESUPUESTO'].sum().reset_index()
+        df_ventana = df_filtered[
+            (df_filtered['ANIO'] == ref_year) &
+            (df_filtered['MES'] <= fecha_corte.month) &
+            (df_filtered['MES'].isin(meses_quarter))
+        ]
+    df_pres_suc = df_ventana.groupby(
+        ['Suc_agrupada', 'LINEA_PLUS'], dropna=False, observed=True
+    )['PRESUPUESTO'].sum().reset_index()
 
     if df_pres_suc.empty:
         return pd.DataFrame(), pd.DataFrame()
@@ -308,11 +344,13 @@ def _build_branch_heatmap_data(
     df_pres_suc['PRESUPUESTO'] = pd.to_numeric(df_pres_suc['PRESUPUESTO'], errors='coerce').fillna(0.0)
     
     # ✅ TOTAL DE PRESUPUESTO POR LÍNEA
-    pres_total_por_linea = df_pres_suc.groupby('LINEA_PLUS')['PRESUPUESTO'].sum()
+    pres_total_por_linea = df_pres_suc.groupby('LINEA_PLUS', observed=True)['PRESUPUESTO'].sum()
 
     # ========== 3. CALCULAR MÉTRICA PROPORCIONAL POR SUCURSAL (vectorizado) ==========
-    df_pres_suc['_presup_total'] = df_pres_suc['LINEA_PLUS'].map(pres_total_por_linea).fillna(0.0)
-    df_pres_suc['_metric_total'] = df_pres_suc['LINEA_PLUS'].map(metric_total_por_linea).fillna(0.0)
+    # astype(object): con LINEA_PLUS categórica, .map devolvería otra categórica
+    lineas_pres_suc = df_pres_suc['LINEA_PLUS'].astype(object)
+    df_pres_suc['_presup_total'] = lineas_pres_suc.map(pres_total_por_linea).fillna(0.0)
+    df_pres_suc['_metric_total'] = lineas_pres_suc.map(metric_total_por_linea).fillna(0.0)
 
     # ✅ DISTRIBUCIÓN PROPORCIONAL vectorizada
     df_pres_suc['metric_value'] = np.where(
@@ -321,6 +359,21 @@ def _build_branch_heatmap_data(
         0.0
     )
 
+    lineas_por_pronostico = 0
+    if cell_forecasts:
+        pronostico_celda = cell_window_forecast(df_ventana, df_pres_suc, cell_forecasts)
+        pronostico_total = pronostico_celda.groupby(lineas_pres_suc).transform('sum')
+        celda_faltante = pronostico_celda.isna().groupby(lineas_pres_suc).transform('any')
+        lineas_completas = ~celda_faltante & (pronostico_total > 0)
+        # Pronóstico implícito de la línea: presupuesto menos la métrica del resumen
+        pronostico_linea = df_pres_suc['_presup_total'] - df_pres_suc['_metric_total']
+        df_pres_suc['metric_value'] = np.where(
+            lineas_completas,
+            df_pres_suc['PRESUPUESTO'] - pronostico_linea * pronostico_celda / pronostico_total.where(lineas_completas, 1.0),
+            df_pres_suc['metric_value'],
+        )
+        lineas_por_pronostico = int(lineas_pres_suc[lineas_completas.to_numpy()].nunique())
+
     df_resultado = df_pres_suc[['Suc_agrupada', 'LINEA_PLUS', 'metric_value']].copy()
     df_pres_suc.drop(columns=['_presup_total', '_metric_total', 'metric_value'], inplace=True)
     
@@ -333,7 +386,8 @@ def _build_branch_heatmap_data(
         columns='LINEA_PLUS', 
         values='metric_value', 
         aggfunc='sum', 
-        fill_value=0
+        fill_value=0,
+        observed=True
     )
     
     if pivot_metric.empty:
@@ -354,6 +408,7 @@ def _build_branch_heatmap_data(
     pivot_metric_export = pd.concat(
         [pivot_metric_detalle, pd.DataFrame([totales_linea], index=['TOTAL LÍNEA'])]
     )
+    pivot_metric_detalle.attrs['lineas_por_pronostico'] = lineas_por_pronostico
     
     return pivot_metric_detalle, pivot_metric_export
 
@@ -373,19 +428,19 @@ def _build_faltante_heatmap_data(
 
     if vista_mes == "Mes":
         df_metric = df_filtered[
-            (df_filtered['FECHA'] == periodo_actual) &
-            (df_filtered['FECHA'].dt.month.isin(meses_quarter))
+            (df_filtered['PERIODO'] == period_key(periodo_actual)) &
+            (df_filtered['MES'].isin(meses_quarter))
         ].copy()
     elif vista_mes == "Año":
         df_metric = df_filtered[
-            (df_filtered['FECHA'].dt.year == ref_year) &
-            (df_filtered['FECHA'].dt.month.isin(meses_quarter))
+            (df_filtered['ANIO'] == ref_year) &
+            (df_filtered['MES'].isin(meses_quarter))
         ].copy()
     else:
         df_metric = df_filtered[
-            (df_filtered['FECHA'].dt.year == ref_year) &
-            (df_filtered['FECHA'].dt.month <= fecha_corte.month) &
-            (df_filtered['FECHA'].dt.month.isin(meses_quarter))
+            (df_filtered['ANIO'] == ref_year) &
+            (df_filtered['MES'] <= fecha_corte.month) &
+            (df_filtered['MES'].isin(meses_quarter))
         ].copy()
 
     if df_metric.empty:
@@ -396,7 +451,7 @@ def _build_faltante_heatmap_data(
 
     df_resultado = (
         df_metric
-        .groupby(['Suc_agrupada', 'LINEA_PLUS'], dropna=False)[['PRESUPUESTO', 'IMP_PRIMA']]
+        .groupby(['Suc_agrupada', 'LINEA_PLUS'], dropna=False, observed=True)[['PRESUPUESTO', 'IMP_PRIMA']]
         .sum()
         .reset_index()
     )
@@ -407,7 +462,8 @@ def _build_faltante_heatmap_data(
         columns='LINEA_PLUS',
         values='metric_value',
         aggfunc='sum',
-        fill_value=0
+        fill_value=0,
+        observed=True
     )
 
     if pivot_metric.empty:
@@ -477,6 +533,27 @@ def _distribution_cache_key(
     )
 
 
+_MAX_RESUMEN_CACHE = 8
+
+
+def _resumen_cache_key(
+    version: str,
+    fecha_corte: pd.Timestamp,
+    filters: dict,
+) -> tuple:
+    """Clave del resumen precalculado (todas las vistas y trimestres)."""
+    return (
+        version,
+        str(pd.Timestamp(fecha_corte).date()),
+        filters.get('linea_plus'),
+        tuple(filters.get('codigos') or []),
+        tuple(filters.get('sucursales') or []),
+        tuple(filters.get('suc_agrupadas') or []),
+        filters.get('anio_analisis'),
+        filters.get('conservative_factor'),
+    )
+
+
 def _apply_increment_pct_conditional_formatting(
     worksheet,
     df_distribution_export: pd.DataFrame,
@@ -546,6 +623,7 @@ def render_deficit_heatmap_fragment(
             meses_quarter=list(meses_quarter),
             ref_year=ref_year,
             fecha_corte=fecha_corte,
+            cell_forecasts=load_stored_cell_forecasts(df_filtered, ref_year, fecha_corte),
         )
 
         if pivot_deficit.empty:
@@ -564,6 +642,12 @@ def render_deficit_heatmap_fragment(
         )
         st.markdown(heatmap_html, unsafe_allow_html=True)
         st.caption("🔴 Rojo escarlata = valores positivos de Proyectado(-)Pronóstico (superávit frente al pronóstico) | ⬜ Blanco crema = cero o faltante | Los totales por línea se muestran antes del detalle por sucursal")
+        lineas_por_pronostico = pivot_deficit_detalle.attrs.get('lineas_por_pronostico', 0)
+        if lineas_por_pronostico:
+            st.caption(
+                f"📐 {lineas_por_pronostico} línea(s) repartidas según el pronóstico de cada sucursal "
+                "(pronóstico masivo); las demás según el peso presupuestal."
+            )
         return pivot_deficit
 
 
@@ -673,6 +757,49 @@ def render_monthly_distribution_fragment(
         return df_distribution, remaining_months
 
 
+@st.cache_resource(max_entries=2)
+def get_filter_engine(data_version: str, _df: pd.DataFrame) -> FilterEngine:
+    """Motor de filtros compartido entre reruns para una misma versión de datos."""
+    return FilterEngine(_df)
+
+
+@st.cache_resource
+def get_forecast_store() -> ForecastStore:
+    """Caché persistente de ajustes SARIMAX (sobrevive reinicios y se comparte entre workers)."""
+    return ForecastStore(
+        FORECAST_STORE_PATH,
+        max_bytes=int(FORECAST_STORE_MAX_MB * 1024 * 1024),
+        enabled=FORECAST_STORE_ENABLED,
+    )
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cell_training_series_cached(df_filtered: pd.DataFrame, ref_year: int,
+                                fecha_corte: pd.Timestamp) -> dict:
+    """Cache dedicado para las series de entrenamiento por Suc_agrupada × LINEA_PLUS."""
+    return cell_training_series(df_filtered, ref_year, fecha_corte)
+
+
+def load_stored_cell_forecasts(df_filtered: pd.DataFrame, ref_year: int,
+                               fecha_corte: pd.Timestamp) -> dict:
+    """Pronósticos por Suc_agrupada × LINEA_PLUS guardados por el trabajo masivo.
+
+    Solo lee el store (ver ``modelos.mass_forecast``): la sesión nunca ajusta
+    las celdas, y sin caché de la lectura aparecen las celdas que el trabajo
+    va guardando.
+
+    Returns:
+        Dict celda -> forecast_df sin escalar, o None si la celda no está
+        guardada o solo tiene un respaldo (su línea se reparte por peso
+        presupuestal); vacío si no hay ninguna
+    """
+    cells = cell_training_series_cached(df_filtered, ref_year, fecha_corte)
+    stored = load_cell_forecasts(cells, ForecastEngine(conservative_factor=1.0, store=get_forecast_store()))
+    if not stored:
+        return {}
+    return {cell: stored.get(cell) for cell in cells}
+
+
 @st.cache_resource
 def _img_to_b64(path: str) -> str:
     """Carga una imagen local y la retorna como string base64 para embeber en HTML/CSS."""
@@ -701,11 +828,12 @@ _BANNER_SDE_B64 = _img_to_b64("SDE_Primera_Pag.png")
 _LOGO_70_B64 = _img_to_b64("logo_70_anios.png")
 @st.cache_data(ttl=3600, show_spinner=False, max_entries=_DATA_CACHE_MAX_ENTRIES)
 def load_and_process_data():
-    """Carga y procesa datos con caché para reducir recargas y mejorar rendimiento."""
-    df_raw = load_data()
-    df_processed = normalize_dataframe(df_raw)
-    fecha_corte = load_cutoff_date()
-    return df_processed, fecha_corte
+    """Carga y procesa datos con caché para reducir recargas y mejorar rendimiento.
+
+    Devuelve el cubo pre-agregado (``utils.cube``): todas las vistas suman
+    IMP_PRIMA/PRESUPUESTO, así que no necesitan las filas crudas.
+    """
+    return load_data_and_cutoff(aggregate=True)
 
 
 @st.cache_data(ttl=3600)
@@ -724,21 +852,192 @@ def nowcast_cached(prod_parcial: float, fecha_corte: pd.Timestamp,
     proporcion_restante = dias_restantes / dias_totales
     return prod_parcial + pronostico_completo * proporcion_restante
 
-@st.cache_data(ttl=3600)
-def compute_line_forecast(serie_data: tuple, conservative_factor: float,
-                          ref_year: int, fecha_corte_str: str,
-                          steps: int = 1) -> dict:
-    """Calcula pronóstico para una línea específica (cacheado).
+# Horizonte máximo que pide la app (hasta diciembre desde enero): cada serie se
+# ajusta una sola vez a este horizonte y los horizontes cortos se recortan.
+LINE_FORECAST_HORIZON = 12
+
+# Límite (time.time()) para los ajustes de este rerun, fijado antes de las
+# pestañas según FORECAST_PAGE_BUDGET, y series que se quedaron con un modelo
+# rápido por tiempo (serie -> 'tiempo' | 'presupuesto')
+_page_deadline = None
+_page_degraded = {}
+
+
+def _page_over_budget() -> bool:
+    """True si algún ajuste de este rerun se quedó con el modelo rápido por presupuesto.
+
+    Esos pronósticos se reintentan en el siguiente rerun, así que lo que se
+    construya con ellos no debe entrar a cachés de sesión ni de datos.
+    """
+    return any(motivo == 'presupuesto' for motivo in _page_degraded.values())
+
+
+_FORECAST_MEMO_SIZE = 512
+
+
+@st.cache_resource
+def _forecast_memo() -> tuple:
+    """Ajustes sin escalar por (serie de entrenamiento, horizonte), compartidos entre sesiones.
+
+    Cada valor es (hist_df, forecast_df, accuracy_df, degradado).
+    """
+    return OrderedDict(), threading.Lock()
+
+
+def _forecast_lists(fc_df: pd.DataFrame) -> dict:
+    if fc_df.empty:
+        return {'fc_fechas': [], 'fc_valores': [], 'fc_ic_hi': [], 'fc_ic_lo': []}
+    return {
+        'fc_fechas': [str(d) for d in fc_df['FECHA']],
+        'fc_valores': list(fc_df['Pronostico_mensual']),
+        'fc_ic_hi': list(fc_df['IC_hi']) if 'IC_hi' in fc_df.columns else [],
+        'fc_ic_lo': list(fc_df['IC_lo']) if 'IC_lo' in fc_df.columns else [],
+    }
+
+
+def _fit_forecasts(train_batch: list, horizon: int = LINE_FORECAST_HORIZON,
+                   progress=None) -> list:
+    """Ajusta y pronostica un lote de series de entrenamiento ya limpias.
+
+    Es el único punto de la app que ajusta modelos. La llave de cada ajuste es
+    solo la serie de entrenamiento y el horizonte: durante el mes el corte
+    diario solo cambia el mes parcial, que no entra al entrenamiento, y el
+    factor conservador se aplica después sobre el pronóstico sin escalar, así
+    que ni el corte ni el slider ni otros widgets reajustan. Las series que
+    faltan en memoria se ajustan juntas con ``fit_many`` (que a su vez
+    consulta el caché persistente).
+
+    Los ajustes comparten el límite ``_page_deadline`` del rerun. Una serie
+    que lo agota recibe el mejor modelo rápido solo para este rerun (no entra
+    a la memoria) y se anota en ``_page_degraded``.
+
+    Returns:
+        Lista, en el orden de ``train_batch``, de (hist_df, forecast_df,
+        accuracy_df) sin escalar y compartidos: tratarlos como solo lectura
+    """
+    memo, lock = _forecast_memo()
+    with lock:
+        missing = list(dict.fromkeys(
+            train_data for train_data in train_batch if (train_data, horizon) not in memo
+        ))
+    local = {}
+    if missing:
+        engine = ForecastEngine(
+            conservative_factor=1.0, store=get_forecast_store(), deadline=_page_deadline
+        )
+        fitted = engine.fit_many(
+            {
+                train_data: pd.Series(list(train_data[1]), index=pd.to_datetime(list(train_data[0])), dtype=float)
+                for train_data in missing
+            },
+            steps=horizon,
+            progress=progress,
+        )
+        with lock:
+            for train_data, (hist_df, fc_df, _, accuracy_df) in fitted.items():
+                degraded = engine.degraded.get(train_data)
+                if degraded == 'presupuesto':
+                    local[train_data] = (hist_df, fc_df, accuracy_df, degraded)
+                else:
+                    memo[(train_data, horizon)] = (hist_df, fc_df, accuracy_df, degraded)
+            while len(memo) > _FORECAST_MEMO_SIZE:
+                memo.popitem(last=False)
+    results = []
+    with lock:
+        for train_data in train_batch:
+            if train_data in local:
+                hist_df, fc_df, accuracy_df, degraded = local[train_data]
+            else:
+                memo.move_to_end((train_data, horizon))
+                hist_df, fc_df, accuracy_df, degraded = memo[(train_data, horizon)]
+            if degraded:
+                _page_degraded[train_data] = degraded
+            results.append((hist_df, fc_df, accuracy_df))
+    return results
+
+
+def compute_series_forecast(serie_train: pd.Series, steps: int,
+                            conservative_factor: float) -> tuple:
+    """Pronóstico de una serie de entrenamiento ya limpia, a través del caché de ajustes.
+
+    Equivale a ``ForecastEngine(conservative_factor).fit_forecast(serie_train,
+    steps)``: el ajuste se hace a ``LINE_FORECAST_HORIZON`` pasos (compartido
+    con los pronósticos por línea), se recorta a ``steps`` y se escala.
+
+    Returns:
+        Tuple de (hist_df, forecast_df, smape_validation, accuracy_df)
+    """
+    steps = max(1, steps)
+    hist_df, fc_df, accuracy_df = _fit_forecasts(
+        [serialize_series_for_cache(serie_train)],
+        horizon=max(steps, LINE_FORECAST_HORIZON),
+    )[0]
+    engine = ForecastEngine(conservative_factor=conservative_factor)
+    fc_df, smape, accuracy_df = engine.scale_forecast(hist_df, fc_df.iloc[:steps], accuracy_df)
+    return hist_df.copy(), fc_df, smape, accuracy_df
+
+
+def compute_bottom_up_forecast(serie_train: pd.Series, series_hojas: list, steps: int,
+                               conservative_factor: float, ref_year: int,
+                               fecha_corte_str: str) -> tuple:
+    """Pronóstico de un nodo padre (consolidado) como suma de sus hojas (líneas).
+
+    Cada hoja se limpia y separa del mes parcial como en
+    ``compute_line_forecasts`` y se ajusta con el mismo caché, así que el
+    padre no ajusta ningún modelo propio: reutiliza los ajustes del resumen
+    por línea y del selector. Ver ``modelos.hierarchy.reconcile_bottom_up``.
 
     Args:
-        serie_data: tuple de (fechas_iso, valores) para permitir hash
+        serie_train: Serie de entrenamiento del padre ya limpia
+        series_hojas: Series mensuales crudas de cada hoja
+        steps: Meses a pronosticar
         conservative_factor: factor de ajuste conservador
         ref_year: año de referencia
-        fecha_corte_str: fecha de corte como string ISO para hash
+        fecha_corte_str: fecha de corte como string ISO
+
+    Returns:
+        Tuple de (hist_df, forecast_df, smape_validation, accuracy_df)
+    """
+    steps = max(1, steps)
+    engine = ForecastEngine(conservative_factor=conservative_factor)
+    fecha_corte_ts = pd.Timestamp(fecha_corte_str)
+    trains = []
+    for serie in series_hojas:
+        serie_clean = engine.sanitize_series(serie, ref_year)
+        serie_hoja, _, _ = engine.split_series_exclude_partial(serie_clean, ref_year, fecha_corte_ts)
+        if not serie_hoja.empty:
+            trains.append(serialize_series_for_cache(serie_hoja))
+    if serie_train.empty or not trains:
+        return compute_series_forecast(serie_train, steps, conservative_factor)
+
+    leaf_fits = _fit_forecasts(trains, horizon=max(steps, LINE_FORECAST_HORIZON))
+    hist_df, fc_df, accuracy_df = reconcile_bottom_up(serie_train, leaf_fits, steps)
+    fc_df, smape, accuracy_df = engine.scale_forecast(hist_df, fc_df, accuracy_df)
+    return hist_df, fc_df, smape, accuracy_df
+
+
+def compute_line_forecasts(series_batch: list, conservative_factor: float,
+                           ref_year: int, fecha_corte_str: str,
+                           steps: int = 1, progress=None) -> list:
+    """Calcula el pronóstico de un lote de series (líneas o sucursales).
+
+    La limpieza y la separación del mes parcial se hacen en cada llamada (son
+    baratas); los ajustes SARIMAX se hacen en un solo lote y se guardan sin
+    escalar por serie de entrenamiento a ``LINE_FORECAST_HORIZON`` pasos,
+    ``steps`` solo recorta ese resultado (los primeros pasos de un pronóstico
+    largo son iguales a los de uno corto) y ``conservative_factor`` lo
+    multiplica al final.
+
+    Args:
+        series_batch: Lista de tuples (fechas_iso, valores)
+        conservative_factor: factor de ajuste conservador
+        ref_year: año de referencia
+        fecha_corte_str: fecha de corte como string ISO
         steps: número de pasos a pronosticar
+        progress: callback (series_listas, total) mientras se ajusta el lote
 
     Returns:
-        dict con las claves:
+        Lista, en el orden de ``series_batch``, de dicts con las claves:
             fc_fechas (list[str]): fechas ISO del pronóstico
             fc_valores (list[float]): valores de Pronostico_mensual
             fc_ic_hi (list[float]): límite superior IC 95% (vacío si no disponible)
@@ -746,26 +1045,44 @@ def compute_line_forecast(serie_data: tuple, conservative_factor: float,
             is_partial (bool): True si el mes actual es parcial
             cur_month_str (str | None): mes actual como string ISO, o None
     """
-    fechas, valores = serie_data
-    serie = pd.Series(list(valores), index=pd.to_datetime(list(fechas)))
+    steps = max(1, steps)
     engine = ForecastEngine(conservative_factor=conservative_factor)
     fecha_corte_ts = pd.Timestamp(fecha_corte_str)
-    serie_clean = engine.sanitize_series(serie, ref_year)
-    serie_train, cur_month, is_partial = engine.split_series_exclude_partial(
-        serie_clean, ref_year, fecha_corte_ts
+    splits = []
+    for fechas, valores in series_batch:
+        serie = pd.Series(list(valores), index=pd.to_datetime(list(fechas)))
+        serie_clean = engine.sanitize_series(serie, ref_year)
+        splits.append(engine.split_series_exclude_partial(serie_clean, ref_year, fecha_corte_ts))
+
+    fits = _fit_forecasts(
+        [serialize_series_for_cache(serie_train) for serie_train, _, _ in splits],
+        horizon=max(steps, LINE_FORECAST_HORIZON),
+        progress=progress,
     )
-    _, fc_df, _, _ = engine.fit_forecast(serie_train, steps=steps)
-    if fc_df.empty:
-        return {'fc_fechas': [], 'fc_valores': [], 'fc_ic_hi': [], 'fc_ic_lo': [],
-                'is_partial': is_partial, 'cur_month_str': None}
-    return {
-        'fc_fechas': [str(d) for d in fc_df['FECHA']],
-        'fc_valores': list(fc_df['Pronostico_mensual']),
-        'fc_ic_hi': list(fc_df['IC_hi']) if 'IC_hi' in fc_df.columns else [],
-        'fc_ic_lo': list(fc_df['IC_lo']) if 'IC_lo' in fc_df.columns else [],
-        'is_partial': is_partial,
-        'cur_month_str': str(cur_month) if cur_month is not None else None,
-    }
+    results = []
+    for (_, cur_month, is_partial), (_, fc_df, _) in zip(splits, fits):
+        full = _forecast_lists(fc_df)
+        result = {'fc_fechas': full['fc_fechas'][:steps]}
+        for key in ('fc_valores', 'fc_ic_hi', 'fc_ic_lo'):
+            result[key] = (np.asarray(full[key][:steps], dtype=float) * conservative_factor).tolist()
+        result['is_partial'] = is_partial
+        result['cur_month_str'] = (
+            str(cur_month) if cur_month is not None and full['fc_fechas'] else None
+        )
+        results.append(result)
+    return results
+
+
+def compute_line_forecast(serie_data: tuple, conservative_factor: float,
+                          ref_year: int, fecha_corte_str: str,
+                          steps: int = 1) -> dict:
+    """Calcula pronóstico para una línea específica (lote de una serie).
+
+    Ver ``compute_line_forecasts`` para los argumentos y el resultado.
+    """
+    return compute_line_forecasts(
+        [serie_data], conservative_factor, ref_year, fecha_corte_str, steps=steps
+    )[0]
 
 
 def serialize_series_for_cache(serie: pd.Series) -> tuple:
@@ -869,7 +1186,7 @@ def _compute_single_line_detailed_forecast(
         and not forecast_df.empty
         and forecast_df.iloc[0]['FECHA'] == current_month
     ):
-        prod_mes_actual = df_linea[df_linea['FECHA'] == current_month]['IMP_PRIMA'].sum()
+        prod_mes_actual = df_linea[df_linea['PERIODO'] == period_key(current_month)]['IMP_PRIMA'].sum()
         forecast_full = float(forecast_df.iloc[0]['Pronostico_mensual'])
         nowcast_value = nowcast_cached(prod_mes_actual, fecha_corte, forecast_full)
         delta = nowcast_value - forecast_full
@@ -899,18 +1216,54 @@ def _serialize_dataframe_for_cache(df: pd.DataFrame) -> tuple:
     return (df.to_dict('records'), list(df.columns))
 
 
-@st.cache_data(ttl=_DETAILED_FORECAST_CACHE_TTL_SECONDS, show_spinner=False)
 def build_detailed_forecast(
     df_scope_hash: tuple,
     linea_seleccionada: str,
     conservative_factor: float,
     ref_year: int,
     fecha_corte_str: str,
+) -> pd.DataFrame:
+    """Pronóstico detallado (mensual y acumulado) de una línea o de todas.
+
+    Pasa por ``st.cache_data`` salvo cuando la página ya agotó su presupuesto
+    de ajustes: si el cálculo usa modelos rápidos por presupuesto, se descarta
+    su entrada (solo esa; el caché es de todas las sesiones) para que el
+    siguiente rerun la reconstruya con los ajustes completos.
+    """
+    args = (df_scope_hash, linea_seleccionada, conservative_factor, ref_year, fecha_corte_str)
+    if _page_over_budget():
+        return _build_detailed_forecast(*args)
+    forecast_df = _build_detailed_forecast_cached(*args)
+    if _page_over_budget():
+        _build_detailed_forecast_cached.clear(*args)
+    return forecast_df
+
+
+@st.cache_data(ttl=_DETAILED_FORECAST_CACHE_TTL_SECONDS, show_spinner=False)
+def _build_detailed_forecast_cached(
+    df_scope_hash: tuple,
+    linea_seleccionada: str,
+    conservative_factor: float,
+    ref_year: int,
+    fecha_corte_str: str,
+) -> pd.DataFrame:
+    return _build_detailed_forecast(
+        df_scope_hash, linea_seleccionada, conservative_factor, ref_year, fecha_corte_str
+    )
+
+
+def _build_detailed_forecast(
+    df_scope_hash: tuple,
+    linea_seleccionada: str,
+    conservative_factor: float,
+    ref_year: int,
+    fecha_corte_str: str,
 ) -> pd.DataFrame:
     df_scope = pd.DataFrame(df_scope_hash[0], columns=df_scope_hash[1])
     # Al reconstruir desde records, FECHA puede regresar como string/objeto.
     if 'FECHA' in df_scope.columns and not pd.api.types.is_datetime64_any_dtype(df_scope['FECHA']):
         df_scope['FECHA'] = pd.to_datetime(df_scope['FECHA'], errors='coerce')
+    df_scope = ensure_period_columns(df_scope)
     fecha_corte = pd.Timestamp(fecha_corte_str)
 
     if df_scope.empty or 'LINEA_PLUS' not in df_scope.columns:
@@ -919,8 +1272,19 @@ def build_detailed_forecast(
     if linea_seleccionada == "TODAS":
         forecast_frames = []
         lineas_scope = sorted(df_scope['LINEA_PLUS'].dropna().unique())
-        for linea in lineas_scope:
-            df_linea = df_scope[df_scope['LINEA_PLUS'] == linea]
+        df_lineas = {linea: df_scope[eq_mask(df_scope['LINEA_PLUS'], linea)] for linea in lineas_scope}
+        # Un solo lote de ajustes para todas las líneas; cada línea luego recorta
+        compute_line_forecasts(
+            [
+                serialize_series_for_cache(df_linea.groupby('FECHA')['IMP_PRIMA'].sum().sort_index())
+                for df_linea in df_lineas.values()
+                if not df_linea.empty
+            ],
+            conservative_factor,
+            ref_year,
+            fecha_corte_str,
+        )
+        for linea, df_linea in df_lineas.items():
             fc_linea = _compute_single_line_detailed_forecast(
                 df_linea, linea, conservative_factor, ref_year, fecha_corte
             )
@@ -935,7 +1299,7 @@ def build_detailed_forecast(
             forecast_df.groupby('FECHA', as_index=False)[['Pronostico_mensual', 'IC_lo', 'IC_hi']].sum()
         )
     else:
-        df_linea = df_scope[df_scope['LINEA_PLUS'] == linea_seleccionada]
+        df_linea = df_scope[eq_mask(df_scope['LINEA_PLUS'], linea_seleccionada)]
         forecast_df = _compute_single_line_detailed_forecast(
             df_linea, linea_seleccionada, conservative_factor, ref_year, fecha_corte
         )
@@ -1161,27 +1525,25 @@ filters = render_sidebar(df, fecha_corte)
 
 if 'distribucion_cache' not in st.session_state:
     st.session_state.distribucion_cache = {}
+if 'resumen_cache' not in st.session_state:
+    st.session_state.resumen_cache = {}
 
 # ==================== APPLY FILTERS ====================
-df_filtered = df.copy()
-
-if filters['linea_plus'] != "TODAS" and 'LINEA_PLUS' in df_filtered.columns:
-    df_filtered = df_filtered[df_filtered['LINEA_PLUS'] == filters['linea_plus']]
-
-# Filtrar por Código (si columna existe y hay selección)
-if filters.get('codigos') and 'CODIGO' in df_filtered.columns:
-    df_filtered = df_filtered[df_filtered['CODIGO'].isin(filters['codigos'])]
-
-# Filtrar por Sucursal (si columna existe y hay selección)
-if filters.get('sucursales') and 'SUCURSAL' in df_filtered.columns:
-    df_filtered = df_filtered[df_filtered['SUCURSAL'].isin(filters['sucursales'])]
-
-# Filtrar por Sucursal Agrupada (si columna existe y hay selección)
-if filters.get('suc_agrupadas') and 'Suc_agrupada' in df_filtered.columns:
-    df_filtered = df_filtered[df_filtered['Suc_agrupada'].isin(filters['suc_agrupadas'])]
+# Índices por dimensión (una vez por versión de datos): cada clic del sidebar
+# intersecta posiciones en lugar de copiar el DataFrame completo.
+filter_engine = get_filter_engine(data_version(df), df)
+active_filters = dict(
+    linea_plus=None if filters['linea_plus'] == "TODAS" else filters['linea_plus'],
+    codigos=filters.get('codigos') or (),
+    sucursales=filters.get('sucursales') or (),
+    suc_agrupadas=filters.get('suc_agrupadas') or (),
+    anio_max=filters['anio_analisis'],
+)
+df_filtered = filter_engine.filter(**active_filters)
 
-# Filtrar por año de análisis
-df_filtered = df_filtered[df_filtered['FECHA'].dt.year <= filters['anio_analisis']]
+# Presupuesto de ajuste de este rerun (0 = sin límite)
+if FORECAST_PAGE_BUDGET > 0:
+    _page_deadline = time.time() + FORECAST_PAGE_BUDGET
 
 # ==================== TABS ====================
 tabs = st.tabs(["🏠 Presentación", "📈 Primas", "🏛️ FIANZAS"])
@@ -1367,8 +1729,8 @@ with tabs[1]:
     # Periodo actual (mes de la fecha de corte)
     periodo_actual = pd.Timestamp(year=fecha_corte.year, month=fecha_corte.month, day=1)
     
-    # Filtrar datos hasta el periodo actual (usar df_filtered para respetar filtros de Sucursal/Código)
-    df_periodo = df_filtered[df_filtered['FECHA'] <= periodo_actual].copy()
+    # Filtrar datos hasta el periodo actual (mismos filtros de Sucursal/Código que df_filtered)
+    df_periodo = filter_engine.filter(**active_filters, periodo_max=period_key(periodo_actual))
     
     # Generar pronóstico consolidado
     serie_prima = df_filtered.groupby('FECHA')['IMP_PRIMA'].sum().sort_index()
@@ -1387,281 +1749,74 @@ with tabs[1]:
     steps = max(1, 12 - last_month)
     
     with st.spinner("Generando pronóstico..."):
-        hist_df, fc_df, smape, accuracy_df = engine.fit_forecast(serie_train, steps=steps)
-    
-    # Crear tabla de resumen
-    resumen_lineas = []
-    if vista_mes == "Año":
-        previo_col = f"Previo {ref_year - 1} Año"
-        actual_col = f"Actual {ref_year} Año"
-    elif vista_mes == "Mes":
-        previo_col = f"Previo {ref_year - 1} Mes"
-        actual_col = f"Actual {ref_year} Mes"
-    else:
-        previo_col = f"Previo {ref_year - 1} Acumulado Mes"
-        actual_col = f"Actual {ref_year} Acumulado Mes"
-
-    faltante_col = "Faltante proyectado"
-    proyectado_vs_pronostico_col = "Proyectado(-)Pronóstico"
-    compensacion_col = "Compensación de faltante"
-    req_dia_fc_col = "Req x día Fc (días calendario)"
-    req_dia_pres_col = "Req x día Pres (días calendario)"
-    
-    for linea in lineas_disponibles:
-        df_linea = df_periodo[df_periodo['LINEA_PLUS'] == linea]
-        
-        if df_linea.empty:
-            continue
-        
-        # ========== VISTA: MES ==========
-        if vista_mes == "Mes":
-            # Aplicar filtro de Quarter: solo incluir si el mes actual está en el Q seleccionado
-            if fecha_corte.month not in meses_quarter:
-                continue
-
-            mes_mismo_anio_previo = pd.Timestamp(year=ref_year - 1, month=fecha_corte.month, day=1)
-            prod_mes_previo = df_linea[df_linea['FECHA'] == mes_mismo_anio_previo]['IMP_PRIMA'].sum()
-            prod_mes_actual = df_linea[df_linea['FECHA'] == periodo_actual]['IMP_PRIMA'].sum()
-            presup_mes = df_linea[df_linea['FECHA'] == periodo_actual]['PRESUPUESTO'].sum() if 'PRESUPUESTO' in df_linea.columns else 0.0
-
-            serie_linea = df_linea.groupby('FECHA')['IMP_PRIMA'].sum().sort_index()
-            fc_result = compute_line_forecast(
-                serialize_series_for_cache(serie_linea),
-                filters['conservative_factor'],
-                fecha_corte.year,
-                str(fecha_corte.date()),
-                steps=1
-            )
-            pronostico_mes_full = fc_result['fc_valores'][0] if fc_result['fc_valores'] else 0.0
-            is_partial_temp = fc_result['is_partial']
-
-            pronostico_mes_full = pronostico_mes_full * _line_adjustment_factor(linea)
-
-            # Nowcast: ajuste dinámico usando producción parcial + proporción restante del pronóstico
-            if is_partial_temp:
-                pronostico_mes = nowcast_cached(prod_mes_actual, fecha_corte, pronostico_mes_full)
-            else:
-                pronostico_mes = pronostico_mes_full
-
-            faltante_mes = presup_mes - prod_mes_actual
-            pct_ejec_mes = (prod_mes_actual / presup_mes * 100) if presup_mes > 0 else 0.0
-            pronostico_ejec_pct = (pronostico_mes / presup_mes * 100) if presup_mes > 0 else 0.0
-            proyectado_vs_pronostico = presup_mes - pronostico_mes
-            compensacion_faltante = (proyectado_vs_pronostico / presup_mes * 100) if presup_mes > 0 else 0.0
-            crec_fc_pct = ((pronostico_mes / prod_mes_previo) - 1) * 100 if prod_mes_previo > 0 else 0.0
-
-            ultimo_dia_mes = periodo_actual + pd.offsets.MonthEnd(0)
-            fecha_corte_dia = pd.Timestamp(fecha_corte).normalize()
-            dias_restantes = max((ultimo_dia_mes.normalize() - fecha_corte_dia).days + 1, 0)
-            req_dia_fc = (pronostico_mes - prod_mes_actual) / dias_restantes if dias_restantes > 0 else 0.0
-            req_dia_pres = (presup_mes - prod_mes_actual) / dias_restantes if dias_restantes > 0 else 0.0
-
-            resumen_lineas.append({
-                'LINEA_PLUS': linea,
-                previo_col: prod_mes_previo,
-                actual_col: prod_mes_actual,
-                'Proyectado': presup_mes,
-                faltante_col: faltante_mes,
-                '% Ejec.': pct_ejec_mes,
-                'Pronóstico (mes)': pronostico_mes,
-                'Crec. Fc (%)': crec_fc_pct,
-                'Pronóstico ejecución': pronostico_ejec_pct,
-                proyectado_vs_pronostico_col: proyectado_vs_pronostico,
-                compensacion_col: compensacion_faltante,
-                req_dia_fc_col: req_dia_fc,
-                req_dia_pres_col: req_dia_pres
-            })
-
-        # ========== VISTA: AÑO ==========
-        elif vista_mes == "Año":
-            # Producción año anterior completo (filtrada por Quarter si aplica)
-            prod_anio_previo = df_linea[
-                (df_linea['FECHA'].dt.year == (ref_year - 1)) &
-                (df_linea['FECHA'].dt.month.isin(meses_quarter))
-            ]['IMP_PRIMA'].sum()
-
-            # Producción YTD: solo meses COMPLETADOS en el año actual (dentro del Quarter)
-            prod_ytd_actual = df_linea[
-                (df_linea['FECHA'].dt.year == ref_year) &
-                (df_linea['FECHA'].dt.month < fecha_corte.month) &
-                (df_linea['FECHA'].dt.month.isin(meses_quarter))
-            ]['IMP_PRIMA'].sum()
-
-            # Producción parcial del mes actual (si está en el Quarter)
-            prod_parcial_mes = (
-                df_linea[df_linea['FECHA'] == periodo_actual]['IMP_PRIMA'].sum()
-                if fecha_corte.month in meses_quarter else 0.0
-            )
-
-            # Presupuesto anual: usar df_filtered (no df_periodo) para incluir todos los meses del año
-            df_linea_full = df_filtered[df_filtered['LINEA_PLUS'] == linea]
-            presup_anual = df_linea_full[
-                (df_linea_full['FECHA'].dt.year == ref_year) &
-                (df_linea_full['FECHA'].dt.month.isin(meses_quarter))
-            ]['PRESUPUESTO'].sum() if 'PRESUPUESTO' in df_linea_full.columns else 0.0
-
-            serie_linea = df_linea.groupby('FECHA')['IMP_PRIMA'].sum().sort_index()
-            engine_temp = ForecastEngine(conservative_factor=filters['conservative_factor'])
-            serie_clean_temp = engine_temp.sanitize_series(serie_linea, ref_year)
-            serie_train_temp, cur_month_temp, is_partial_temp = engine_temp.split_series_exclude_partial(
-                serie_clean_temp, ref_year, fecha_corte
-            )
-
-            # Calcular steps correctos: meses restantes del año a partir del mes actual
-            # last_month_temp = 0 cuando el mes parcial es enero (no hay meses completados)
-            if is_partial_temp and cur_month_temp:
-                last_month_temp = max(0, cur_month_temp.month - 1)
-            else:
-                last_month_temp = (
-                    serie_train_temp.index.max().month
-                    if not serie_train_temp.empty
-                    else fecha_corte.month
-                )
-            steps_temp = max(1, 12 - last_month_temp)
-
-            fc_result_anio = compute_line_forecast(
-                serialize_series_for_cache(serie_linea),
+        if filters['linea_plus'] == "TODAS":
+            # Consolidado bottom-up: suma de los ajustes por línea
+            prima_lineas = df_filtered.groupby(['LINEA_PLUS', 'FECHA'], observed=True)['IMP_PRIMA'].sum()
+            hist_df, fc_df, smape, accuracy_df = compute_bottom_up_forecast(
+                serie_train,
+                [serie.droplevel(0).sort_index() for _, serie in prima_lineas.groupby(level=0, observed=True)],
+                steps,
                 filters['conservative_factor'],
                 ref_year,
                 str(fecha_corte.date()),
-                steps=steps_temp
             )
-
-            if fc_result_anio['fc_fechas']:
-                fc_fechas_ts = pd.to_datetime(fc_result_anio['fc_fechas'])
-                fc_valores_list = fc_result_anio['fc_valores']
-
-                fc_valores_list = [v * _line_adjustment_factor(linea) for v in fc_valores_list]
-
-                is_partial_temp = fc_result_anio['is_partial']
-
-                if is_partial_temp and fecha_corte.month in meses_quarter and fc_valores_list:
-                    pronostico_mes_full_anio = fc_valores_list[0]
-                    nowcast_mes = nowcast_cached(prod_parcial_mes, fecha_corte, pronostico_mes_full_anio)
-                    pronostico_restante = sum(
-                        v for d, v in zip(fc_fechas_ts[1:], fc_valores_list[1:])
-                        if d.month in meses_quarter
-                    )
-                else:
-                    nowcast_mes = prod_parcial_mes
-                    pronostico_restante = sum(
-                        v for d, v in zip(fc_fechas_ts, fc_valores_list)
-                        if d.month in meses_quarter
-                    )
-            else:
-                nowcast_mes = prod_parcial_mes
-                pronostico_restante = 0.0
-                is_partial_temp = False
-
-            cierre_estimado = prod_ytd_actual + nowcast_mes + pronostico_restante
-            faltante_anual = presup_anual - prod_ytd_actual
-            pct_ejec_anual = (
-                (prod_ytd_actual + prod_parcial_mes) / presup_anual * 100
-            ) if presup_anual > 0 else 0.0
-            if presup_anual <= 0:
-                pronostico_ejec_pct = 0.0
-            else:
-                pronostico_ejec_pct = (cierre_estimado / presup_anual) * 100
-            proyectado_vs_pronostico = presup_anual - cierre_estimado
-            compensacion_faltante = (proyectado_vs_pronostico / presup_anual * 100) if presup_anual > 0 else 0.0
-            crec_fc_pct = ((cierre_estimado / prod_anio_previo) - 1) * 100 if prod_anio_previo > 0 else 0.0
-
-            resumen_lineas.append({
-                'LINEA_PLUS': linea,
-                previo_col: prod_anio_previo,
-                actual_col: prod_ytd_actual,
-                'Proyectado (anual)': presup_anual,
-                faltante_col: faltante_anual,
-                '% Ejec.': pct_ejec_anual,
-                'Pronóstico (cierre)': cierre_estimado,
-                'Crec. Fc (%)': crec_fc_pct,
-                'Pronóstico ejecución': pronostico_ejec_pct,
-                proyectado_vs_pronostico_col: proyectado_vs_pronostico,
-                compensacion_col: compensacion_faltante
-            })
-
-        # ========== VISTA: ACUMULADO MES ==========
         else:
-            prod_ytd_previo = df_linea[
-                (df_linea['FECHA'].dt.year == (ref_year - 1)) &
-                (df_linea['FECHA'].dt.month <= fecha_corte.month) &
-                (df_linea['FECHA'].dt.month.isin(meses_quarter))
-            ]['IMP_PRIMA'].sum()
-
-            prod_ytd_actual = df_linea[
-                (df_linea['FECHA'].dt.year == ref_year) &
-                (df_linea['FECHA'].dt.month <= fecha_corte.month) &
-                (df_linea['FECHA'].dt.month.isin(meses_quarter))
-            ]['IMP_PRIMA'].sum()
-
-            presup_ytd = df_linea[
-                (df_linea['FECHA'].dt.year == ref_year) &
-                (df_linea['FECHA'].dt.month <= fecha_corte.month) &
-                (df_linea['FECHA'].dt.month.isin(meses_quarter))
-            ]['PRESUPUESTO'].sum() if 'PRESUPUESTO' in df_linea.columns else 0.0
-            
-            serie_linea = df_linea.groupby('FECHA')['IMP_PRIMA'].sum().sort_index()
-            fc_result_acum = compute_line_forecast(
-                serialize_series_for_cache(serie_linea),
-                filters['conservative_factor'],
-                ref_year,
-                str(fecha_corte.date()),
-                steps=1
+            hist_df, fc_df, smape, accuracy_df = compute_series_forecast(
+                serie_train, steps, filters['conservative_factor']
             )
-            pronostico_mes_full = fc_result_acum['fc_valores'][0] if fc_result_acum['fc_valores'] else 0.0
-            is_partial_temp = fc_result_acum['is_partial']
-
-            pronostico_mes_full = pronostico_mes_full * _line_adjustment_factor(linea)
-
-            prod_meses_cerrados= df_linea[
-                (df_linea['FECHA'].dt.year == ref_year) &
-                (df_linea['FECHA'].dt.month < fecha_corte.month) &
-                (df_linea['FECHA'].dt.month.isin(meses_quarter))
-            ]['IMP_PRIMA'].sum()
-
-            # Nowcast para el mes actual parcial
-            prod_parcial_mes = df_linea[df_linea['FECHA'] == periodo_actual]['IMP_PRIMA'].sum()
-            if is_partial_temp and fecha_corte.month in meses_quarter:
-                pronostico_mes_actual = nowcast_cached(prod_parcial_mes, fecha_corte, pronostico_mes_full)
-            else:
-                pronostico_mes_actual = pronostico_mes_full if fecha_corte.month in meses_quarter else 0.0
-
-            ytd_con_forecast = prod_meses_cerrados + pronostico_mes_actual
-            faltante_ytd = presup_ytd - prod_ytd_actual
-            pct_ejec_ytd = (prod_ytd_actual / presup_ytd * 100) if presup_ytd > 0 else 0.0
-            pronostico_ejec_pct = (ytd_con_forecast / presup_ytd * 100) if presup_ytd > 0 else 0.0
-            proyectado_vs_pronostico = presup_ytd - ytd_con_forecast
-            compensacion_faltante = (proyectado_vs_pronostico / presup_ytd * 100) if presup_ytd > 0 else 0.0
-            crec_fc_pct = ((ytd_con_forecast / prod_ytd_previo) - 1) * 100 if prod_ytd_previo > 0 else 0.0
-             
-            resumen_lineas.append({
-                'LINEA_PLUS': linea,
-                previo_col: prod_ytd_previo,
-                actual_col: prod_ytd_actual,
-                'Proyectado (YTD)': presup_ytd,
-                faltante_col: faltante_ytd,
-                '% Ejec.': pct_ejec_ytd,
-                'Pronóstico (YTD + mes)': ytd_con_forecast,
-                'Crec. Fc (%)': crec_fc_pct,
-                'Pronóstico ejecución': pronostico_ejec_pct,
-                proyectado_vs_pronostico_col: proyectado_vs_pronostico,
-                compensacion_col: compensacion_faltante
-            })
     
-    df_resumen = pd.DataFrame(resumen_lineas)
+    # Crear tabla de resumen
+    resumen_cols = summary_columns(vista_mes, ref_year)
+    previo_col = resumen_cols['previo']
+    actual_col = resumen_cols['actual']
+    faltante_col = resumen_cols['faltante']
+    proyectado_vs_pronostico_col = resumen_cols['proyectado_vs_pronostico']
+    compensacion_col = resumen_cols['compensacion']
+
+    def _resumen_line_forecasts(series_by_line: dict, fc_ref_year: int, fc_steps: int) -> dict:
+        lineas_lote = list(series_by_line)
+        fc_results = compute_line_forecasts(
+            [serialize_series_for_cache(series_by_line[linea]) for linea in lineas_lote],
+            filters['conservative_factor'],
+            fc_ref_year,
+            str(fecha_corte.date()),
+            steps=fc_steps
+        )
+        pronosticos = {}
+        for linea, fc_result in zip(lineas_lote, fc_results):
+            fc_valores_list = fc_result['fc_valores']
+            fc_valores_list = [v * _line_adjustment_factor(linea) for v in fc_valores_list]
+            pronosticos[linea] = (fc_result['fc_fechas'], fc_valores_list, fc_result['is_partial'])
+        return pronosticos
+
+    # Todas las vistas × trimestres se calculan en una pasada y se guardan en
+    # sesión: cambiar de vista o de trimestre es una consulta al diccionario.
+    # Un resumen armado con modelos rápidos por presupuesto no se guarda, para
+    # que el siguiente rerun lo reconstruya con los ajustes completos.
+    resumen_key = _resumen_cache_key(data_version(df), fecha_corte, filters)
+    resumen_store = st.session_state.setdefault('resumen_cache', {})
+    resumenes = resumen_store.get(resumen_key)
+    if resumenes is None:
+        resumenes = build_line_summaries(
+            df_periodo,
+            ref_year,
+            fecha_corte,
+            QUARTER_MONTHS,
+            forecast_lines=_resumen_line_forecasts,
+            nowcast=lambda prod_parcial, pronostico_full: nowcast_cached(prod_parcial, fecha_corte, pronostico_full),
+            df_presupuesto=df_filtered,
+        )
+        if not _page_over_budget():
+            resumen_store[resumen_key] = resumenes
+            while len(resumen_store) > _MAX_RESUMEN_CACHE:
+                resumen_store.pop(next(iter(resumen_store)))
+    df_resumen = resumenes[(vista_mes, quarter_sel)].copy()
     
     if not df_resumen.empty:
         st.markdown(f"**Período:** {periodo_actual.strftime('%m/%Y')}")
         st.markdown(f"**Ajuste conservador:** {filters['ajuste_pct']:.1f}%")
-        if vista_mes == "Mes":
-            proyectado_col = "Proyectado"
-            pronostico_col = "Pronóstico (mes)"
-        elif vista_mes == "Año":
-            proyectado_col = "Proyectado (anual)"
-            pronostico_col = "Pronóstico (cierre)"
-        else:
-            proyectado_col = "Proyectado (YTD)"
-            pronostico_col = "Pronóstico (YTD + mes)"
+        proyectado_col = resumen_cols['proyectado']
+        pronostico_col = resumen_cols['pronostico']
         
         # Calcular totales
         totales = {}
@@ -1876,7 +2031,7 @@ with tabs[1]:
         key="selector_linea_forecast"
     )
 
-    df_linea_sel = df_filtered[df_filtered['LINEA_PLUS'] == linea_seleccionada]
+    df_linea_sel = df_filtered[eq_mask(df_filtered['LINEA_PLUS'], linea_seleccionada)]
 
     if not df_linea_sel.empty:
         serie_linea = df_linea_sel.groupby('FECHA')['IMP_PRIMA'].sum().sort_index()
@@ -1887,7 +2042,9 @@ with tabs[1]:
             serie_clean_sel, ref_year, fecha_corte
         )
 
-        hist_sel, fc_sel, smape_sel, acc_sel = engine_sel.fit_forecast(serie_train_sel, steps=12)
+        hist_sel, fc_sel, smape_sel, acc_sel = compute_series_forecast(
+            serie_train_sel, 12, filters['conservative_factor']
+        )
 
         # Aplicar ajustes específicos por línea
         factor_sel = _line_adjustment_factor(linea_seleccionada)
@@ -1988,36 +2145,41 @@ with tabs[1]:
         dias_totales_mes = business_days_left(periodo_actual, ultimo_dia_mes_suc)
         dias_transcurridos_mes = business_days_left(periodo_actual, fecha_corte)
 
+        sucursales_mes = []
         for sucursal in sucursales:
-            df_suc = df_filtered[df_filtered['SUCURSAL'] == sucursal]
+            df_suc = df_filtered[eq_mask(df_filtered['SUCURSAL'], sucursal)]
 
-            prod_mes_suc = df_suc[df_suc['FECHA'] == periodo_actual]['IMP_PRIMA'].sum()
+            prod_mes_suc = df_suc[df_suc['PERIODO'] == period_key(periodo_actual)]['IMP_PRIMA'].sum()
             presup_mes_suc = (
-                df_suc[df_suc['FECHA'] == periodo_actual]['PRESUPUESTO'].sum()
+                df_suc[df_suc['PERIODO'] == period_key(periodo_actual)]['PRESUPUESTO'].sum()
                 if 'PRESUPUESTO' in df_suc.columns else 0.0
             )
 
             if presup_mes_suc <= 0:
                 continue
 
+            serie_suc = df_suc.groupby('FECHA')['IMP_PRIMA'].sum().sort_index()
+            sucursales_mes.append((sucursal, prod_mes_suc, presup_mes_suc, serialize_series_for_cache(serie_suc)))
+
+        # Pronóstico de todas las sucursales en un solo lote
+        barra_suc = st.progress(0.0, text="Pronosticando sucursales...")
+        fc_suc_results = compute_line_forecasts(
+            [serie_data_suc for _, _, _, serie_data_suc in sucursales_mes],
+            filters['conservative_factor'],
+            ref_year,
+            str(fecha_corte.date()),
+            steps=1,
+            progress=lambda listas, total: barra_suc.progress(
+                listas / total, text=f"Pronosticando sucursales... {listas}/{total}"
+            ),
+        )
+        barra_suc.empty()
+
+        for (sucursal, prod_mes_suc, presup_mes_suc, _), fc_suc_result in zip(sucursales_mes, fc_suc_results):
             # Ritmo: qué porcentaje del tiempo transcurrido se ha ejecutado
             ritmo_necesario = (presup_mes_suc / dias_totales_mes) * dias_transcurridos_mes if dias_totales_mes > 0 else 0
             cumplimiento_ritmo = (prod_mes_suc / ritmo_necesario * 100) if ritmo_necesario > 0 else 0
 
-            # Pronóstico para la sucursal
-            serie_suc = df_suc.groupby('FECHA')['IMP_PRIMA'].sum().sort_index()
-            serie_data_suc = (
-                tuple(str(d) for d in serie_suc.index),
-                tuple(float(v) for v in serie_suc.values),
-            )
-            fc_suc_result = compute_line_forecast(
-                serie_data_suc,
-                filters['conservative_factor'],
-                ref_year,
-                str(fecha_corte.date()),
-                steps=1
-            )
-
             pronostico_suc = fc_suc_result['fc_valores'][0] if fc_suc_result['fc_valores'] else 0.0
             if fc_suc_result.get('is_partial'):
                 pronostico_suc = nowcast_cached(prod_mes_suc, fecha_corte, pronostico_suc)
@@ -2091,7 +2253,7 @@ with tabs[1]:
 with tabs[2]:
     st.subheader("🏛️ Análisis FIANZAS")
     
-    df_fianzas = df[df['LINEA_PLUS'] == 'FIANZAS'] if 'LINEA_PLUS' in df.columns else pd.DataFrame()
+    df_fianzas = df[eq_mask(df['LINEA_PLUS'], 'FIANZAS')] if 'LINEA_PLUS' in df.columns else pd.DataFrame()
     
     if df_fianzas.empty:
         st.warning("No hay datos de FIANZAS disponibles")
@@ -2116,7 +2278,9 @@ with tabs[2]:
                 serie_clean_f, filters['anio_analisis'], fecha_corte
             )
             
-            hist_f, fc_f, _, _ = engine_fianzas.fit_forecast(serie_train_f, steps=12)
+            hist_f, fc_f, _, _ = compute_series_forecast(
+                serie_train_f, 12, filters['conservative_factor']
+            )
             
             if not fc_f.empty:
                 fc_adjusted = adjuster.adjust_forecast(fc_f['Pronostico_mensual'], fc_f['FECHA'])
@@ -2135,3 +2299,12 @@ with tabs[2]:
             
             st.dataframe(fc_display_f[['FECHA', 'Pronóstico Mensual', 'Pronóstico Ajustado Garantías', 'Diferencia']], 
                         width='stretch', hide_index=True)
+
+# ==================== LÍMITE DE AJUSTE ====================
+if _page_degraded:
+    por_presupuesto = sum(1 for motivo in _page_degraded.values() if motivo == 'presupuesto')
+    st.caption(
+        f"⏱️ {len(_page_degraded)} serie(s) con el mejor modelo rápido por límite de tiempo de SARIMAX"
+        + (f" ({por_presupuesto} por presupuesto de la página; se reintentan en el siguiente rerun)"
+           if por_presupuesto else "")
+    )
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks y datasets sintéticos para medir AseguraView sin red
+"""
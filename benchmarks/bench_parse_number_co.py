@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Benchmark de ``parse_number_co`` frente a la implementación fila a fila.
+
+Uso:
+    python -m benchmarks.bench_parse_number_co --rows 1000000
+
+Verifica además que la salida sea idéntica a la versión anterior.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import format_number_co
+from utils.data_processor import parse_number_co
+
+
+def parse_number_co_legacy(series: pd.Series) -> pd.Series:
+    """Implementación original: regex y reemplazos sobre cada fila."""
+    s = series.astype(str)
+    s = s.str.replace(r"[^\d,.\-]", "", regex=True)
+    s = s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    return pd.to_numeric(s, errors="coerce")
+
+
+def _best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def build_column(rows: int, n_unique: int, seed: int = 11) -> pd.Series:
+    """Columna de texto con ``n_unique`` montos distintos, algunos con $ y nulos."""
+    rng = np.random.default_rng(seed)
+    amounts = np.round(rng.lognormal(14.0, 1.2, n_unique), 2)
+    pool = np.array(format_number_co(amounts), dtype=object)
+    pool[::7] = np.array([f"$ {v}" for v in pool[::7]], dtype=object)
+    values = pool[rng.integers(0, n_unique, rows)]
+    values[::997] = None
+    return pd.Series(values, name='IMP_PRIMA')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    scenarios = {
+        'pocos únicos (20k)': build_column(args.rows, 20_000),
+        'mayoría únicos': build_column(args.rows, args.rows),
+    }
+    for label, column in scenarios.items():
+        expected = parse_number_co_legacy(column)
+        pd.testing.assert_series_equal(parse_number_co(column, use_arrow=False), expected)
+        pd.testing.assert_series_equal(parse_number_co(column, use_arrow=True), expected)
+
+        t_legacy = _best_of(lambda: parse_number_co_legacy(column), args.repeat)
+        t_fast = _best_of(lambda: parse_number_co(column, use_arrow=False), args.repeat)
+        t_arrow = _best_of(lambda: parse_number_co(column, use_arrow=True), args.repeat)
+        print(f"[{label}] {len(column):,} filas, {column.nunique():,} únicos")
+        print(f"  legacy         {t_legacy:8.3f}s")
+        print(f"  únicos pandas  {t_fast:8.3f}s  ({t_legacy / t_fast:5.1f}x)")
+        print(f"  únicos arrow   {t_arrow:8.3f}s  ({t_legacy / t_arrow:5.1f}x)")
+
+    numeric = pd.Series(np.random.default_rng(3).normal(1e6, 1e5, args.rows))
+    t_numeric = _best_of(lambda: parse_number_co(numeric), args.repeat)
+    print(f"[columna ya numérica] {t_numeric:8.4f}s (sin re-parseo)")
+    print("Salida idéntica a la implementación anterior ✅")
+
+
+if __name__ == '__main__':
+    main()
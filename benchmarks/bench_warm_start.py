@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Benchmark del arranque en caliente de SARIMAX en el backtest.
+
+Uso:
+    python -m benchmarks.bench_warm_start --rows 200000 --eval-months 6
+
+Ajusta ``fit_forecast`` de cada serie mensual por LINEA_PLUS en frío y en
+caliente, y reporta iteraciones del optimizador, tiempo y la diferencia
+relativa máxima entre ambos pronósticos.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from benchmarks.synthetic_data import generate_sheet
+from modelos.forecast_engine import ForecastEngine
+from utils.data_processor import normalize_dataframe
+
+warnings.filterwarnings("ignore")
+
+
+def _timed_fit(engine: ForecastEngine, serie, steps: int, eval_months: int) -> tuple:
+    start = time.perf_counter()
+    result = engine.fit_forecast(serie, steps=steps, eval_months=eval_months)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--eval-months', type=int, default=6)
+    parser.add_argument('--steps', type=int, default=12)
+    args = parser.parse_args()
+
+    df = normalize_dataframe(generate_sheet(rows=args.rows))
+    series = df.groupby(['LINEA_PLUS', 'FECHA'], observed=True)['IMP_PRIMA'].sum()
+
+    totals = {'cold_it': 0, 'warm_it': 0, 'cold_s': 0.0, 'warm_s': 0.0}
+    print(f"{'Línea':<24}{'iter frío':>10}{'iter cal.':>10}{'t frío':>9}{'t cal.':>9}{'reint.':>8}{'Δ máx':>10}")
+    for linea in series.index.get_level_values('LINEA_PLUS').unique():
+        serie = series.xs(linea, level='LINEA_PLUS').sort_index()
+        # Sin límite de tiempo: los ajustes corren en este proceso y solo se
+        # mide el arranque en caliente, no el de procesos de ajuste
+        cold = ForecastEngine(n_jobs=1, warm_start=False, fit_timeout=0)
+        warm = ForecastEngine(n_jobs=1, warm_start=True, fit_timeout=0)
+        (_, fc_cold, _, _), t_cold = _timed_fit(cold, serie, args.steps, args.eval_months)
+        (_, fc_warm, _, _), t_warm = _timed_fit(warm, serie, args.steps, args.eval_months)
+
+        base = fc_cold['Pronostico_mensual'].to_numpy()
+        delta = np.max(np.abs(fc_warm['Pronostico_mensual'].to_numpy() - base) / np.maximum(np.abs(base), 1.0))
+        print(
+            f"{str(linea)[:23]:<24}{cold.fit_stats['iterations']:>10}{warm.fit_stats['iterations']:>10}"
+            f"{t_cold:>8.2f}s{t_warm:>8.2f}s{warm.fit_stats['cold_retries']:>8}{delta:>10.2e}"
+        )
+        totals['cold_it'] += cold.fit_stats['iterations']
+        totals['warm_it'] += warm.fit_stats['iterations']
+        totals['cold_s'] += t_cold
+        totals['warm_s'] += t_warm
+
+    saved_it = totals['cold_it'] - totals['warm_it']
+    saved_s = totals['cold_s'] - totals['warm_s']
+    print(f"Iteraciones ahorradas: {saved_it} ({saved_it / max(totals['cold_it'], 1):.0%})")
+    print(f"Tiempo ahorrado: {saved_s:.2f}s ({saved_s / max(totals['cold_s'], 1e-9):.0%})")
+
+
+if __name__ == '__main__':
+    main()
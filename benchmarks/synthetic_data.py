@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Generador de datasets sintéticos con el mismo formato que Hoja1/Hoja2.
+
+Uso:
+    python -m benchmarks.synthetic_data --rows 500000 --format parquet --out data
+
+Luego se apunta la app al resultado con:
+    ASEGURAVIEW_DATA_SOURCE=parquet ASEGURAVIEW_DATA_PATH=data streamlit run app.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+LINEAS_PLUS = [
+    'SOAT', 'FIANZAS', 'VIDA', 'AUTOS', 'HOGAR',
+    'PYMES', 'SALUD', 'ACCIDENTES', 'RESPONSABILIDAD CIVIL', 'TRANSPORTE',
+]
+SUC_AGRUPADAS = ['BOGOTÁ', 'ANTIOQUIA', 'VALLE', 'COSTA', 'EJE CAFETERO', 'SANTANDERES', 'SUR']
+COMPANIAS = ['SEGUROS DEL ESTADO', 'SEGUROS DE VIDA DEL ESTADO']
+
+_CO_NUMBER_TABLE = str.maketrans({',': '.', '.': ','})
+
+
+def format_number_co(values: np.ndarray) -> list[str]:
+    """Formatea números al estilo colombiano (1.234.567,89) como en la hoja."""
+    return [f"{v:,.2f}".translate(_CO_NUMBER_TABLE) for v in values]
+
+
+def generate_sheet(rows: int = 100_000, start_year: int = 2018, end_year: int = 2026,
+                   n_sucursales: int = 40, n_ramos: int = 60, seed: int = 7) -> pd.DataFrame:
+    """Genera filas con las columnas crudas de Hoja1.
+
+    Args:
+        rows: Número aproximado de filas a generar
+        start_year: Primer año de la serie
+        end_year: Último año de la serie
+        n_sucursales: Sucursales distintas
+        n_ramos: Ramos (código + nombre) distintos
+        seed: Semilla para reproducibilidad
+
+    Returns:
+        DataFrame con las mismas columnas que la hoja original
+    """
+    rng = np.random.default_rng(seed)
+    months = pd.date_range(f'{start_year}-01-01', f'{end_year}-12-01', freq='MS')
+
+    sucursales = np.array([f"{100 + i} SUCURSAL {i:02d}" for i in range(n_sucursales)])
+    suc_agrupada_por_sucursal = np.array(SUC_AGRUPADAS)[np.arange(n_sucursales) % len(SUC_AGRUPADAS)]
+    ramos = np.array([f"{300 + i} RAMO {i:02d}" for i in range(n_ramos)])
+    linea_por_ramo = np.array(LINEAS_PLUS)[np.arange(n_ramos) % len(LINEAS_PLUS)]
+
+    month_idx = rng.integers(0, len(months), rows)
+    suc_idx = rng.integers(0, n_sucursales, rows)
+    ramo_idx = rng.integers(0, n_ramos, rows)
+
+    fechas = months[month_idx]
+    seasonality = 1.0 + 0.25 * np.sin(2 * np.pi * (fechas.month.to_numpy() - 1) / 12)
+    trend = 1.0 + 0.06 * (fechas.year.to_numpy() - start_year)
+    prima = rng.lognormal(mean=14.0, sigma=1.1, size=rows) * seasonality * trend
+    presupuesto = prima * rng.normal(1.05, 0.08, size=rows)
+
+    lineas_plus = linea_por_ramo[ramo_idx]
+    return pd.DataFrame({
+        'Mes yyyy': [f"{d.day}/{d.month}/{d.year}" for d in fechas],
+        'Codigo y Sucursal': sucursales[suc_idx],
+        'Suc_agrupada': suc_agrupada_por_sucursal[suc_idx],
+        'Linea': lineas_plus,
+        'Linea +': lineas_plus,
+        'Compañía': np.array(COMPANIAS)[ramo_idx % len(COMPANIAS)],
+        'Codigo y Ramo': ramos[ramo_idx],
+        'CODIGO': (300 + ramo_idx).astype(str),
+        'Imp Prima': format_number_co(prima),
+        'Imp Prima Cuota': format_number_co(presupuesto),
+    })
+
+
+def write_dataset(df: pd.DataFrame, cutoff: pd.Timestamp, out: Path, fmt: str,
+                  sheet_datos: str = 'Hoja1', sheet_fecha: str = 'Hoja2') -> Path:
+    """Escribe Hoja1/Hoja2 en el formato de uno de los backends locales."""
+    cutoff_str = f"{cutoff.day}/{cutoff.month}/{cutoff.year}"
+    if fmt == 'csv':
+        out.mkdir(parents=True, exist_ok=True)
+        df.to_csv(out / f'{sheet_datos}.csv', index=False)
+        (out / f'{sheet_fecha}.csv').write_text(f"{cutoff_str}\n", encoding='utf-8')
+        return out
+    if fmt == 'parquet':
+        out.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(out / f'{sheet_datos}.parquet', index=False)
+        pd.DataFrame({'FECHA_CORTE': [cutoff_str]}).to_parquet(out / f'{sheet_fecha}.parquet', index=False)
+        return out
+    if fmt == 'sqlite':
+        db_path = out if out.suffix else out / 'aseguraview.db'
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(db_path)) as conn:
+            df.to_sql(sheet_datos, conn, if_exists='replace', index=False)
+            pd.DataFrame({'FECHA_CORTE': [cutoff_str]}).to_sql(
+                sheet_fecha, conn, if_exists='replace', index=False
+            )
+            conn.commit()
+        return db_path
+    raise ValueError(f"Formato no soportado: {fmt!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--start-year', type=int, default=2018)
+    parser.add_argument('--end-year', type=int, default=2026)
+    parser.add_argument('--cutoff', default='2026-06-15', help='Fecha de corte (ISO)')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'sqlite'], default='parquet')
+    parser.add_argument('--out', default='data')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    df = generate_sheet(args.rows, args.start_year, args.end_year, seed=args.seed)
+    target = write_dataset(df, pd.Timestamp(args.cutoff), Path(args.out), args.format)
+    print(f"{len(df):,} filas escritas en {target}")
+
+
+if __name__ == '__main__':
+    main()
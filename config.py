@@ -16,6 +16,63 @@ SHEET_ID = os.getenv(
 SHEET_NAME_DATOS = os.getenv('SHEET_NAME_DATOS', 'Hoja1')
 SHEET_NAME_FECHA_CORTE = os.getenv('SHEET_NAME_FECHA', 'Hoja2')
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ==================== ORIGEN DE DATOS ====================
+# gsheets (por defecto), csv, parquet o sqlite. Los backends locales leen
+# <DATA_SOURCE_PATH>/<hoja>.csv|.parquet o las tablas del archivo SQLite.
+DATA_SOURCE = os.getenv('ASEGURAVIEW_DATA_SOURCE', 'gsheets')
+DATA_SOURCE_PATH = os.getenv(
+    'ASEGURAVIEW_DATA_PATH',
+    os.path.join(BASE_DIR, 'data')
+)
+
+# ==================== SNAPSHOTS LOCALES ====================
+SNAPSHOT_DIR = os.getenv(
+    'ASEGURAVIEW_SNAPSHOT_DIR',
+    os.path.join(BASE_DIR, '.cache', 'snapshots')
+)
+SNAPSHOTS_ENABLED = os.getenv('ASEGURAVIEW_SNAPSHOTS', 'True').lower() == 'true'
+
+# ==================== PRONÓSTICOS ====================
+# Procesos para ajustar en paralelo las series de ForecastEngine.fit_many y,
+# sin arranque en caliente, los orígenes del backtest (1 = en serie, en el hilo del script)
+FORECAST_WORKERS = int(os.getenv('ASEGURAVIEW_FORECAST_WORKERS', '1'))
+# Arrancar cada origen del backtest desde los parámetros del anterior
+FORECAST_WARM_START = os.getenv('ASEGURAVIEW_FORECAST_WARM_START', 'True').lower() == 'true'
+# Caché persistente (SQLite) de ajustes SARIMAX compartido entre procesos y reinicios
+FORECAST_STORE_PATH = os.getenv(
+    'ASEGURAVIEW_FORECAST_STORE',
+    os.path.join(BASE_DIR, '.cache', 'forecasts.sqlite')
+)
+FORECAST_STORE_ENABLED = os.getenv('ASEGURAVIEW_FORECAST_STORE_ENABLED', 'True').lower() == 'true'
+FORECAST_STORE_MAX_MB = float(os.getenv('ASEGURAVIEW_FORECAST_STORE_MAX_MB', '64'))
+# Cierres de mes que se incorporan con parámetros fijos antes de reajustar (0 = siempre reajustar)
+FORECAST_REFIT_EVERY = int(os.getenv('ASEGURAVIEW_FORECAST_REFIT_EVERY', '3'))
+# Reajustar si el SMAPE del backtest supera este múltiplo del SMAPE del último ajuste completo
+FORECAST_DRIFT_TOLERANCE = float(os.getenv('ASEGURAVIEW_FORECAST_DRIFT_TOLERANCE', '1.25'))
+# Selección de modelo: SARIMAX solo con historia suficiente, pocos meses en cero y
+# ganancia relativa de SMAPE en el backtest frente al mejor modelo rápido
+FORECAST_SARIMAX_MIN_MONTHS = int(os.getenv('ASEGURAVIEW_FORECAST_SARIMAX_MIN_MONTHS', '36'))
+FORECAST_SARIMAX_MAX_ZERO_SHARE = float(os.getenv('ASEGURAVIEW_FORECAST_SARIMAX_MAX_ZERO_SHARE', '0.2'))
+FORECAST_SARIMAX_MIN_GAIN = float(os.getenv('ASEGURAVIEW_FORECAST_SARIMAX_MIN_GAIN', '0.0'))
+# Segundos máximos de la etapa SARIMAX de una serie (0 = sin límite); con
+# límite cada ajuste corre en un proceso aparte (a lo más FORECAST_WORKERS o
+# n_jobs) que se termina al superarlo, y se usa el mejor modelo rápido
+FORECAST_FIT_TIMEOUT = float(os.getenv('ASEGURAVIEW_FORECAST_FIT_TIMEOUT', '0'))
+# Segundos de ajuste por página (rerun de la app); agotados, las series
+# restantes usan modelos rápidos y SARIMAX se reintenta en el siguiente rerun
+FORECAST_PAGE_BUDGET = float(os.getenv('ASEGURAVIEW_FORECAST_PAGE_BUDGET', '0'))
+# Pronóstico masivo por sucursal × línea (python -m modelos.mass_forecast):
+# procesos, series por tramo y tiempo máximo en segundos (0 = sin límite)
+MASS_FORECAST_WORKERS = int(os.getenv('ASEGURAVIEW_MASS_FORECAST_WORKERS', str(max(1, (os.cpu_count() or 2) - 1))))
+MASS_FORECAST_CHUNK_SIZE = int(os.getenv('ASEGURAVIEW_MASS_FORECAST_CHUNK_SIZE', '32'))
+MASS_FORECAST_TIME_BUDGET = float(os.getenv('ASEGURAVIEW_MASS_FORECAST_TIME_BUDGET', '0'))
+
+# ==================== INSTRUMENTACIÓN ====================
+# INFO muestra en consola los tiempos de descarga y carga en frío
+PERF_LOG_LEVEL = os.getenv('ASEGURAVIEW_PERF_LOG_LEVEL', 'WARNING')
+
 # ==================== FORMATO DE FECHAS ====================
 DATE_FORMAT = '%d/%m/%Y'  # Formato colombiano: 1/1/2007
 DATE_PARSE_DAYFIRST = True
@@ -3,11 +3,13 @@
 Módulo de modelos de negocio para AseguraView
 """
 from .forecast_engine import ForecastEngine
+from .forecast_store import ForecastStore
 from .fianzas_adjuster import FianzasAdjuster
 from .budget_2026 import Budget2026Generator
 
 __all__ = [
     'ForecastEngine',
+    'ForecastStore',
     'FianzasAdjuster',
     'Budget2026Generator'
 ]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Modelos rápidos para el primer nivel de la selección de modelo.
+
+Ingenuo estacional, Theta y ETS(A,N,A) ajustan en milisegundos y no fallan en
+series cortas o con rachas de ceros, donde SARIMAX tarda o cae al respaldo
+ARIMA. Todos trabajan, como SARIMAX en ``ForecastEngine``, sobre la serie en
+escala ``log1p`` y devuelven la media y el intervalo 95% en esa escala. El
+backtest solo necesita la media: sin intervalo Theta no reestima la varianza y
+ETS se salta la simulación del intervalo, con el mismo estimador que se usa
+para pronosticar.
+"""
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+from statsmodels.tsa.forecasting.theta import ThetaModel
+
+SEASONAL_PERIOD = 12
+# Orden de preferencia: sin backtest se usa el primero
+FAST_MODELS = ('naive_estacional', 'theta', 'ets')
+_Z_95 = 1.959963984540054
+
+
+def _seasonal(y: pd.Series) -> bool:
+    # Dos temporadas completas para estimar la estacionalidad
+    return len(y) >= 2 * SEASONAL_PERIOD
+
+
+def seasonal_naive_forecast(y: pd.Series, steps: int, with_conf: bool = True) -> tuple:
+    """Repite la última temporada; con menos de 12 meses repite el último valor.
+
+    El intervalo usa la desviación de las diferencias estacionales y crece con
+    la raíz del número de temporadas hacia adelante.
+    """
+    values = y.to_numpy(dtype=float)
+    period = SEASONAL_PERIOD if len(values) >= SEASONAL_PERIOD else 1
+    horizon = np.arange(steps)
+    mean = values[len(values) - period + horizon % period]
+    if not with_conf:
+        return mean, None
+    residuals = values[period:] - values[:-period]
+    sigma = float(np.std(residuals)) if len(residuals) > 1 else 0.0
+    half = _Z_95 * sigma * np.sqrt(horizon // period + 1)
+    return mean, np.column_stack([mean - half, mean + half])
+
+
+def theta_forecast(y: pd.Series, steps: int, with_conf: bool = True) -> tuple:
+    """Método Theta con desestacionalización aditiva si hay dos temporadas."""
+    result = ThetaModel(y, period=SEASONAL_PERIOD, deseasonalize=_seasonal(y), method='additive').fit()
+    mean = result.forecast(steps).to_numpy()
+    if not with_conf:
+        return mean, None
+    conf = result.prediction_intervals(steps, alpha=0.05).to_numpy()
+    return mean, conf
+
+
+def ets_forecast(y: pd.Series, steps: int, with_conf: bool = True) -> tuple:
+    """ETS con error aditivo, sin tendencia y estacionalidad aditiva si hay dos temporadas."""
+    seasonal = _seasonal(y)
+    result = ETSModel(
+        y,
+        error='add',
+        trend=None,
+        seasonal='add' if seasonal else None,
+        seasonal_periods=SEASONAL_PERIOD if seasonal else None,
+    ).fit(disp=False)
+    if not with_conf:
+        return result.forecast(steps).to_numpy(), None
+    frame = result.get_prediction(start=len(y), end=len(y) + steps - 1).summary_frame(alpha=0.05)
+    return frame['mean'].to_numpy(), frame[['pi_lower', 'pi_upper']].to_numpy()
+
+
+_FORECASTERS = {
+    'naive_estacional': seasonal_naive_forecast,
+    'theta': theta_forecast,
+    'ets': ets_forecast,
+}
+
+
+def fast_forecast(name: str, y: pd.Series, steps: int, with_conf: bool = True) -> tuple:
+    """Pronóstico log de un modelo rápido.
+
+    Args:
+        name: Uno de ``FAST_MODELS``
+        y: Serie mensual en escala ``log1p``
+        steps: Número de pasos a pronosticar
+        with_conf: Calcular el intervalo 95%
+
+    Returns:
+        Tuple de (media, intervalo 95% o None) en escala log
+    """
+    return _FORECASTERS[name](y, steps, with_conf)
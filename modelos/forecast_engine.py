@@ -1,22 +1,514 @@
 # -*- coding: utf-8 -*-
 """
-Motor de pronósticos usando SARIMAX/ARIMA
+Motor de pronósticos usando SARIMAX/ARIMA, con modelos rápidos como primer nivel
 """
+import atexit
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.context
+import sys
+import threading
+import time
+import types
 import pandas as pd
 import numpy as np
 import warnings
+from concurrent.futures import CancelledError, ProcessPoolExecutor, as_completed
+from typing import Callable
+from concurrent.futures.process import BrokenProcessPool
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from statsmodels.tsa.arima.model import ARIMA
+from config import (
+    FORECAST_DRIFT_TOLERANCE,
+    FORECAST_FIT_TIMEOUT,
+    FORECAST_REFIT_EVERY,
+    FORECAST_SARIMAX_MAX_ZERO_SHARE,
+    FORECAST_SARIMAX_MIN_GAIN,
+    FORECAST_SARIMAX_MIN_MONTHS,
+    FORECAST_WARM_START,
+    FORECAST_WORKERS,
+)
+from modelos.fast_models import FAST_MODELS, fast_forecast
+from modelos.forecast_store import fit_key
 from utils.date_utils import ensure_monthly, business_days_left, get_month_range
 
 warnings.filterwarnings("ignore")
 
+# Incrementar cuando cambie el modelo o el backtest: invalida el caché persistente
+ENGINE_VERSION = 3
+MODEL_ORDER = (1, 1, 1)
+SEASONAL_ORDER = (1, 1, 1, 12)
+
+_POOL_LOCK = threading.Lock()
+_POOL = None
+
+# Procesos de ajuste: ociosos para reutilizar y total de vivos (ociosos u ocupados)
+_FIT_WORKERS_LOCK = threading.Condition()
+_IDLE_FIT_WORKERS = []
+_LIVE_FIT_WORKERS = 0
+_SPAWN_LOCK = threading.Lock()
+
+
+class _SpawnProcess(multiprocessing.context.SpawnProcess):
+    """Proceso ``spawn`` que no vuelve a ejecutar el script de la app en el hijo.
+
+    Streamlit registra el script de la app como ``__main__`` y ``spawn`` lo
+    ejecuta de nuevo (como ``__mp_main__``) en cada hijo: mientras arranca el
+    proceso se deja en su lugar un módulo vacío, para que el hijo solo importe
+    lo que necesita su tarea. Solo se restaura si nadie más cambió ``__main__``
+    entretanto.
+    """
+
+    def start(self):
+        with _SPAWN_LOCK:
+            main = sys.modules.get('__main__')
+            placeholder = types.ModuleType('__main__')
+            sys.modules['__main__'] = placeholder
+            try:
+                super().start()
+            finally:
+                if sys.modules.get('__main__') is placeholder:
+                    sys.modules['__main__'] = main
+
+
+class _SpawnContext(multiprocessing.context.SpawnContext):
+    Process = _SpawnProcess
+
+
+# Contexto de los procesos del pool y de ajuste
+_SPAWN_CONTEXT = _SpawnContext()
+
+
+class FitTimeout(Exception):
+    """La etapa SARIMAX de una serie superó su tiempo y su proceso fue terminado."""
+
+
+def _sarimax_model(y: pd.Series) -> SARIMAX:
+    return SARIMAX(
+        y,
+        order=MODEL_ORDER,
+        seasonal_order=SEASONAL_ORDER,
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    )
+
+
+def _fit_sarimax(y: pd.Series, start_params=None) -> tuple:
+    """Ajusta SARIMAX(1,1,1)(1,1,1,12), arrancando desde ``start_params`` si se dan.
+
+    Si el arranque en caliente falla o no converge se repite el ajuste en frío.
+
+    Returns:
+        Tuple de (resultado, iteraciones del optimizador, hubo_reintento_en_frio)
+    """
+    model = _sarimax_model(y)
+    iterations = 0
+    if start_params is not None:
+        try:
+            result = model.fit(disp=False, start_params=start_params)
+        except Exception:
+            pass
+        else:
+            iterations = int(result.mle_retvals.get('iterations', 0))
+            if result.mle_retvals.get('converged', True):
+                return result, iterations, False
+    result = model.fit(disp=False)
+    iterations += int(result.mle_retvals.get('iterations', 0))
+    return result, iterations, start_params is not None
+
+
+def _forecast_log(y: pd.Series, steps: int, with_conf: bool = True, start_params=None) -> tuple:
+    """Pronóstico en escala log con SARIMAX(1,1,1)(1,1,1,12); ARIMA(1,1,1) si falla en frío.
+
+    Returns:
+        Tuple de (media, intervalo 95% o None, parámetros SARIMAX o None, stats)
+        donde ``stats`` cuenta iteraciones y reintentos en frío
+    """
+    try:
+        result, iterations, cold_retry = _fit_sarimax(y, start_params)
+        forecast = result.get_forecast(steps=steps)
+        mean = forecast.predicted_mean.to_numpy()
+        conf = forecast.conf_int(alpha=0.05).to_numpy() if with_conf else None
+        params = result.params.to_numpy()
+    except Exception:
+        model = ARIMA(y, order=MODEL_ORDER)
+        forecast = model.fit().get_forecast(steps=steps)
+        mean = forecast.predicted_mean.to_numpy()
+        conf = forecast.conf_int(alpha=0.05).to_numpy() if with_conf else None
+        params, iterations, cold_retry = None, 0, False
+    stats = {'fits': 1, 'iterations': iterations, 'cold_retries': int(cold_retry)}
+    return mean, conf, params, stats
+
+
+def _filter_forecast(y: pd.Series, params, steps: int) -> tuple:
+    """Pronóstico log de SARIMAX con parámetros fijos, sin optimizar.
+
+    Solo corre el filtro de Kalman sobre ``y``: equivale a
+    ``resultado_anterior.append(nuevas_obs, refit=False)`` pero parte de los
+    parámetros guardados, no del objeto de resultados.
+
+    Returns:
+        Tuple de (media, intervalo 95%)
+    """
+    result = _sarimax_model(y).filter(np.asarray(params, dtype=float))
+    forecast = result.get_forecast(steps=steps)
+    return forecast.predicted_mean.to_numpy(), forecast.conf_int(alpha=0.05).to_numpy()
+
+
+def _fit_chain(y: pd.Series, origins: list, warm_start: bool = True,
+               start_params=None) -> tuple:
+    """Ajusta en orden los orígenes del backtest SARIMAX.
+
+    Con ``warm_start`` cada ajuste arranca desde los parámetros del anterior
+    (el primero desde ``start_params``): las ventanas consecutivas difieren en
+    un mes y el óptimo cambia poco.
+
+    Returns:
+        Tuple de (pronósticos log a un paso, parámetros de cada origen, stats)
+    """
+    stats = {'fits': 0, 'iterations': 0, 'cold_retries': 0}
+    params = start_params
+    preds, origin_params = [], []
+    for t in origins:
+        mean, _, fitted, fit_stats = _forecast_log(
+            y.iloc[:t], steps=1, with_conf=False,
+            start_params=params if warm_start else None,
+        )
+        preds.append(float(mean[0]))
+        origin_params.append(fitted)
+        params = fitted
+        for key in stats:
+            stats[key] += fit_stats[key]
+    return preds, origin_params, stats
+
+
+def _empty_result() -> tuple:
+    """Resultado de ``fit_forecast`` para una serie sin datos."""
+    empty_hist = pd.DataFrame(columns=["FECHA", "Mensual", "ACUM"])
+    empty_fc = pd.DataFrame(columns=[
+        "FECHA", "Pronostico_mensual", "Pronostico_acum", "IC_lo", "IC_hi"
+    ])
+    empty_acc = pd.DataFrame(columns=["FECHA", "Real", "Forecast_hist"])
+    return empty_hist, empty_fc, np.nan, empty_acc
+
+
+def history_frame(ts: pd.Series) -> pd.DataFrame:
+    """Histórico mensual y acumulado de una serie (primer elemento de ``fit_forecast``)."""
+    hist_acum = ts.cumsum()
+    return pd.DataFrame({
+        "FECHA": ts.index,
+        "Mensual": ts.values,
+        "ACUM": hist_acum.values if len(ts) > 0 else []
+    })
+
+
+def forecast_frame(ts: pd.Series, steps: int, mean_log, conf_log) -> pd.DataFrame:
+    """Pronóstico sin escalar en escala original a partir del mes siguiente a ``ts``."""
+    future_dates = pd.date_range(
+        ts.index.max() + pd.offsets.MonthBegin(),
+        periods=steps,
+        freq="MS"
+    )
+    return pd.DataFrame({
+        "FECHA": future_dates,
+        "Pronostico_mensual": np.expm1(mean_log).clip(min=0),
+        "IC_lo": np.expm1(conf_log[:, 0]).clip(min=0),
+        "IC_hi": np.expm1(conf_log[:, 1]).clip(min=0)
+    })
+
+
+def _fit_series_chunk(items: list, steps: int, eval_months: int, options: dict) -> list:
+    """Ajusta en serie un tramo de series; un error afecta solo a su serie.
+
+    ``options`` son los argumentos del engine que afectan al ajuste (ver
+    ``ForecastEngine._fit_options``); con ``store`` se reutilizan y guardan
+    los orígenes del backtest.
+
+    Returns:
+        Lista de (llave, salida de ``_fit_unscaled`` o None, mensaje de error o None)
+    """
+    engine = ForecastEngine(conservative_factor=1.0, n_jobs=1, **options)
+    results = []
+    for key, ts in items:
+        try:
+            results.append((key, engine._fit_unscaled(ts, steps, eval_months), None))
+        except Exception as exc:
+            results.append((key, None, f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Pool de procesos compartido, creado al primer uso con ``max_workers`` procesos.
+
+    Se usa ``spawn`` porque el script de Streamlit corre en hilos y ``fork``
+    desde un proceso con hilos puede bloquear a los hijos; sus procesos
+    arrancan sin el script de la app (ver ``_SpawnProcess``). El pool se
+    comparte entre sesiones que pueden tener tareas en curso, así que no se
+    redimensiona: una llamada con otro ``max_workers`` recibe el existente y
+    solo se reemplaza si se rompe (ver ``_discard_pool``).
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=_SPAWN_CONTEXT,
+            )
+        return _POOL
+
+
+def _discard_pool(pool: ProcessPoolExecutor = None) -> None:
+    """Descarta el pool compartido; con ``pool``, solo si sigue siendo ese (roto)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None and (pool is None or _POOL is pool):
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+atexit.register(_discard_pool)
+
+
+def _fit_worker_main(conn) -> None:
+    """Proceso de ajuste: avisa que está listo y ejecuta cada (función, argumentos) recibido."""
+    conn.send(None)
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, func(*args)))
+        except Exception as exc:
+            conn.send((False, exc))
+
+
+def _start_fit_worker() -> tuple:
+    """Arranca un proceso de ajuste con ``spawn`` y espera a que esté listo."""
+    conn, child_conn = _SPAWN_CONTEXT.Pipe()
+    process = _SPAWN_CONTEXT.Process(target=_fit_worker_main, args=(child_conn,), daemon=True)
+    process.start()
+    child_conn.close()
+    # El arranque (importar statsmodels) no cuenta para el tiempo del ajuste
+    try:
+        conn.recv()
+    except EOFError:
+        process.join()
+        conn.close()
+        raise RuntimeError("El proceso de ajuste no pudo arrancar")
+    return process, conn
+
+
+def _stop_fit_worker(worker: tuple) -> None:
+    process, conn = worker
+    process.kill()
+    process.join()
+    conn.close()
+
+
+def _acquire_fit_workers(count: int, max_workers: int) -> list:
+    """Toma hasta ``count`` procesos de ajuste: primero ociosos y luego nuevos si hay cupo.
+
+    Entre todas las llamadas viven a lo más ``max_workers`` procesos
+    (ociosos u ocupados). Si no hay ninguno libre ni cupo se espera a que
+    otra llamada devuelva uno, así que siempre se obtiene al menos uno.
+    """
+    global _LIVE_FIT_WORKERS
+    with _FIT_WORKERS_LOCK:
+        while True:
+            workers = []
+            while _IDLE_FIT_WORKERS and len(workers) < count:
+                worker = _IDLE_FIT_WORKERS.pop()
+                if worker[0].is_alive():
+                    workers.append(worker)
+                else:
+                    _stop_fit_worker(worker)
+                    _LIVE_FIT_WORKERS -= 1
+            new = min(count - len(workers), max(max_workers - _LIVE_FIT_WORKERS, 0))
+            if workers or new:
+                _LIVE_FIT_WORKERS += new
+                break
+            _FIT_WORKERS_LOCK.wait()
+    try:
+        for started in range(new):
+            workers.append(_start_fit_worker())
+    except Exception:
+        with _FIT_WORKERS_LOCK:
+            _LIVE_FIT_WORKERS -= new - started
+        _release_fit_workers(workers, (), max_workers)
+        raise
+    return workers
+
+
+def _release_fit_workers(workers: list, busy, max_workers: int) -> None:
+    """Devuelve procesos de ajuste: los ocupados o muertos se matan y quedan a lo más ``max_workers`` ociosos."""
+    global _LIVE_FIT_WORKERS
+    stopped = []
+    with _FIT_WORKERS_LOCK:
+        for worker in workers:
+            if worker in busy or not worker[0].is_alive() or len(_IDLE_FIT_WORKERS) >= max_workers:
+                stopped.append(worker)
+                _LIVE_FIT_WORKERS -= 1
+            else:
+                _IDLE_FIT_WORKERS.append(worker)
+        _FIT_WORKERS_LOCK.notify_all()
+    for worker in stopped:
+        _stop_fit_worker(worker)
+
+
+def _run_all_with_deadline(calls: list, timeout: float, max_workers: int = None) -> list:
+    """Ejecuta cada (función, argumentos) de ``calls`` en procesos de ajuste, en paralelo.
+
+    Un ajuste de SARIMAX no se puede interrumpir desde el hilo que lo llama;
+    en un proceso aparte sí. Se usan a lo más ``max_workers`` procesos
+    (por defecto uno por llamada), tope que también aplica al total de
+    procesos vivos entre hilos; con menos procesos que llamadas, cada uno
+    toma la siguiente al terminar y ``timeout`` cubre todas. Los procesos
+    ociosos se reutilizan entre llamadas y entre hilos (arrancar uno con
+    ``spawn`` tarda segundos y no cuenta para ``timeout``); los que siguen
+    ocupados al agotarse el tiempo se matan y las llamadas siguientes
+    arrancan otros.
+
+    Returns:
+        Lista con el resultado de cada llamada, en el orden de ``calls``
+
+    Raises:
+        FitTimeout: si alguna llamada no terminó dentro de ``timeout``
+    """
+    max_workers = len(calls) if max_workers is None else max(1, int(max_workers))
+    workers = _acquire_fit_workers(len(calls), max_workers)
+    deadline = time.monotonic() + max(timeout, 0.0)
+    queue = list(enumerate(calls))
+    pending = {}
+    results = [None] * len(calls)
+
+    def dispatch(worker):
+        position, call = queue.pop(0)
+        pending[worker[1]] = (position, worker)
+        worker[1].send(call)
+
+    try:
+        for worker in workers[:len(queue)]:
+            dispatch(worker)
+        while pending:
+            ready = multiprocessing.connection.wait(
+                list(pending), timeout=max(deadline - time.monotonic(), 0.0)
+            )
+            if not ready:
+                raise FitTimeout(f"Ajuste sin terminar tras {timeout:.1f}s")
+            for conn in ready:
+                results[pending[conn][0]] = conn.recv()
+                _, worker = pending.pop(conn)
+                if queue:
+                    dispatch(worker)
+    except (EOFError, OSError):
+        raise RuntimeError("El proceso de ajuste terminó inesperadamente")
+    finally:
+        _release_fit_workers(workers, {worker for _, worker in pending.values()}, max_workers)
+    for ok, value in results:
+        if not ok:
+            raise value
+    return [value for _, value in results]
+
+
+def _run_with_deadline(func, args: tuple, timeout: float, max_workers: int = 1):
+    """Ejecuta ``func(*args)`` en un proceso de ajuste y lo termina si tarda más de ``timeout``.
+
+    Raises:
+        FitTimeout: si ``func`` no terminó a tiempo
+    """
+    return _run_all_with_deadline([(func, args)], timeout, max_workers)[0]
+
+
+def _discard_fit_workers() -> None:
+    global _LIVE_FIT_WORKERS
+    with _FIT_WORKERS_LOCK:
+        workers = list(_IDLE_FIT_WORKERS)
+        _IDLE_FIT_WORKERS.clear()
+        _LIVE_FIT_WORKERS -= len(workers)
+    for worker in workers:
+        _stop_fit_worker(worker)
+
+
+atexit.register(_discard_fit_workers)
+
 
 class ForecastEngine:
     """Motor de pronósticos para series temporales de primas"""
     
-    def __init__(self, conservative_factor: float = 1.0):
+    def __init__(self, conservative_factor: float = 1.0, n_jobs: int = None,
+                 warm_start: bool = None, store=None, refit_every: int = None,
+                 drift_tolerance: float = None, sarimax_min_months: int = None,
+                 sarimax_max_zero_share: float = None, sarimax_min_gain: float = None,
+                 fit_timeout: float = None, deadline: float = None):
+        """
+        Args:
+            conservative_factor: Factor multiplicativo aplicado al pronóstico
+            n_jobs: Procesos para ajustar en paralelo las series de
+                ``fit_many`` y, sin ``warm_start``, los orígenes del backtest
+                (1 = en serie). Por defecto ``FORECAST_WORKERS``.
+            warm_start: Arrancar cada ajuste del backtest (y el final) desde
+                los parámetros del origen anterior. Por defecto
+                ``FORECAST_WARM_START``.
+            store: ``ForecastStore`` persistente donde buscar y guardar los
+                ajustes sin escalar; None no persiste nada.
+            refit_every: Cierres de mes consecutivos que se incorporan al
+                ajuste guardado con parámetros fijos antes de reajustar.
+                Por defecto ``FORECAST_REFIT_EVERY``; 0 siempre reajusta.
+            drift_tolerance: Se reajusta si el SMAPE del backtest incremental
+                supera este múltiplo del SMAPE del último ajuste completo.
+                Por defecto ``FORECAST_DRIFT_TOLERANCE``.
+            sarimax_min_months: Meses mínimos para considerar SARIMAX; las
+                series más cortas solo usan modelos rápidos. Por defecto
+                ``FORECAST_SARIMAX_MIN_MONTHS``.
+            sarimax_max_zero_share: Proporción máxima de meses en cero para
+                considerar SARIMAX. Por defecto
+                ``FORECAST_SARIMAX_MAX_ZERO_SHARE``.
+            sarimax_min_gain: Ganancia relativa de SMAPE en el backtest que
+                SARIMAX debe tener sobre el mejor modelo rápido para
+                usarse. Por defecto ``FORECAST_SARIMAX_MIN_GAIN``.
+            fit_timeout: Segundos máximos de la etapa SARIMAX (backtest y
+                modelo final) de cada serie, que corre en procesos (uno por
+                tramo del backtest, a lo más ``n_jobs`` vivos) que se
+                terminan al agotarlos; la serie usa entonces el mejor modelo rápido y
+                queda degradada. Por defecto ``FORECAST_FIT_TIMEOUT``; 0 sin
+                límite (y con el pool compartido).
+            deadline: Instante (``time.time()``) en que se agota el
+                presupuesto del lote o de la página: después no se ajusta
+                SARIMAX y la serie queda degradada. None sin presupuesto.
+        """
         self.conservative_factor = conservative_factor
+        self.n_jobs = FORECAST_WORKERS if n_jobs is None else max(1, int(n_jobs))
+        self.warm_start = FORECAST_WARM_START if warm_start is None else bool(warm_start)
+        # Ajustes SARIMAX, iteraciones del optimizador, reintentos en frío y
+        # ajustes de modelos rápidos del último fit_forecast
+        self.fit_stats = {'fits': 0, 'iterations': 0, 'cold_retries': 0, 'fast_fits': 0}
+        # Series que fallaron en el último fit_many (llave -> mensaje)
+        self.fit_errors = {}
+        self.store = store
+        self.refit_every = FORECAST_REFIT_EVERY if refit_every is None else max(0, int(refit_every))
+        self.drift_tolerance = FORECAST_DRIFT_TOLERANCE if drift_tolerance is None else float(drift_tolerance)
+        self.sarimax_min_months = (
+            FORECAST_SARIMAX_MIN_MONTHS if sarimax_min_months is None else int(sarimax_min_months)
+        )
+        self.sarimax_max_zero_share = (
+            FORECAST_SARIMAX_MAX_ZERO_SHARE if sarimax_max_zero_share is None else float(sarimax_max_zero_share)
+        )
+        self.sarimax_min_gain = FORECAST_SARIMAX_MIN_GAIN if sarimax_min_gain is None else float(sarimax_min_gain)
+        self.fit_timeout = FORECAST_FIT_TIMEOUT if fit_timeout is None else max(0.0, float(fit_timeout))
+        self.deadline = deadline
+        # Series con modelo rápido por falta de tiempo en el último fit_many
+        # (llave -> 'tiempo' si SARIMAX superó ``fit_timeout``, 'presupuesto'
+        # si se agotó ``deadline``)
+        self.degraded = {}
+        # Modelo del último fit_forecast: 'sarimax' o uno de FAST_MODELS
+        self.last_model = None
+        # Origen del último fit_forecast: 'store', 'append' (cierre de mes) o 'fit'
+        self.last_update = None
+        # Parámetros SARIMAX del modelo final del último fit_forecast (None con ARIMA)
+        self.last_params = None
+        # Degradación del último fit_forecast: None, 'tiempo' o 'presupuesto'
+        self.last_degraded = None
     
     def sanitize_series(self, ts: pd.Series, ref_year: int) -> pd.Series:
         """Limpia serie eliminando ceros finales del año de referencia"""
@@ -98,119 +590,618 @@ class ForecastEngine:
         proporcion_restante = dias_restantes / dias_totales
         return prod_parcial + forecast_mes_completo * proporcion_restante
 
-    def fit_forecast(self, ts: pd.Series, steps: int, eval_months: int = 6) -> tuple:
-        """Ajusta modelo SARIMAX/ARIMA y genera pronóstico.
+    def _run_fits(self, y: pd.Series, origins: list, start_params=None) -> tuple:
+        """Ajusta los orígenes del backtest SARIMAX.
+
+        Con ``n_jobs > 1`` y sin ``warm_start`` los orígenes se reparten en
+        tramos consecutivos, uno por proceso del pool, y los resultados se
+        recogen en orden. Con ``warm_start`` cada origen arranca desde el
+        anterior, así que la cadena no se parte (ver ``_origin_chunks``). En
+        ambos casos la salida es idéntica a la ejecución en serie. Si el pool
+        no está disponible (roto, o descartado por otra sesión) se ajusta en serie.
 
         Returns:
-            Tuple de (hist_df, forecast_df, smape_validation, accuracy_df) donde
-            accuracy_df contiene los pronósticos históricos rolling vs real.
+            Tuple de (pronósticos log a un paso, parámetros de cada origen)
         """
-        if steps < 1:
-            steps = 1
+        chunks = self._origin_chunks(origins)
+        if len(chunks) > 1:
+            pool = None
+            try:
+                pool = _get_pool(self.n_jobs)
+                futures = [
+                    pool.submit(
+                        _fit_chain, y, chunk, self.warm_start,
+                        start_params if i == 0 else None,
+                    )
+                    for i, chunk in enumerate(chunks)
+                ]
+                chains = [future.result() for future in futures]
+                self.fit_stats = {
+                    key: sum(chain[2][key] for chain in chains) for key in chains[0][2]
+                }
+                return (
+                    [pred for chain in chains for pred in chain[0]],
+                    [params for chain in chains for params in chain[1]],
+                )
+            except (BrokenProcessPool, OSError):
+                _discard_pool(pool)
+            except (CancelledError, RuntimeError):
+                # Pool descartado por otra sesión: se ajusta en serie
+                pass
         
-        ts = ensure_monthly(ts.copy())
+        backtest_preds, origin_params, self.fit_stats = _fit_chain(
+            y, origins, self.warm_start, start_params
+        )
+        return backtest_preds, origin_params
+    
+    def _origin_chunks(self, origins: list) -> list:
+        """Tramos consecutivos de orígenes del backtest, uno por proceso según ``n_jobs``.
+
+        Con ``warm_start`` es un solo tramo: partir la cadena haría que cada
+        tramo arrancara en frío y el resultado dependería de ``n_jobs``. El
+        paralelismo queda entonces entre series (``fit_many``).
+        """
+        if self.warm_start:
+            return [[int(t) for t in origins]]
+        workers = min(self.n_jobs, max(1, len(origins)))
+        return [[int(t) for t in chunk] for chunk in np.array_split(origins, workers)]
+    
+    def _run_fits_with_deadline(self, y: pd.Series, origins: list, start_params,
+                                time_limit: float) -> tuple:
+        """Como ``_run_fits``, pero cada tramo corre en un proceso que se termina al agotar ``time_limit``.
+
+        No usa el pool compartido: un proceso del pool no se puede matar sin
+        afectar las tareas de otras sesiones.
+
+        Raises:
+            FitTimeout: si algún tramo no terminó a tiempo
+        """
+        chunks = self._origin_chunks(origins)
+        chains = _run_all_with_deadline(
+            [
+                (_fit_chain, (y, chunk, self.warm_start, start_params if i == 0 else None))
+                for i, chunk in enumerate(chunks)
+            ],
+            time_limit,
+            self.n_jobs,
+        )
+        self.fit_stats = {key: sum(chain[2][key] for chain in chains) for key in chains[0][2]}
+        return (
+            [pred for chain in chains for pred in chain[0]],
+            [params for chain in chains for params in chain[1]],
+        )
+    
+    def scale_forecast(self, hist_df: pd.DataFrame, forecast_df: pd.DataFrame,
+                       accuracy_df: pd.DataFrame, factor: float = None) -> tuple:
+        """Aplica un factor multiplicativo a un pronóstico ya ajustado.
+
+        El factor solo escala las salidas de ``expm1`` (pronóstico, intervalos
+        y pronósticos del backtest), así que puede aplicarse sobre un ajuste
+        cacheado sin escalar en lugar de reajustar el modelo.
+
+        Args:
+            hist_df: Histórico devuelto por ``fit_forecast`` (para el acumulado)
+            forecast_df: Pronóstico sin escalar
+            accuracy_df: Backtest sin escalar (Real vs Forecast_hist)
+            factor: Factor a aplicar; por defecto ``conservative_factor``
+
+        Returns:
+            Tuple de (forecast_df, smape_validation, accuracy_df) escalados
+        """
+        factor = self.conservative_factor if factor is None else factor
         
-        if ts.empty:
-            empty_hist = pd.DataFrame(columns=["FECHA", "Mensual", "ACUM"])
-            empty_fc = pd.DataFrame(columns=[
-                "FECHA", "Pronostico_mensual", "Pronostico_acum", "IC_lo", "IC_hi"
-            ])
-            empty_acc = pd.DataFrame(columns=["FECHA", "Real", "Forecast_hist"])
-            return empty_hist, empty_fc, np.nan, empty_acc
+        forecast_df = forecast_df.drop(columns="Pronostico_acum", errors="ignore")
+        cols = [col for col in ("Pronostico_mensual", "IC_lo", "IC_hi") if col in forecast_df.columns]
+        forecast_df[cols] = forecast_df[cols].to_numpy(dtype=float) * factor
+        hist_total = hist_df["ACUM"].iloc[-1] if len(hist_df) > 0 else 0.0
+        forecast_df.insert(
+            2, "Pronostico_acum",
+            (np.cumsum(forecast_df["Pronostico_mensual"].to_numpy(dtype=float)) + hist_total).clip(min=0),
+        )
         
-        y = np.log1p(ts)
+        accuracy_df = accuracy_df.copy()
+        if accuracy_df.empty:
+            return forecast_df, np.nan, accuracy_df
+        accuracy_df["Forecast_hist"] = accuracy_df["Forecast_hist"].to_numpy(dtype=float) * factor
+        smapes = [
+            self.smape(np.array([real]), np.array([pred]))
+            for real, pred in zip(accuracy_df["Real"], accuracy_df["Forecast_hist"])
+        ]
+        return forecast_df, float(np.mean(smapes)), accuracy_df
+    
+    def fit_many(self, series: dict, steps: int, eval_months: int = 6,
+                 chunksize: int = None,
+                 progress: Callable[[int, int], None] = None) -> dict:
+        """Ajusta un lote de series, en paralelo si ``n_jobs > 1``.
+
+        Las series se reparten en tramos (``chunksize`` series por tarea del
+        pool compartido, cuyos procesos no ejecutan el script de la app: ver
+        ``_get_pool``); cada serie se ajusta como en ``fit_forecast`` (con su respaldo
+        ARIMA) y un error solo afecta a su serie: queda con un resultado
+        vacío y el mensaje en ``fit_errors``. Las series que usan un modelo
+        rápido por ``fit_timeout`` o ``deadline`` quedan en ``degraded``.
+
+        Args:
+            series: Llave -> serie mensual de entrenamiento
+            steps: Número de pasos a pronosticar
+            eval_months: Meses del backtest
+            chunksize: Series por tarea; por defecto reparte el lote en
+                ~4 tramos por proceso
+            progress: Se llama con (series_listas, total) al terminar cada tramo
+
+        Returns:
+            Dict llave -> (hist_df, forecast_df, smape_validation, accuracy_df)
+        """
+        self.fit_errors = {}
+        self.degraded = {}
+        items = []
+        for key, ts in series.items():
+            try:
+                items.append((key, ensure_monthly(ts.copy())))
+            except Exception as exc:
+                self.fit_errors[key] = f"{type(exc).__name__}: {exc}"
+                items.append((key, None))
+        total = len(items)
+        unscaled = {}
         
-        smapes = []
-        accuracy_data = []
-        start = max(len(y) - eval_months, 12)
+        # Las series vacías o inválidas, los ajustes ya guardados y los cierres
+        # de mes que se incorporan con parámetros fijos no van al pool
+        pending = []
+        for key, ts in items:
+            if ts is None or ts.empty:
+                continue
+            cached = self._load_fit(ts, steps, eval_months)
+            if cached is None:
+                appended = self._append_fit(ts, steps, eval_months)
+                if appended is not None:
+                    cached, meta = appended
+                    self._save_fit(ts, steps, eval_months, cached, meta)
+            if cached is not None:
+                unscaled[key] = cached
+            else:
+                pending.append((key, ts))
+        done = total - len(pending)
+        if progress is not None and done:
+            progress(done, total)
         
-        if len(y) >= start + 1:
-            for t in range(start, len(y)):
-                y_train = y.iloc[:t]
-                y_test = y.iloc[t:t+1]
-                real_value = float(np.expm1(y_test.values[0]))
-                
-                try:
-                    model = SARIMAX(
-                        y_train,
-                        order=(1, 1, 1),
-                        seasonal_order=(1, 1, 1, 12),
-                        enforce_stationarity=False,
-                        enforce_invertibility=False
-                    )
-                    result = model.fit(disp=False)
-                    pred = result.get_forecast(steps=1).predicted_mean
-                except Exception:
-                    model = ARIMA(y_train, order=(1, 1, 1))
-                    result = model.fit()
-                    pred = result.get_forecast(steps=1).predicted_mean
-                
-                pred_value = float(np.expm1(pred.values[0])) * self.conservative_factor
-                smapes.append(self.smape(
-                    np.array([real_value]),
-                    np.array([pred_value])
-                ))
-                accuracy_data.append({
-                    'FECHA': ts.index[t],
-                    'Real': real_value,
-                    'Forecast_hist': pred_value
-                })
-        
-        smape_validation = float(np.mean(smapes)) if smapes else np.nan
-        accuracy_df = (
-            pd.DataFrame(accuracy_data)
-            if accuracy_data
-            else pd.DataFrame(columns=["FECHA", "Real", "Forecast_hist"])
-        )
+        if chunksize is None:
+            chunksize = max(1, -(-len(pending) // (self.n_jobs * 4)))
+        chunks = [pending[i:i + chunksize] for i in range(0, len(pending), chunksize)]
         
-        def apply_adjustment(arr):
-            return np.expm1(arr) * self.conservative_factor
+        raw = []
+        workers = min(self.n_jobs, len(chunks))
+        if workers > 1:
+            pool = None
+            try:
+                pool = _get_pool(self.n_jobs)
+                futures = [
+                    pool.submit(_fit_series_chunk, chunk, steps, eval_months, self._fit_options())
+                    for chunk in chunks
+                ]
+                for future in as_completed(futures):
+                    chunk_results = future.result()
+                    raw.extend(chunk_results)
+                    done += len(chunk_results)
+                    if progress is not None:
+                        progress(done, total)
+            except (BrokenProcessPool, OSError):
+                _discard_pool(pool)
+                raw, done = [], total - len(pending)
+            except (CancelledError, RuntimeError):
+                # Pool descartado por otra sesión: se ajusta en serie
+                raw, done = [], total - len(pending)
         
-        try:
-            model_full = SARIMAX(
-                y,
-                order=(1, 1, 1),
-                seasonal_order=(1, 1, 1, 12),
-                enforce_stationarity=False,
-                enforce_invertibility=False
+        if not raw and pending:
+            for chunk in chunks:
+                chunk_results = _fit_series_chunk(chunk, steps, eval_months, self._fit_options())
+                raw.extend(chunk_results)
+                done += len(chunk_results)
+                if progress is not None:
+                    progress(done, total)
+        
+        ts_by_key = dict(pending)
+        for key, result, error in raw:
+            if result is None:
+                self.fit_errors[key] = error
+                continue
+            self._save_fit(ts_by_key[key], steps, eval_months, result)
+            unscaled[key] = result
+        
+        results = {}
+        for key, _ in items:
+            if key not in unscaled:
+                results[key] = _empty_result()
+                continue
+            hist_df, forecast_df, accuracy_df, _, _, degraded = unscaled[key]
+            if degraded:
+                self.degraded[key] = degraded
+            forecast_df, smape_validation, accuracy_df = self.scale_forecast(
+                hist_df, forecast_df, accuracy_df
             )
-            result_full = model_full.fit(disp=False)
-            forecast = result_full.get_forecast(steps=steps)
-            
-            mean_forecast = apply_adjustment(forecast.predicted_mean)
-            conf_int = np.expm1(forecast.conf_int(alpha=0.05)) * self.conservative_factor
+            results[key] = (hist_df, forecast_df, smape_validation, accuracy_df)
+        return results
+    
+    def _fit_options(self) -> dict:
+        """Argumentos del engine que afectan al ajuste, para los procesos del pool."""
+        return {
+            'warm_start': self.warm_start,
+            'store': self.store,
+            'sarimax_min_months': self.sarimax_min_months,
+            'sarimax_max_zero_share': self.sarimax_max_zero_share,
+            'sarimax_min_gain': self.sarimax_min_gain,
+            'fit_timeout': self.fit_timeout,
+            'deadline': self.deadline,
+        }
+    
+    def store_key(self, ts: pd.Series, steps: int, eval_months: int) -> str:
+        """Llave en ``store`` del ajuste sin escalar de una serie ya mensualizada."""
+        return fit_key(
+            ts, ENGINE_VERSION, MODEL_ORDER, SEASONAL_ORDER, steps, eval_months, self.warm_start,
+            self.sarimax_min_months, self.sarimax_max_zero_share, self.sarimax_min_gain,
+        )
+    
+    def _load_fit(self, ts: pd.Series, steps: int, eval_months: int) -> tuple:
+        """Busca en ``store`` el ajuste sin escalar de una serie ya mensualizada.
+
+        Una entrada marcada como degradada (un respaldo) no cuenta como ajuste.
+        """
+        if self.store is None or ts.empty:
+            return None
+        cached = self.store.get(self.store_key(ts, steps, eval_months))
+        if cached is None or cached['meta'].get('degraded'):
+            return None
+        accuracy_df = cached['accuracy']
+        if accuracy_df.empty:
+            accuracy_df = pd.DataFrame(columns=["FECHA", "Real", "Forecast_hist"])
+        return (
+            history_frame(ts), cached['forecast'], accuracy_df, cached['params'],
+            cached['meta'].get('model', 'sarimax'), None,
+        )
+    
+    def _save_fit(self, ts: pd.Series, steps: int, eval_months: int, result: tuple,
+                  meta: dict = None) -> None:
+        """Guarda un ajuste sin escalar; sin ``meta`` se registra como ajuste completo.
+
+        Un ajuste degradado por ``fit_timeout`` o ``deadline`` no se guarda:
+        la próxima vez se vuelve a intentar SARIMAX.
+        """
+        if self.store is None or ts.empty:
+            return
+        _, forecast_df, accuracy_df, params, model, degraded = result
+        if degraded:
+            return
+        if meta is None:
+            meta = {'appended': 0, 'base_smape': self._backtest_smape(accuracy_df)}
+        self.store.put(
+            self.store_key(ts, steps, eval_months),
+            forecast_df,
+            accuracy_df,
+            params=params,
+            meta={'last_month': str(ts.index.max().date()), 'steps': steps, 'model': model, **meta},
+        )
+    
+    def _backtest_smape(self, accuracy_df: pd.DataFrame) -> float:
+        if accuracy_df.empty:
+            return np.nan
+        return float(self.smape(accuracy_df["Real"], accuracy_df["Forecast_hist"]))
+    
+    def _append_fit(self, ts: pd.Series, steps: int, eval_months: int) -> tuple:
+        """Incorpora el último mes de ``ts`` al ajuste guardado del mes anterior.
+
+        Cuando cierra un mes, la serie nueva es la anterior más una
+        observación. Si ``store`` tiene el ajuste SARIMAX de la serie sin ese
+        mes, el modelo final se obtiene filtrando la serie completa con los
+        mismos parámetros (sin optimizar) y el backtest reutiliza los orígenes
+        anteriores: el nuevo origen es el primer paso del pronóstico guardado,
+        hecho con esos parámetros sobre esa misma serie. Si el ajuste guardado
+        es un modelo rápido se conserva esa elección y solo se reajusta ese
+        modelo. Una entrada degradada no se extiende. Se reajusta por completo, repitiendo la selección de modelo
+        (devuelve None), tras ``refit_every`` cierres incrementales, si el
+        ajuste guardado era ARIMA o si el SMAPE del backtest supera
+        ``drift_tolerance`` veces el del último ajuste completo.
+
+        Returns:
+            Tuple de (salida de ``_fit_unscaled``, meta para el store) o None
+        """
+        if self.store is None or self.refit_every < 1 or len(ts) < 2:
+            return None
+        previous = self.store.get(self.store_key(ts.iloc[:-1], steps, eval_months))
+        if previous is None or previous['forecast'].empty or previous['meta'].get('degraded'):
+            return None
+        model = previous['meta'].get('model', 'sarimax')
+        if model == 'sarimax' and previous['params'] is None:
+            return None
+        appended = int(previous['meta'].get('appended', 0)) + 1
+        if appended > self.refit_every:
+            return None
         
+        y = np.log1p(ts)
+        try:
+            if model == 'sarimax':
+                mean_log, conf_log = _filter_forecast(y, previous['params'], steps)
+            else:
+                mean_log, conf_log = fast_forecast(model, y, steps)
         except Exception:
-            model_full = ARIMA(y, order=(1, 1, 1))
-            result_full = model_full.fit()
-            forecast = result_full.get_forecast(steps=steps)
-            
-            mean_forecast = apply_adjustment(forecast.predicted_mean)
-            conf_int = np.expm1(forecast.conf_int(alpha=0.05)) * self.conservative_factor
-        
-        future_dates = pd.date_range(
-            ts.index.max() + pd.offsets.MonthBegin(),
-            periods=steps,
-            freq="MS"
-        )
+            return None
         
-        hist_acum = ts.cumsum()
-        hist_df = pd.DataFrame({
-            "FECHA": ts.index,
-            "Mensual": ts.values,
-            "ACUM": hist_acum.values if len(ts) > 0 else []
-        })
+        start = max(len(y) - eval_months, 12)
+        if start < len(y):
+            accuracy_df = previous['accuracy']
+            accuracy_df = accuracy_df[accuracy_df["FECHA"] >= ts.index[start]]
+            new_origin = pd.DataFrame({
+                'FECHA': ts.index[-1:],
+                'Real': [float(ts.iloc[-1])],
+                'Forecast_hist': [float(previous['forecast']["Pronostico_mensual"].iloc[0])],
+            })
+            accuracy_df = pd.concat(
+                [accuracy_df, new_origin] if not accuracy_df.empty else [new_origin],
+                ignore_index=True,
+            )
+        else:
+            accuracy_df = pd.DataFrame(columns=["FECHA", "Real", "Forecast_hist"])
+        
+        base_smape = previous['meta'].get('base_smape')
+        if base_smape is None:
+            base_smape = self._backtest_smape(previous['accuracy'])
+        if np.isfinite(base_smape) and self._backtest_smape(accuracy_df) > base_smape * self.drift_tolerance:
+            return None
         
-        forecast_acum = np.cumsum(mean_forecast) + (
-            hist_acum.iloc[-1] if len(hist_acum) > 0 else 0.0
+        result = (
+            history_frame(ts),
+            forecast_frame(ts, steps, mean_log, conf_log),
+            accuracy_df,
+            previous['params'],
+            model,
+            None,
+        )
+        return result, {'appended': appended, 'base_smape': base_smape}
+    
+    def _backtest_key(self, ts: pd.Series, origin: int, model: str = 'sarimax') -> str:
+        # El pronóstico a un paso desde ``origin`` solo depende de la serie hasta ahí
+        if model != 'sarimax':
+            return fit_key(ts.iloc[:origin], ENGINE_VERSION, model, 'backtest')
+        return fit_key(ts.iloc[:origin], ENGINE_VERSION, MODEL_ORDER, SEASONAL_ORDER, 'backtest', self.warm_start)
+    
+    def _fast_backtest(self, model: str, ts: pd.Series, y: pd.Series, origins: list) -> tuple:
+        """Pronósticos log a un paso de un modelo rápido en cada origen del backtest.
+
+        Los orígenes son independientes entre sí: con ``store`` se leen los ya
+        calculados y solo se ajustan los que faltan.
+
+        Returns:
+            Tuple de (pronósticos o None si el modelo falla en algún origen,
+            ajustes hechos)
+        """
+        keys = [self._backtest_key(ts, t, model) for t in origins]
+        found = self.store.get_backtest(keys) if self.store is not None else {}
+        preds, new = [], []
+        for t, key in zip(origins, keys):
+            if key in found:
+                preds.append(found[key][0])
+                continue
+            try:
+                mean, _ = fast_forecast(model, y.iloc[:t], 1, with_conf=False)
+            except Exception:
+                return None, len(new)
+            preds.append(float(mean[0]))
+            new.append((key, ts.index[t].date(), preds[-1], None))
+        if self.store is not None and new:
+            self.store.put_backtest(new)
+        return preds, len(new)
+    
+    def _sarimax_eligible(self, ts: pd.Series) -> bool:
+        """SARIMAX solo se considera con historia suficiente y pocos meses en cero."""
+        return (
+            len(ts) >= self.sarimax_min_months
+            and float((ts == 0).mean()) <= self.sarimax_max_zero_share
         )
+    
+    def _cached_backtest(self, ts: pd.Series, origins: list) -> tuple:
+        """Pronósticos guardados de los primeros orígenes consecutivos del backtest.
+
+        Solo se reutiliza el tramo inicial sin huecos, para que los orígenes
+        siguientes continúen la cadena de arranque en caliente desde los
+        parámetros del último origen guardado.
+
+        Returns:
+            Tuple de (pronósticos log reutilizados, parámetros del último o None)
+        """
+        if self.store is None or not origins:
+            return [], None
+        keys = [self._backtest_key(ts, t) for t in origins]
+        found = self.store.get_backtest(keys)
+        preds, params = [], None
+        for key in keys:
+            if key not in found:
+                break
+            pred, params = found[key]
+            preds.append(pred)
+        return preds, params
+    
+    def _time_limit(self) -> float:
+        """Segundos disponibles para la etapa SARIMAX de una serie; None sin límite."""
+        limits = []
+        if self.fit_timeout > 0:
+            limits.append(self.fit_timeout)
+        if self.deadline is not None:
+            limits.append(self.deadline - time.time())
+        return min(limits) if limits else None
+    
+    def _sarimax_backtest(self, ts: pd.Series, y: pd.Series, origins: list,
+                          time_limit: float = None) -> tuple:
+        """Backtest SARIMAX, leyendo del ``store`` los orígenes ya calculados.
+
+        Los ajustes nuevos se reparten en tramos según ``n_jobs``: en el pool
+        o, con ``time_limit``, en procesos que se terminan al agotarlo (ver
+        ``_run_fits_with_deadline``).
+
+        Returns:
+            Tuple de (pronósticos log del backtest, parámetros del último
+            origen o None)
+
+        Raises:
+            FitTimeout: si se agota ``time_limit``
+        """
+        cached_preds, start_params = self._cached_backtest(ts, origins)
+        new_origins = origins[len(cached_preds):]
+        if time_limit is None:
+            new_preds, new_params = self._run_fits(y, new_origins, start_params)
+        elif not new_origins:
+            new_preds, new_params = [], []
+        else:
+            new_preds, new_params = self._run_fits_with_deadline(y, new_origins, start_params, time_limit)
+        if self.store is not None and new_origins:
+            self.store.put_backtest([
+                (self._backtest_key(ts, t), ts.index[t].date(), pred, fitted)
+                for t, pred, fitted in zip(new_origins, new_preds, new_params)
+            ])
+        return cached_preds + new_preds, new_params[-1] if new_params else start_params
+    
+    def _sarimax_final(self, y: pd.Series, steps: int, start_params=None,
+                       time_limit: float = None) -> tuple:
+        """Modelo final SARIMAX, arrancando (con ``warm_start``) desde el último origen.
+
+        Returns:
+            Tuple de (media, intervalo, parámetros) en escala log
+
+        Raises:
+            FitTimeout: si se agota ``time_limit``
+        """
+        start_params = start_params if self.warm_start else None
+        if time_limit is None:
+            mean, conf, params, fit_stats = _forecast_log(y, steps, start_params=start_params)
+        else:
+            mean, conf, params, fit_stats = _run_with_deadline(
+                _forecast_log, (y, steps, True, start_params), time_limit, self.n_jobs
+            )
+        for key in fit_stats:
+            self.fit_stats[key] += fit_stats[key]
+        return mean, conf, params
+    
+    def _fit_unscaled(self, ts: pd.Series, steps: int, eval_months: int) -> tuple:
+        """Selecciona el modelo y ajusta el backtest y el pronóstico de una serie ya mensualizada.
+
+        Primero se evalúan en el backtest los modelos rápidos
+        (``FAST_MODELS``, milisegundos por ajuste). SARIMAX solo se ajusta si
+        la serie es elegible (``sarimax_min_months`` y
+        ``sarimax_max_zero_share``) y se usa si su SMAPE mejora al del mejor
+        modelo rápido en al menos ``sarimax_min_gain``. Sin orígenes de
+        backtest se usa SARIMAX si es elegible y, si no, el primero de
+        ``FAST_MODELS``. El modelo final SARIMAX solo se ajusta si SARIMAX
+        gana en el backtest. Con ``store`` los orígenes del backtest ya
+        calculados se leen del caché y solo se ajustan los nuevos
+        (típicamente el mes recién cerrado). Si la etapa SARIMAX supera
+        ``fit_timeout`` o no queda presupuesto hasta ``deadline``, se usa el
+        mejor modelo rápido (el ingenuo estacional si ninguno tiene backtest)
+        y el resultado queda degradado.
+
+        Returns:
+            Tuple de (hist_df, forecast_df, accuracy_df, parámetros SARIMAX o
+            None, modelo, degradación: None, 'tiempo' o 'presupuesto') sin
+            escalar
+        """
+        y = np.log1p(ts)
+        
+        start = max(len(y) - eval_months, 12)
+        origins = list(range(start, len(y)))
+        real_log = y.to_numpy()[origins]
+        
+        candidates, scores, fast_fits = {}, {}, 0
+        for name in FAST_MODELS:
+            preds, fitted = self._fast_backtest(name, ts, y, origins)
+            fast_fits += fitted
+            if preds is None:
+                continue
+            candidates[name] = preds
+            score = self.smape(np.expm1(real_log), np.expm1(np.asarray(preds, dtype=float))) if origins else np.nan
+            if np.isfinite(score):
+                scores[name] = score
+        model = min(scores, key=scores.get) if scores else FAST_MODELS[0]
+        
+        self.fit_stats = {'fits': 0, 'iterations': 0, 'cold_retries': 0}
+        params, degraded = None, None
+        time_limit = self._time_limit() if self._sarimax_eligible(ts) else None
+        if time_limit is not None and time_limit <= 0:
+            degraded = 'presupuesto'
+        elif self._sarimax_eligible(ts):
+            started = time.monotonic()
+            try:
+                sarimax_preds, last_params = self._sarimax_backtest(ts, y, origins, time_limit)
+                sarimax_score = self.smape(
+                    np.expm1(real_log), np.expm1(np.asarray(sarimax_preds, dtype=float))
+                ) if origins else np.nan
+                best_fast = scores.get(model, np.inf)
+                if not origins or sarimax_score * (1 + self.sarimax_min_gain) <= best_fast:
+                    remaining = None if time_limit is None else time_limit - (time.monotonic() - started)
+                    mean_log, conf_log, params = self._sarimax_final(y, steps, last_params, remaining)
+                    model = 'sarimax'
+                    candidates[model] = sarimax_preds
+            except FitTimeout:
+                # Se agotó el límite más estricto: el del ajuste o el del presupuesto
+                degraded = 'tiempo' if time_limit == self.fit_timeout else 'presupuesto'
+        
+        if model != 'sarimax':
+            params = None
+            try:
+                mean_log, conf_log = fast_forecast(model, y, steps)
+            except Exception:
+                model = FAST_MODELS[0]
+                mean_log, conf_log = fast_forecast(model, y, steps)
+            fast_fits += 1
+        self.fit_stats['fast_fits'] = fast_fits
+        
+        backtest_preds = candidates.get(model, [])
+        if len(backtest_preds) != len(origins):
+            origins = []
+        accuracy_df = pd.DataFrame({
+            'FECHA': ts.index[origins],
+            'Real': np.expm1(y.to_numpy()[origins]),
+            'Forecast_hist': np.expm1(np.asarray(backtest_preds, dtype=float)),
+        }) if origins else pd.DataFrame(columns=["FECHA", "Real", "Forecast_hist"])
+        
+        # Pronóstico sin escalar; el factor conservador se aplica después
+        forecast_df = forecast_frame(ts, steps, mean_log, conf_log)
+        params = None if params is None else [float(value) for value in params]
+        return history_frame(ts), forecast_df, accuracy_df, params, model, degraded
+    
+    def fit_forecast(self, ts: pd.Series, steps: int, eval_months: int = 6) -> tuple:
+        """Selecciona y ajusta el modelo (rápido o SARIMAX/ARIMA) y genera pronóstico.
+
+        La selección por niveles se describe en ``_fit_unscaled``. Con ``store`` el ajuste sin escalar se busca primero en el caché
+        persistente y, si no está, se guarda después de ajustar. Si la serie
+        es la de un ajuste guardado más un mes cerrado, ese mes se incorpora
+        con los parámetros guardados en lugar de reajustar (ver
+        ``_append_fit``). ``last_degraded`` indica si la serie usó un modelo
+        rápido por ``fit_timeout`` o ``deadline``.
+
+        Returns:
+            Tuple de (hist_df, forecast_df, smape_validation, accuracy_df) donde
+            accuracy_df contiene los pronósticos históricos rolling vs real.
+        """
+        if steps < 1:
+            steps = 1
         
-        forecast_df = pd.DataFrame({
-            "FECHA": future_dates,
-            "Pronostico_mensual": mean_forecast.values.clip(min=0),
-            "Pronostico_acum": forecast_acum.values.clip(min=0),
-            "IC_lo": conf_int.iloc[:, 0].values.clip(min=0),
-            "IC_hi": conf_int.iloc[:, 1].values.clip(min=0)
-        })
+        ts = ensure_monthly(ts.copy())
+        
+        if ts.empty:
+            return _empty_result()
         
+        result = self._load_fit(ts, steps, eval_months)
+        self.last_update = 'store'
+        if result is None:
+            appended = self._append_fit(ts, steps, eval_months)
+            if appended is not None:
+                result, meta = appended
+                self.last_update = 'append'
+            else:
+                result, meta = self._fit_unscaled(ts, steps, eval_months), None
+                self.last_update = 'fit'
+            self._save_fit(ts, steps, eval_months, result, meta)
+        if self.last_update != 'fit':
+            self.fit_stats = {'fits': 0, 'iterations': 0, 'cold_retries': 0, 'fast_fits': 0}
+        
+        hist_df, forecast_df, accuracy_df, self.last_params, self.last_model, self.last_degraded = result
+        forecast_df, smape_validation, accuracy_df = self.scale_forecast(
+            hist_df, forecast_df, accuracy_df
+        )
         return hist_df, forecast_df, smape_validation, accuracy_df
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""Caché persistente en SQLite de ajustes SARIMAX.
+
+Cada ajuste se guarda bajo un hash del contenido de la serie de entrenamiento,
+la especificación del modelo y la versión del motor, con los parámetros
+ajustados, el pronóstico, los intervalos y el backtest sin escalar. Un proceso
+nuevo (deploy, reinicio u otro worker) encuentra los ajustes ya hechos en
+lugar de reajustar cada modelo. El archivo se acota por tamaño: al superar el
+límite se descartan los ajustes usados hace más tiempo.
+
+Aparte se guardan los pronósticos del backtest por origen: la predicción a un
+paso desde un origen solo depende de la serie hasta ese origen, así que cada
+llamada calcula únicamente los orígenes nuevos.
+
+Varias sesiones y procesos comparten el archivo: se usa el modo WAL (las
+lecturas no esperan a las escrituras) y las lecturas no abren transacciones
+de escritura; la hora de acceso para el descarte se marca en un solo UPDATE
+por lote y se omite si la base está ocupada.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_TABLES = ("forecasts", "backtests")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+# Llaves por consulta ``IN (...)``, bajo el límite de parámetros de SQLite
+_KEYS_PER_QUERY = 500
+# Espera máxima (ms) para marcar la hora de acceso; ocupada la base, se omite
+_TOUCH_TIMEOUT_MS = 100
+
+
+def _key_chunks(keys: list) -> list:
+    return [keys[i:i + _KEYS_PER_QUERY] for i in range(0, len(keys), _KEYS_PER_QUERY)]
+
+
+def fit_key(ts: pd.Series, *spec) -> str:
+    """Hash SHA-256 de una serie mensual (fechas y valores) y la especificación del ajuste."""
+    digest = hashlib.sha256()
+    digest.update(np.asarray(ts.index.asi8, dtype=np.int64).tobytes())
+    digest.update(np.asarray(ts.to_numpy(dtype=float), dtype=np.float64).tobytes())
+    digest.update(json.dumps([str(part) for part in spec]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _frame_to_json(df: pd.DataFrame) -> dict:
+    data = {}
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            data[col] = [str(value) for value in df[col]]
+        else:
+            data[col] = [float(value) for value in df[col]]
+    return {"columns": list(df.columns), "data": data}
+
+
+def _frame_from_json(payload: dict, date_columns=("FECHA",)) -> pd.DataFrame:
+    data = {}
+    for col in payload["columns"]:
+        values = payload["data"][col]
+        data[col] = pd.to_datetime(values, format="ISO8601") if col in date_columns else np.asarray(values, dtype=float)
+    return pd.DataFrame(data, columns=payload["columns"])
+
+
+def _fit_from_json(raw: str) -> dict:
+    payload = json.loads(raw)
+    return {
+        "forecast": _frame_from_json(payload["forecast"]),
+        "accuracy": _frame_from_json(payload["accuracy"]),
+        "params": payload.get("params"),
+        "meta": payload.get("meta", {}),
+    }
+
+
+class ForecastStore:
+    """Almacén SQLite de ajustes, acotado por tamaño con descarte LRU."""
+
+    def __init__(self, path: str | os.PathLike, max_bytes: int = 64 * 1024 * 1024,
+                 enabled: bool = True):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+        # El esquema y el modo WAL se preparan en la primera conexión
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                with conn:
+                    for table in _TABLES:
+                        conn.execute(_SCHEMA.format(table=table))
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._ready = True
+        return conn
+
+    def _read(self, conn: sqlite3.Connection, table: str, keys: list) -> dict:
+        """Payloads guardados en ``table`` para ``keys`` (solo las encontradas), sin escribir."""
+        rows = {}
+        for chunk in _key_chunks(list(dict.fromkeys(keys))):
+            rows.update(conn.execute(
+                f"SELECT key, payload FROM {table} WHERE key IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall())
+        return rows
+
+    def _touch(self, conn: sqlite3.Connection, table: str, keys: list) -> None:
+        """Marca la hora de acceso de ``keys`` para el descarte LRU; si la base está ocupada se omite."""
+        if not keys:
+            return
+        now = time.time()
+        try:
+            conn.execute(f"PRAGMA busy_timeout = {_TOUCH_TIMEOUT_MS}")
+            with conn:
+                for chunk in _key_chunks(list(keys)):
+                    conn.execute(
+                        f"UPDATE {table} SET accessed_at = ? WHERE key IN ({', '.join('?' * len(chunk))})",
+                        [now, *chunk],
+                    )
+        except sqlite3.OperationalError:
+            pass
+
+    def get(self, key: str) -> dict | None:
+        """Retorna el ajuste guardado bajo ``key`` o None si no existe.
+
+        Returns:
+            dict con ``forecast`` y ``accuracy`` (DataFrames sin escalar),
+            ``params`` (lista o None) y ``meta``
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list) -> dict:
+        """Ajustes guardados para varias llaves, con una sola conexión.
+
+        Returns:
+            Dict llave -> ajuste (como en ``get``) con solo las llaves encontradas
+        """
+        if not self.enabled or not keys:
+            return {}
+        try:
+            with closing(self._connect()) as conn:
+                rows = self._read(conn, "forecasts", keys)
+                self._touch(conn, "forecasts", list(rows))
+            return {key: _fit_from_json(rows[key]) for key in keys if key in rows}
+        except (sqlite3.Error, OSError, ValueError, KeyError):
+            return {}
+
+    def put(self, key: str, forecast_df: pd.DataFrame, accuracy_df: pd.DataFrame,
+            params=None, meta: dict | None = None) -> bool:
+        """Guarda un ajuste y descarta los menos usados si se supera ``max_bytes``.
+
+        Returns:
+            True si el ajuste quedó guardado, False si no fue posible
+        """
+        if not self.enabled:
+            return False
+        payload = json.dumps({
+            "forecast": _frame_to_json(forecast_df),
+            "accuracy": _frame_to_json(accuracy_df),
+            "params": None if params is None else [float(value) for value in params],
+            "meta": meta or {},
+        })
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO forecasts (key, payload, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now, now),
+                )
+                self._evict(conn)
+            return True
+        except (sqlite3.Error, OSError):
+            return False
+
+    def get_backtest(self, keys: list) -> dict:
+        """Pronósticos del backtest guardados para las llaves de origen dadas.
+
+        Returns:
+            Dict llave -> (pronóstico log a un paso, parámetros o None) con
+            solo las llaves encontradas
+        """
+        if not self.enabled or not keys:
+            return {}
+        try:
+            with closing(self._connect()) as conn:
+                rows = self._read(conn, "backtests", keys)
+                self._touch(conn, "backtests", list(rows))
+            found = {}
+            for key in keys:
+                if key in rows:
+                    payload = json.loads(rows[key])
+                    found[key] = (float(payload["pred_log"]), payload.get("params"))
+            return found
+        except (sqlite3.Error, OSError, ValueError, KeyError):
+            return {}
+
+    def put_backtest(self, entries: list) -> bool:
+        """Guarda pronósticos del backtest, uno por origen.
+
+        Args:
+            entries: Lista de (llave, FECHA del mes pronosticado, pronóstico
+                log a un paso, parámetros o None)
+        """
+        if not self.enabled or not entries:
+            return False
+        now = time.time()
+        rows = []
+        for key, fecha, pred_log, params in entries:
+            payload = json.dumps({
+                "FECHA": str(fecha),
+                "pred_log": float(pred_log),
+                "params": None if params is None else [float(value) for value in params],
+            })
+            rows.append((key, payload, len(payload), now, now))
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO backtests (key, payload, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict(conn)
+            return True
+        except (sqlite3.Error, OSError):
+            return False
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = sum(
+            conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+            for table in _TABLES
+        )
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            " UNION ALL ".join(
+                f"SELECT '{table}', key, size, accessed_at FROM {table}" for table in _TABLES
+            ) + " ORDER BY accessed_at ASC"
+        ).fetchall()
+        stale = {table: [] for table in _TABLES}
+        for table, key, size, _ in rows:
+            if total <= self.max_bytes:
+                break
+            stale[table].append((key,))
+            total -= size
+        for table, keys in stale.items():
+            conn.executemany(f"DELETE FROM {table} WHERE key = ?", keys)
+
+    def stats(self) -> dict:
+        """Número de ajustes y de orígenes del backtest y bytes ocupados por los payloads."""
+        empty = {"entries": 0, "backtests": 0, "bytes": 0}
+        if not self.enabled or not self.path.exists():
+            return empty
+        try:
+            with closing(self._connect()) as conn:
+                counts = {
+                    table: conn.execute(
+                        f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}"
+                    ).fetchone()
+                    for table in _TABLES
+                }
+            return {
+                "entries": int(counts["forecasts"][0]),
+                "backtests": int(counts["backtests"][0]),
+                "bytes": int(sum(size for _, size in counts.values())),
+            }
+        except sqlite3.Error:
+            return empty
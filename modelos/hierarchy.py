@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Pronóstico jerárquico de abajo hacia arriba (bottom-up).
+
+El consolidado es la suma de las líneas: en lugar de ajustar un modelo más
+sobre la serie total, se suman los ajustes (sin escalar) de las hojas, que son
+los mismos que usan el resumen por línea y el selector de línea.
+"""
+import numpy as np
+import pandas as pd
+
+from modelos.forecast_engine import history_frame
+
+FORECAST_COLUMNS = ("Pronostico_mensual", "IC_lo", "IC_hi")
+
+
+def bottom_up_forecast(leaf_forecasts: list, fechas) -> pd.DataFrame:
+    """Suma los pronósticos de las hojas en las fechas del nodo padre.
+
+    Una hoja cuyo entrenamiento termina antes que el del padre (ceros finales
+    recortados) aporta solo los meses que su pronóstico cubre; los intervalos
+    se suman como cotas, igual que los pronósticos.
+
+    Args:
+        leaf_forecasts: ``forecast_df`` sin escalar de cada hoja
+        fechas: Meses a pronosticar del padre
+
+    Returns:
+        DataFrame con FECHA, Pronostico_mensual, IC_lo e IC_hi
+    """
+    fechas = pd.DatetimeIndex(fechas)
+    total = np.zeros((len(fechas), len(FORECAST_COLUMNS)))
+    for forecast_df in leaf_forecasts:
+        if forecast_df.empty:
+            continue
+        aligned = (
+            forecast_df.set_index("FECHA")[list(FORECAST_COLUMNS)]
+            .reindex(fechas, fill_value=0.0)
+        )
+        total += aligned.to_numpy(dtype=float)
+    result = pd.DataFrame(total, columns=list(FORECAST_COLUMNS))
+    result.insert(0, "FECHA", fechas)
+    return result
+
+
+def bottom_up_accuracy(leaf_accuracies: list) -> pd.DataFrame:
+    """Backtest del padre: suma de real y pronóstico de las hojas por origen.
+
+    Se usan las hojas con backtest y solo los orígenes comunes a todas ellas,
+    de modo que real y pronóstico cubren las mismas hojas.
+    """
+    frames = [acc.set_index("FECHA")[["Real", "Forecast_hist"]].astype(float)
+              for acc in leaf_accuracies if not acc.empty]
+    if not frames:
+        return pd.DataFrame(columns=["FECHA", "Real", "Forecast_hist"])
+    common = frames[0].index
+    for frame in frames[1:]:
+        common = common.intersection(frame.index)
+    total = sum(frame.loc[common] for frame in frames)
+    return total.rename_axis("FECHA").reset_index()
+
+
+def reconcile_bottom_up(parent_train: pd.Series, leaf_fits: list, steps: int) -> tuple:
+    """Pronóstico del padre a partir de los ajustes de sus hojas.
+
+    Args:
+        parent_train: Serie de entrenamiento del padre (para el histórico y
+            las fechas del pronóstico)
+        leaf_fits: Lista de (hist_df, forecast_df, accuracy_df) sin escalar
+        steps: Meses a pronosticar desde el mes siguiente a ``parent_train``
+
+    Returns:
+        Tuple de (hist_df, forecast_df, accuracy_df) sin escalar, como los de
+        ``ForecastEngine`` antes de ``scale_forecast``
+    """
+    fechas = pd.date_range(
+        parent_train.index.max() + pd.offsets.MonthBegin(),
+        periods=steps,
+        freq="MS",
+    )
+    forecast_df = bottom_up_forecast([fc for _, fc, _ in leaf_fits], fechas)
+    accuracy_df = bottom_up_accuracy([acc for _, _, acc in leaf_fits])
+    return history_frame(parent_train), forecast_df, accuracy_df
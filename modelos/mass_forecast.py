@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Pronóstico masivo de cada celda Suc_agrupada × LINEA_PLUS.
+
+Los mapas de calor por sucursal reparten la métrica de cada línea entre sus
+sucursales. Sin pronósticos por celda el reparto usa el peso presupuestal;
+este trabajo, que corre fuera de la app, ajusta la serie de cada celda (cientos
+a miles) con ``ForecastEngine.fit_many`` en tramos sobre el pool de procesos y
+deja el pronóstico sin escalar en el ``ForecastStore``, donde la app lo lee
+sin ajustar nada.
+
+Cada celda queda bajo la llave del ajuste del engine (el hash de su serie de
+entrenamiento): al cambiar los datos solo se reajustan las celdas cuya serie
+cambió, y una corrida interrumpida continúa donde quedó. Si un ajuste falla o
+se agota el tiempo del trabajo, la celda guarda un respaldo (el pronóstico
+ingenuo estacional o el modelo rápido) marcado como degradado: la app no lo
+usa y se reintenta en la corrida siguiente.
+
+Uso:
+    python -m modelos.mass_forecast --workers 4 --time-budget 1800
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    FORECAST_STORE_MAX_MB,
+    FORECAST_STORE_PATH,
+    MASS_FORECAST_CHUNK_SIZE,
+    MASS_FORECAST_TIME_BUDGET,
+    MASS_FORECAST_WORKERS,
+)
+from modelos.fast_models import fast_forecast
+from modelos.forecast_engine import ForecastEngine, forecast_frame
+from modelos.forecast_store import ForecastStore
+from utils.date_utils import ensure_monthly
+
+CELL_DIMENSIONS = ('Suc_agrupada', 'LINEA_PLUS')
+# Mismo horizonte y backtest que los pronósticos por línea de la app
+CELL_FORECAST_STEPS = 12
+CELL_EVAL_MONTHS = 6
+FALLBACK_MODEL = 'naive_estacional'
+# Degradación de las celdas guardadas como respaldo: el engine no las sirve como ajuste
+FALLBACK_STATUS = 'respaldo'
+
+
+def cell_training_series(df: pd.DataFrame, ref_year: int, fecha_corte: pd.Timestamp) -> dict:
+    """Series de entrenamiento de cada celda, limpias y sin el mes parcial.
+
+    La app y el trabajo masivo construyen las celdas con esta función, así que
+    la misma data produce las mismas llaves en el store.
+
+    Returns:
+        Dict (Suc_agrupada, LINEA_PLUS) -> serie mensual; se omiten las celdas
+        sin entrenamiento
+    """
+    required = {*CELL_DIMENSIONS, 'FECHA', 'IMP_PRIMA'}
+    if df.empty or not required.issubset(df.columns):
+        return {}
+    engine = ForecastEngine()
+    fecha_corte = pd.Timestamp(fecha_corte)
+    prima = df.groupby([*CELL_DIMENSIONS, 'FECHA'], observed=True)['IMP_PRIMA'].sum()
+    cells = {}
+    for cell, serie in prima.groupby(level=[0, 1], observed=True):
+        serie = serie.droplevel([0, 1]).sort_index().astype(float)
+        serie_clean = engine.sanitize_series(serie, ref_year)
+        serie_train, _, _ = engine.split_series_exclude_partial(serie_clean, ref_year, fecha_corte)
+        if not serie_train.empty:
+            cells[cell] = serie_train
+    return cells
+
+
+def cell_key(ts: pd.Series, engine: ForecastEngine, steps: int = CELL_FORECAST_STEPS,
+             eval_months: int = CELL_EVAL_MONTHS) -> str:
+    """Llave en el store del pronóstico de una celda: la del ajuste de ``engine``."""
+    return engine.store_key(ensure_monthly(ts.copy()), steps, eval_months)
+
+
+def fallback_forecast(ts: pd.Series, steps: int = CELL_FORECAST_STEPS) -> pd.DataFrame:
+    """Pronóstico ingenuo estacional sin escalar, respaldo de una celda."""
+    mean_log, conf_log = fast_forecast(FALLBACK_MODEL, np.log1p(ts), steps)
+    return forecast_frame(ts, steps, mean_log, conf_log)
+
+
+def run_mass_forecast(cells: dict, engine: ForecastEngine, steps: int = CELL_FORECAST_STEPS,
+                      eval_months: int = CELL_EVAL_MONTHS, chunk_size: int = None,
+                      time_budget: float = None,
+                      progress: Callable[[int, int], None] = None) -> dict:
+    """Ajusta y guarda el pronóstico de cada celda.
+
+    Las celdas ya guardadas con un ajuste completo se omiten. Las demás se
+    ajustan en tramos de ``chunk_size`` con ``engine.fit_many`` (en paralelo
+    si ``engine.n_jobs > 1``), que guarda cada ajuste completo en el store.
+    ``time_budget`` se aplica como ``engine.deadline``: dentro de un tramo,
+    las celdas que lo agotan usan el mejor modelo rápido, y las de los tramos
+    que no alcanzan a empezar el ingenuo estacional, igual que las que fallan.
+    Esos respaldos se guardan marcados y se reintentan en la corrida siguiente.
+
+    Args:
+        cells: Salida de ``cell_training_series``
+        engine: Motor con ``store`` y ``conservative_factor=1.0``
+        chunk_size: Celdas por tramo. Por defecto ``MASS_FORECAST_CHUNK_SIZE``.
+        time_budget: Segundos máximos de ajuste (0 o None = sin límite). Por
+            defecto ``MASS_FORECAST_TIME_BUDGET``.
+        progress: Se llama con (celdas_listas, total) al terminar cada tramo
+
+    Returns:
+        Dict con el total de ``celdas``, cuántas estaban ``guardadas``, cuántas
+        se ``ajustaron`` y cuántas quedaron con ``respaldo``, los ``errores``
+        por celda y los ``segundos`` de la corrida
+    """
+    store = engine.store
+    chunk_size = max(1, int(MASS_FORECAST_CHUNK_SIZE if chunk_size is None else chunk_size))
+    time_budget = MASS_FORECAST_TIME_BUDGET if time_budget is None else time_budget
+    start = time.monotonic()
+    report = {'celdas': len(cells), 'guardadas': 0, 'ajustadas': 0, 'respaldo': 0,
+              'errores': {}, 'segundos': 0.0}
+
+    keys = {cell: cell_key(ts, engine, steps, eval_months) for cell, ts in cells.items()}
+    stored = store.get_many(list(keys.values()))
+    pending = []
+    for cell, ts in cells.items():
+        cached = stored.get(keys[cell])
+        if cached is not None and not cached['meta'].get('degraded'):
+            report['guardadas'] += 1
+        else:
+            pending.append((cell, ts))
+    done = report['guardadas']
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+
+    def save_fallback(cell, forecast_df, model, error=None):
+        if error is not None:
+            report['errores'][cell] = error
+        store.put(
+            keys[cell],
+            forecast_df,
+            pd.DataFrame(columns=['FECHA', 'Real', 'Forecast_hist']),
+            meta={'model': model, 'degraded': FALLBACK_STATUS},
+        )
+        report['respaldo'] += 1
+
+    previous_deadline = engine.deadline
+    if time_budget:
+        engine.deadline = time.time() + time_budget
+    try:
+        for position, chunk in enumerate(chunks):
+            if time_budget and time.monotonic() - start >= time_budget:
+                for cell, ts in (item for rest in chunks[position:] for item in rest):
+                    save_fallback(cell, fallback_forecast(ts, steps), FALLBACK_MODEL)
+                break
+            fitted = engine.fit_many(dict(chunk), steps=steps, eval_months=eval_months)
+            for cell, ts in chunk:
+                _, forecast_df, _, _ = fitted[cell]
+                if cell in engine.fit_errors or forecast_df.empty:
+                    error = engine.fit_errors.get(cell, 'sin pronóstico')
+                    save_fallback(cell, fallback_forecast(ts, steps), FALLBACK_MODEL, error)
+                elif cell in engine.degraded:
+                    # El engine no guarda los ajustes degradados: se guarda el
+                    # modelo rápido como respaldo
+                    save_fallback(cell, forecast_df.drop(columns='Pronostico_acum'), 'rapido')
+                else:
+                    report['ajustadas'] += 1
+            done += len(chunk)
+            if progress is not None:
+                progress(done, len(cells))
+    finally:
+        engine.deadline = previous_deadline
+
+    report['segundos'] = time.monotonic() - start
+    return report
+
+
+def load_cell_forecasts(cells: dict, engine: ForecastEngine, steps: int = CELL_FORECAST_STEPS,
+                        eval_months: int = CELL_EVAL_MONTHS) -> dict:
+    """Pronósticos sin escalar guardados en ``engine.store``; no ajusta nada.
+
+    Returns:
+        Dict celda -> forecast_df, solo con las celdas con un ajuste completo
+        (sin los respaldos)
+    """
+    keys = {cell: cell_key(ts, engine, steps, eval_months) for cell, ts in cells.items()}
+    stored = engine.store.get_many(list(keys.values()))
+    return {
+        cell: stored[key]['forecast'] for cell, key in keys.items()
+        if key in stored and not stored[key]['meta'].get('degraded')
+    }
+
+
+def cell_window_forecast(df_ventana: pd.DataFrame, df_celdas: pd.DataFrame,
+                         cell_forecasts: dict) -> pd.Series:
+    """Pronóstico de cada celda de ``df_celdas`` en los meses de la ventana.
+
+    Suma el pronóstico guardado de la celda en los meses que cubre y la
+    producción real en los demás (meses cerrados). Una celda sin historia
+    (ausente de ``cell_forecasts``) aporta solo su producción real; una celda
+    con historia pero sin pronóstico guardado queda en NaN.
+    """
+    real = df_ventana.groupby([*CELL_DIMENSIONS, 'FECHA'], observed=True)['IMP_PRIMA'].sum()
+    real_por_celda = {}
+    for (sucursal, linea, fecha), valor in real.items():
+        real_por_celda.setdefault((sucursal, linea), {})[pd.Timestamp(fecha)] = float(valor)
+    meses = sorted(set(pd.to_datetime(df_ventana['FECHA'])))
+
+    valores = []
+    for celda in zip(*(df_celdas[col] for col in CELL_DIMENSIONS)):
+        reales = real_por_celda.get(celda, {})
+        if celda not in cell_forecasts:
+            valores.append(sum(reales.values()))
+            continue
+        forecast_df = cell_forecasts[celda]
+        if forecast_df is None:
+            valores.append(np.nan)
+            continue
+        pronostico = {
+            pd.Timestamp(fecha): float(valor)
+            for fecha, valor in zip(forecast_df['FECHA'], forecast_df['Pronostico_mensual'])
+        }
+        valores.append(sum(pronostico.get(mes, reales.get(mes, 0.0)) for mes in meses))
+    return pd.Series(valores, index=df_celdas.index, dtype=float)
+
+
+def main() -> None:
+    from utils.data_loader import load_data_and_cutoff
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=MASS_FORECAST_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=MASS_FORECAST_CHUNK_SIZE)
+    parser.add_argument('--time-budget', type=float, default=MASS_FORECAST_TIME_BUDGET,
+                        help='Segundos máximos de ajuste (0 = sin límite)')
+    parser.add_argument('--anio', type=int, default=None,
+                        help='Año de análisis (por defecto el de la fecha de corte)')
+    args = parser.parse_args()
+
+    df, fecha_corte = load_data_and_cutoff(aggregate=True)
+    ref_year = args.anio or fecha_corte.year
+    cells = cell_training_series(df, ref_year, fecha_corte)
+    store = ForecastStore(FORECAST_STORE_PATH, max_bytes=int(FORECAST_STORE_MAX_MB * 1024 * 1024))
+    engine = ForecastEngine(conservative_factor=1.0, n_jobs=args.workers, store=store)
+    print(f"{len(cells)} celdas Suc_agrupada × LINEA_PLUS | corte {fecha_corte.date()} | año {ref_year}")
+
+    report = run_mass_forecast(
+        cells,
+        engine,
+        chunk_size=args.chunk_size,
+        time_budget=args.time_budget,
+        progress=lambda done, total: print(f"  {done}/{total} celdas", flush=True),
+    )
+    print(
+        f"Guardadas: {report['guardadas']} | ajustadas: {report['ajustadas']} | "
+        f"respaldo: {report['respaldo']} | {report['segundos']:.1f}s"
+    )
+    for cell, error in report['errores'].items():
+        print(f"  {' / '.join(str(part) for part in cell)}: {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""Utilidades compartidas por las pruebas de pronósticos."""
+
+import numpy as np
+import pandas as pd
+
+
+def monthly_series(periods: int = 40, seed: int = 0, start: str = '2018-01-01',
+                   scale: float = 1e9) -> pd.Series:
+    """Serie mensual de primas con estacionalidad anual y ruido log-normal reproducible."""
+    rng = np.random.default_rng(seed)
+    fechas = pd.date_range(start, periods=periods, freq='MS')
+    estacional = 1 + 0.3 * np.sin(np.arange(periods) / 12 * 2 * np.pi)
+    return pd.Series(scale * estacional * np.exp(rng.normal(0, 0.08, periods)), index=fechas)
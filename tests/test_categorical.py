@@ -0,0 +1,54 @@
+import unittest
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / 'utils' / 'categorical.py'
+SPEC = spec_from_file_location('utils.categorical', MODULE_PATH)
+categorical = module_from_spec(SPEC)
+assert SPEC.loader is not None
+SPEC.loader.exec_module(categorical)
+
+
+class CategoricalEncodingTests(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'LINEA_PLUS': ['SOAT', 'AUTOS', 'FIANZAS', 'AUTOS', None],
+            'Suc_agrupada': ['VALLE', 'BOGOTÁ', 'VALLE', 'COSTA', 'COSTA'],
+            'IMP_PRIMA': [1.0, 2.0, 3.0, 4.0, 5.0],
+        })
+
+    def test_dimensions_are_encoded_with_sorted_categories(self):
+        df = categorical.encode_dimensions(self.df.copy())
+
+        self.assertIsInstance(df['LINEA_PLUS'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df['LINEA_PLUS'].cat.categories), ['AUTOS', 'FIANZAS', 'SOAT'])
+        self.assertTrue(pd.isna(df['LINEA_PLUS'].iloc[4]))
+        self.assertEqual(df['IMP_PRIMA'].dtype, np.float64)
+
+        totals = df.groupby('Suc_agrupada', observed=True)['IMP_PRIMA'].sum()
+        self.assertEqual(list(totals.index), ['BOGOTÁ', 'COSTA', 'VALLE'])
+
+    def test_code_masks_match_string_comparisons(self):
+        encoded = categorical.encode_dimensions(self.df.copy())
+        for frame in (self.df, encoded):
+            with self.subTest(dtype=str(frame['LINEA_PLUS'].dtype)):
+                np.testing.assert_array_equal(
+                    categorical.eq_mask(frame['LINEA_PLUS'], 'AUTOS'),
+                    [False, True, False, True, False],
+                )
+                np.testing.assert_array_equal(
+                    categorical.eq_mask(frame['LINEA_PLUS'], 'VIDA'),
+                    [False] * 5,
+                )
+                np.testing.assert_array_equal(
+                    categorical.isin_mask(frame['Suc_agrupada'], ['COSTA', 'VALLE', 'SUR']),
+                    [True, False, True, True, True],
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
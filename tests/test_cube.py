@@ -0,0 +1,54 @@
+import unittest
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / 'utils' / 'cube.py'
+SPEC = spec_from_file_location('utils.cube', MODULE_PATH)
+cube_module = module_from_spec(SPEC)
+assert SPEC.loader is not None
+SPEC.loader.exec_module(cube_module)
+
+build_cube = cube_module.build_cube
+
+
+class CubeTests(unittest.TestCase):
+    def setUp(self):
+        fechas = pd.to_datetime(['2026-01-01', '2026-01-01', '2026-01-01', '2026-02-01'])
+        self.df = pd.DataFrame({
+            'FECHA': fechas,
+            'ANIO': fechas.year.astype('int64'),
+            'MES': fechas.month.astype('int64'),
+            'PERIODO': (fechas.year * 12 + fechas.month).astype('int64'),
+            'LINEA_PLUS': pd.Categorical(['AUTOS', 'AUTOS', 'SOAT', 'AUTOS']),
+            'SUCURSAL': ['101', '101', '101', '101'],
+            'Suc_agrupada': ['BOGOTÁ', 'BOGOTÁ', 'BOGOTÁ', None],
+            'CODIGO': ['A1', 'A1', 'S1', 'A1'],
+            'RAMO': ['R1', 'R2', 'R3', 'R1'],
+            'IMP_PRIMA': [100.0, 50.0, 10.0, np.nan],
+            'PRESUPUESTO': [200.0, 0.0, 20.0, 300.0],
+        })
+
+    def test_rows_are_summed_at_cube_grain(self):
+        cube = build_cube(self.df)
+
+        self.assertEqual(len(cube), 3)
+        self.assertNotIn('RAMO', cube.columns)
+        autos_enero = cube[(cube['PERIODO'] == 2026 * 12 + 1) & (cube['LINEA_PLUS'] == 'AUTOS')]
+        self.assertEqual(autos_enero['IMP_PRIMA'].item(), 150.0)
+        self.assertEqual(autos_enero['PRESUPUESTO'].item(), 200.0)
+
+    def test_totals_and_null_keys_are_preserved(self):
+        cube = build_cube(self.df)
+
+        self.assertAlmostEqual(cube['IMP_PRIMA'].sum(), self.df['IMP_PRIMA'].sum())
+        self.assertAlmostEqual(cube['PRESUPUESTO'].sum(), self.df['PRESUPUESTO'].sum())
+        self.assertEqual(cube['Suc_agrupada'].isna().sum(), 1)
+        self.assertIsInstance(cube['LINEA_PLUS'].dtype, pd.CategoricalDtype)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import sys
+import types
+import unittest
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+UTILS_DIR = ROOT / 'utils'
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+utils_pkg = types.ModuleType('utils')
+utils_pkg.__path__ = [str(UTILS_DIR)]
+sys.modules.setdefault('utils', utils_pkg)
+
+MODULE_PATH = UTILS_DIR / 'data_processor.py'
+SPEC = spec_from_file_location('utils.data_processor', MODULE_PATH)
+data_processor = module_from_spec(SPEC)
+assert SPEC.loader is not None
+sys.modules['utils.data_processor'] = data_processor
+SPEC.loader.exec_module(data_processor)
+
+
+def parse_number_co_legacy(series):
+    s = series.astype(str)
+    s = s.str.replace(r"[^\d,.\-]", "", regex=True)
+    s = s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    return pd.to_numeric(s, errors="coerce")
+
+
+class ParseNumberCoTests(unittest.TestCase):
+    def setUp(self):
+        self.series = pd.Series(
+            ['1.234.567,89', '$ 500', None, '-1.000,5', '', '1.234.567,89', 'N/A'],
+            index=[10, 11, 12, 13, 14, 15, 16],
+            name='IMP_PRIMA',
+        )
+
+    def test_matches_legacy_output(self):
+        expected = parse_number_co_legacy(self.series)
+        for use_arrow in (False, data_processor._ARROW_AVAILABLE):
+            with self.subTest(use_arrow=use_arrow):
+                result = data_processor.parse_number_co(self.series, use_arrow=use_arrow)
+                pd.testing.assert_series_equal(result, expected)
+
+    def test_integer_strings_keep_integer_dtype(self):
+        series = pd.Series(['1.000', '2.500', '1.000'])
+        expected = parse_number_co_legacy(series)
+        for use_arrow in (False, data_processor._ARROW_AVAILABLE):
+            with self.subTest(use_arrow=use_arrow):
+                result = data_processor.parse_number_co(series, use_arrow=use_arrow)
+                pd.testing.assert_series_equal(result, expected)
+                self.assertEqual(result.dtype, np.int64)
+
+    def test_numeric_column_is_not_reparsed(self):
+        series = pd.Series([1500.5, 20.0, np.nan])
+        pd.testing.assert_series_equal(data_processor.parse_number_co(series), series)
+
+
+class ParseDatesTests(unittest.TestCase):
+    def test_month_text_is_parsed_to_month_start_with_period_columns(self):
+        raw = pd.DataFrame({
+            'Mes yyyy': ['1/1/2026', '15/2/2025', '1/1/2026', '01-12-2024', 'sin fecha', None],
+            'Imp Prima': ['1.000', '2.000', '3.000', '4.000', '5.000', '6.000'],
+        })
+        df = data_processor.normalize_dataframe(raw)
+
+        self.assertEqual(
+            df['FECHA'].tolist(),
+            [pd.Timestamp('2026-01-01'), pd.Timestamp('2025-02-01'),
+             pd.Timestamp('2026-01-01'), pd.Timestamp('2024-12-01')],
+        )
+        self.assertEqual(df['ANIO'].tolist(), [2026, 2025, 2026, 2024])
+        self.assertEqual(df['MES'].tolist(), [1, 2, 1, 12])
+        self.assertEqual(df['PERIODO'].tolist(), [2026 * 12 + 1, 2025 * 12 + 2, 2026 * 12 + 1, 2024 * 12 + 12])
+        self.assertEqual(df['ANIO'].dtype, np.int64)
+        self.assertEqual(df['MES'].dtype, np.int64)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import sqlite3
+import sys
+import tempfile
+import types
+import unittest
+from contextlib import closing
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+UTILS_DIR = ROOT / 'utils'
+
+utils_pkg = types.ModuleType('utils')
+utils_pkg.__path__ = [str(UTILS_DIR)]
+sys.modules.setdefault('utils', utils_pkg)
+
+for module_name in ('performance', 'snapshot_store', 'data_sources'):
+    module_path = UTILS_DIR / f'{module_name}.py'
+    module_spec = spec_from_file_location(f'utils.{module_name}', module_path)
+    module = module_from_spec(module_spec)
+    assert module_spec.loader is not None
+    sys.modules[f'utils.{module_name}'] = module
+    module_spec.loader.exec_module(module)
+
+data_sources = sys.modules['utils.data_sources']
+
+
+class LocalDataSourceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        self.df = pd.DataFrame({
+            'Mes yyyy': ['1/1/2026', '1/2/2026'],
+            'Linea +': ['AUTOS', 'SOAT'],
+            'Imp Prima': ['1.000,50', '2.000,00'],
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv_source_reads_data_and_headerless_cutoff(self):
+        self.df.to_csv(self.base / 'Hoja1.csv', index=False)
+        (self.base / 'Hoja2.csv').write_text('15/6/2026\n', encoding='utf-8')
+        source = data_sources.get_data_source('csv', self.base)
+
+        pd.testing.assert_frame_equal(source.read_table('Hoja1'), self.df)
+        self.assertEqual(source.read_table('Hoja2', header=False).iloc[0, 0], '15/6/2026')
+        self.assertTrue(source.read_table('Hoja1').attrs['content_hash'])
+
+    def test_sqlite_source_reads_tables(self):
+        db_path = self.base / 'datos.db'
+        with closing(sqlite3.connect(db_path)) as conn:
+            self.df.to_sql('Hoja1', conn, index=False)
+            conn.commit()
+        source = data_sources.get_data_source('sqlite', db_path)
+
+        pd.testing.assert_frame_equal(source.read_table('Hoja1'), self.df)
+        with self.assertRaises(data_sources.DataSourceError):
+            source.read_table('Hoja9')
+
+    def test_unknown_source_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            data_sources.get_data_source('excel', self.base)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -63,6 +63,17 @@ class DistributionTests(unittest.TestCase):
             places=2,
         )
 
+    def test_categorical_dimensions_match_string_dimensions(self):
+        df_cat = self.df.copy()
+        df_cat['Suc_agrupada'] = df_cat['Suc_agrupada'].astype('category')
+        df_cat['LINEA_PLUS'] = df_cat['LINEA_PLUS'].astype('category')
+        kwargs = dict(ref_year=2026, cutoff_date=self.cutoff_date, meses_quarter=tuple(range(1, 13)))
+
+        expected, _ = build_monthly_distribution(df_filtered=self.df, **kwargs)
+        result, _ = build_monthly_distribution(df_filtered=df_cat, **kwargs)
+
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
+
     def test_distribution_html_includes_top_navigation_controls(self):
         distribution, remaining_months = build_monthly_distribution(
             df_filtered=self.df,
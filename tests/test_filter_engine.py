@@ -0,0 +1,79 @@
+import sys
+import types
+import unittest
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+UTILS_DIR = ROOT / 'utils'
+
+utils_pkg = types.ModuleType('utils')
+utils_pkg.__path__ = [str(UTILS_DIR)]
+sys.modules.setdefault('utils', utils_pkg)
+
+for module_name in ('snapshot_store', 'filter_engine'):
+    module_path = UTILS_DIR / f'{module_name}.py'
+    module_spec = spec_from_file_location(f'utils.{module_name}', module_path)
+    module = module_from_spec(module_spec)
+    assert module_spec.loader is not None
+    sys.modules[f'utils.{module_name}'] = module
+    module_spec.loader.exec_module(module)
+
+filter_engine = sys.modules['utils.filter_engine']
+
+
+class FilterEngineTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        anio = rng.integers(2023, 2027, n)
+        mes = rng.integers(1, 13, n)
+        self.df = pd.DataFrame({
+            'ANIO': anio,
+            'MES': mes,
+            'PERIODO': anio * 12 + mes,
+            'LINEA_PLUS': pd.Categorical(rng.choice(['AUTOS', 'SOAT', 'VIDA'], n)),
+            'CODIGO': rng.choice(['A1', 'A2', 'S1', None], n),
+            'SUCURSAL': pd.Categorical(rng.choice(['101', '102', '103'], n)),
+            'Suc_agrupada': pd.Categorical(rng.choice(['BOGOTÁ', 'COSTA', 'VALLE'], n)),
+            'IMP_PRIMA': rng.random(n),
+        })
+        self.engine = filter_engine.FilterEngine(self.df)
+
+    def test_selection_matches_boolean_masks(self):
+        result = self.engine.filter(
+            linea_plus='AUTOS',
+            codigos=['A1', 'S1'],
+            suc_agrupadas=['COSTA', 'VALLE'],
+            anio_max=2025,
+            periodo_max=2025 * 12 + 6,
+        )
+        mask = (
+            (self.df['LINEA_PLUS'] == 'AUTOS') &
+            self.df['CODIGO'].isin(['A1', 'S1']) &
+            self.df['Suc_agrupada'].isin(['COSTA', 'VALLE']) &
+            (self.df['ANIO'] <= 2025) &
+            (self.df['PERIODO'] <= 2025 * 12 + 6)
+        )
+        pd.testing.assert_frame_equal(result, self.df[mask])
+
+    def test_without_filters_returns_original_frame(self):
+        self.assertIs(self.engine.filter(anio_max=2030), self.df)
+
+    def test_unknown_values_and_memoization(self):
+        self.assertTrue(self.engine.filter(linea_plus='FIANZAS').empty)
+        first = self.engine.filter(sucursales=['101'])
+        self.assertIs(self.engine.filter(sucursales=['101']), first)
+
+    def test_data_version_prefers_snapshot_hash(self):
+        df = self.df.copy()
+        self.assertEqual(filter_engine.data_version(df), filter_engine.data_version(self.df.copy()))
+        df.attrs['content_hash'] = 'abc:v4'
+        self.assertEqual(filter_engine.data_version(df), 'abc:v4')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,443 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from modelos import forecast_engine  # noqa: E402
+from modelos.fast_models import FAST_MODELS, fast_forecast, seasonal_naive_forecast  # noqa: E402
+from modelos.forecast_engine import ForecastEngine  # noqa: E402
+from modelos.forecast_store import ForecastStore  # noqa: E402
+from tests.conftest import monthly_series as _monthly_series  # noqa: E402
+
+
+class ParallelBacktestTests(unittest.TestCase):
+    def test_parallel_fits_match_serial(self):
+        serie = _monthly_series()
+        # Sin límite de tiempo los orígenes se reparten en el pool
+        serial = ForecastEngine(conservative_factor=0.95, n_jobs=1, warm_start=False, fit_timeout=0).fit_forecast(
+            serie, steps=3, eval_months=3
+        )
+        parallel = ForecastEngine(conservative_factor=0.95, n_jobs=2, warm_start=False, fit_timeout=0).fit_forecast(
+            serie, steps=3, eval_months=3
+        )
+
+        hist_s, fc_s, smape_s, acc_s = serial
+        hist_p, fc_p, smape_p, acc_p = parallel
+        pd.testing.assert_frame_equal(hist_s, hist_p)
+        pd.testing.assert_frame_equal(fc_s, fc_p)
+        pd.testing.assert_frame_equal(acc_s, acc_p)
+        self.assertEqual(smape_s, smape_p)
+        self.assertEqual(len(acc_s), 3)
+        self.assertEqual(len(fc_s), 3)
+
+    def test_parallel_matches_serial_with_warm_start(self):
+        series = {'A': _monthly_series(), 'B': _monthly_series(44) * 3}
+        opciones = dict(warm_start=True, fit_timeout=0, sarimax_min_gain=-1.0)
+        serial = ForecastEngine(n_jobs=1, **opciones)
+        parallel = ForecastEngine(n_jobs=2, **opciones)
+
+        for key, serie in series.items():
+            esperado = serial.fit_forecast(serie, steps=3, eval_months=4)
+            self.assertEqual(serial.last_model, 'sarimax')
+            obtenido = parallel.fit_forecast(serie, steps=3, eval_months=4)
+            pd.testing.assert_frame_equal(obtenido[1], esperado[1])
+            pd.testing.assert_frame_equal(obtenido[3], esperado[3])
+        lote_serial = serial.fit_many(series, steps=3, eval_months=4)
+        lote_paralelo = parallel.fit_many(series, steps=3, eval_months=4, chunksize=1)
+        for key in series:
+            pd.testing.assert_frame_equal(lote_paralelo[key][1], lote_serial[key][1])
+            pd.testing.assert_frame_equal(lote_paralelo[key][3], lote_serial[key][3])
+
+    def test_fit_timeout_keeps_origins_parallel(self):
+        serie = _monthly_series()
+        serial = ForecastEngine(n_jobs=1, warm_start=False, fit_timeout=0).fit_forecast(
+            serie, steps=3, eval_months=3
+        )
+        engine = ForecastEngine(n_jobs=2, warm_start=False, fit_timeout=120)
+        with mock.patch.object(
+            forecast_engine, '_run_all_with_deadline', wraps=forecast_engine._run_all_with_deadline
+        ) as run_all:
+            parallel = engine.fit_forecast(serie, steps=3, eval_months=3)
+
+        # Backtest en dos procesos a la vez
+        self.assertEqual(len(run_all.call_args_list[0].args[0]), 2)
+        self.assertIsNone(engine.last_degraded)
+        for got, exp in zip(parallel, serial):
+            if isinstance(got, pd.DataFrame):
+                pd.testing.assert_frame_equal(got, exp)
+            else:
+                self.assertEqual(got, exp)
+
+    def test_n_jobs_is_at_least_one(self):
+        self.assertEqual(ForecastEngine(n_jobs=0).n_jobs, 1)
+
+    def test_pool_is_shared_and_not_resized(self):
+        fake_pool = mock.Mock()
+        with mock.patch.object(forecast_engine, '_POOL', None), \
+                mock.patch.object(forecast_engine, 'ProcessPoolExecutor', return_value=fake_pool) as factory:
+            self.assertIs(forecast_engine._get_pool(2), fake_pool)
+            # Otra sesión con otro n_jobs no cancela las tareas en curso
+            self.assertIs(forecast_engine._get_pool(3), fake_pool)
+            fake_pool.shutdown.assert_not_called()
+            self.assertEqual(factory.call_count, 1)
+
+            # Un pool ya reemplazado no se descarta
+            forecast_engine._discard_pool(mock.Mock())
+            self.assertIs(forecast_engine._POOL, fake_pool)
+
+    def test_cancelled_pool_falls_back_to_serial(self):
+        serie = _monthly_series()
+        serial = ForecastEngine(n_jobs=1, warm_start=False, fit_timeout=0).fit_forecast(
+            serie, steps=3, eval_months=3
+        )
+
+        def cancelled(*args):
+            future = Future()
+            future.cancel()
+            future.set_running_or_notify_cancel()
+            return future
+
+        fake_pool = mock.Mock()
+        fake_pool.submit.side_effect = cancelled
+        with mock.patch.object(forecast_engine, '_get_pool', return_value=fake_pool):
+            engine = ForecastEngine(n_jobs=2, warm_start=False, fit_timeout=0)
+            parallel = engine.fit_forecast(serie, steps=3, eval_months=3)
+            results = engine.fit_many({'A': serie, 'B': serie * 2}, steps=3, eval_months=3, chunksize=1)
+
+        pd.testing.assert_frame_equal(serial[1], parallel[1])
+        self.assertEqual(engine.fit_errors, {})
+        pd.testing.assert_frame_equal(results['A'][1], serial[1])
+
+
+class ScriptMainTests(unittest.TestCase):
+    """Bajo ``streamlit run`` el script de la app es ``__main__`` y no se puede importar."""
+
+    def _run_with_script_main(self, func) -> bool:
+        """Ejecuta ``func`` con un script como ``__main__``; True si algún hijo lo ejecutó."""
+        with tempfile.TemporaryDirectory() as tmp:
+            marca = Path(tmp) / 'ejecutado'
+            script = Path(tmp) / 'app.py'
+            script.write_text(f"open({str(marca)!r}, 'a').close()\n", encoding='utf-8')
+            main = types.ModuleType('__main__')
+            main.__file__ = str(script)
+            original = sys.modules['__main__']
+            sys.modules['__main__'] = main
+            try:
+                func()
+            finally:
+                sys.modules['__main__'] = original
+            return marca.exists()
+
+    def test_pool_workers_do_not_run_script_main(self):
+        serie = _monthly_series()
+        forecast_engine._discard_pool()
+        engine = ForecastEngine(n_jobs=2, warm_start=False, fit_timeout=0)
+        self.assertFalse(self._run_with_script_main(
+            lambda: engine.fit_forecast(serie, steps=3, eval_months=3)
+        ))
+        self.assertIsNotNone(forecast_engine._POOL)
+
+    def test_fit_many_pool_does_not_run_script_main(self):
+        series = {'A': _monthly_series(), 'B': _monthly_series(36) * 2}
+        forecast_engine._discard_pool()
+        engine = ForecastEngine(n_jobs=2, fit_timeout=0)
+        results = {}
+        self.assertFalse(self._run_with_script_main(
+            lambda: results.update(engine.fit_many(series, steps=2, eval_months=2, chunksize=1))
+        ))
+        self.assertEqual(engine.fit_errors, {})
+        self.assertEqual(list(results), ['A', 'B'])
+
+    def test_fit_workers_do_not_run_script_main(self):
+        forecast_engine._discard_fit_workers()
+        self.assertFalse(self._run_with_script_main(
+            lambda: self.assertEqual(forecast_engine._run_with_deadline(sum, ([1, 2],), 30), 3)
+        ))
+
+
+class FitManyTests(unittest.TestCase):
+    def test_fit_many_matches_fit_forecast_and_isolates_errors(self):
+        series = {
+            'A': _monthly_series(40),
+            'B': _monthly_series(36) * 2,
+            # Valores no numéricos: falla solo esta serie
+            'roto': pd.Series(['x', 'y'], index=pd.date_range('2024-01-01', periods=2, freq='MS')),
+        }
+        progreso = []
+        for n_jobs in (1, 2):
+            engine = ForecastEngine(conservative_factor=0.9, n_jobs=n_jobs, warm_start=False)
+            results = engine.fit_many(series, steps=2, eval_months=2, chunksize=1,
+                                      progress=lambda listas, total: progreso.append((listas, total)))
+
+            self.assertEqual(list(results), ['A', 'B', 'roto'])
+            self.assertEqual(list(engine.fit_errors), ['roto'])
+            self.assertTrue(results['roto'][1].empty)
+            for key in ('A', 'B'):
+                _, fc_single, smape_single, _ = ForecastEngine(
+                    conservative_factor=0.9, n_jobs=1, warm_start=False
+                ).fit_forecast(series[key], steps=2, eval_months=2)
+                pd.testing.assert_frame_equal(results[key][1], fc_single)
+                self.assertEqual(results[key][2], smape_single)
+            self.assertEqual(progreso[-1], (3, 3))
+            progreso.clear()
+
+
+class HorizonTests(unittest.TestCase):
+    def test_short_horizon_is_prefix_of_long_horizon(self):
+        # compute_line_forecast ajusta una vez a 12 pasos y recorta
+        serie = _monthly_series(60)
+        _, fc_long, _, _ = ForecastEngine(n_jobs=1).fit_forecast(serie, steps=12)
+        _, fc_short, _, _ = ForecastEngine(n_jobs=1).fit_forecast(serie, steps=3)
+
+        cols = ['FECHA', 'Pronostico_mensual', 'IC_lo', 'IC_hi']
+        pd.testing.assert_frame_equal(fc_long[cols].iloc[:3], fc_short[cols])
+
+
+class PartialMonthTests(unittest.TestCase):
+    def test_intramonth_cutoffs_share_training_series(self):
+        # El caché de ajustes de la app se indexa por la serie de entrenamiento
+        engine = ForecastEngine(n_jobs=1)
+        serie = _monthly_series(30)
+        trains = []
+        for dia, parcial in ((3, 1e7), (17, 4e8)):
+            serie_corte = serie.copy()
+            serie_corte.iloc[-1] = parcial
+            corte = serie.index[-1] + pd.Timedelta(days=dia - 1)
+            train, cur_month, is_partial = engine.split_series_exclude_partial(
+                engine.sanitize_series(serie_corte, corte.year), corte.year, corte
+            )
+            self.assertTrue(is_partial)
+            self.assertEqual(cur_month, serie.index[-1])
+            trains.append(train)
+        pd.testing.assert_series_equal(trains[0], trains[1])
+
+
+class ScaleForecastTests(unittest.TestCase):
+    def test_scaling_unscaled_fit_matches_fit_with_factor(self):
+        serie = _monthly_series(48)
+        hist, fc_raw, _, acc_raw = ForecastEngine(conservative_factor=1.0, n_jobs=1).fit_forecast(serie, steps=4)
+        _, fc_fit, smape_fit, acc_fit = ForecastEngine(conservative_factor=0.9, n_jobs=1).fit_forecast(serie, steps=4)
+
+        fc_scaled, smape_scaled, acc_scaled = ForecastEngine(conservative_factor=0.9).scale_forecast(
+            hist, fc_raw, acc_raw
+        )
+        pd.testing.assert_frame_equal(fc_scaled, fc_fit)
+        pd.testing.assert_frame_equal(acc_scaled, acc_fit)
+        self.assertAlmostEqual(smape_scaled, smape_fit)
+        # El ajuste cacheado no se modifica al escalar
+        self.assertNotEqual(fc_raw['Pronostico_mensual'].iloc[0], fc_scaled['Pronostico_mensual'].iloc[0])
+
+
+class WarmStartTests(unittest.TestCase):
+    def test_warm_start_matches_cold_start_with_fewer_iterations(self):
+        serie = _monthly_series(96)
+        # Ganancia negativa: SARIMAX se usa siempre y se ajusta el modelo final
+        cold = ForecastEngine(n_jobs=1, warm_start=False, sarimax_min_gain=-1.0)
+        warm = ForecastEngine(n_jobs=1, warm_start=True, sarimax_min_gain=-1.0)
+        _, fc_cold, smape_cold, acc_cold = cold.fit_forecast(serie, steps=3, eval_months=4)
+        _, fc_warm, smape_warm, acc_warm = warm.fit_forecast(serie, steps=3, eval_months=4)
+
+        # 4 orígenes del backtest + modelo final
+        self.assertEqual(cold.fit_stats['fits'], 5)
+        self.assertEqual(warm.fit_stats['fits'], 5)
+        self.assertLessEqual(warm.fit_stats['iterations'], cold.fit_stats['iterations'])
+        pd.testing.assert_frame_equal(fc_cold, fc_warm, rtol=1e-3)
+        pd.testing.assert_frame_equal(acc_cold, acc_warm, rtol=1e-3)
+        self.assertAlmostEqual(smape_cold, smape_warm, places=2)
+
+    def test_non_converged_warm_start_retries_cold(self):
+        calls = []
+
+        class FakeModel:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def fit(self, disp=False, start_params=None):
+                calls.append(start_params)
+                result = mock.Mock()
+                result.mle_retvals = {'iterations': 5, 'converged': start_params is None}
+                return result
+
+        with mock.patch.object(forecast_engine, 'SARIMAX', FakeModel):
+            _, iterations, cold_retry = forecast_engine._fit_sarimax(pd.Series([1.0]), start_params=[0.1])
+
+        self.assertEqual(calls, [[0.1], None])
+        self.assertTrue(cold_retry)
+        self.assertEqual(iterations, 10)
+
+    def test_failed_warm_start_retries_cold_before_arima(self):
+        calls = []
+
+        class FakeModel:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def fit(self, disp=False, start_params=None):
+                calls.append(start_params)
+                if start_params is not None:
+                    raise np.linalg.LinAlgError('Schur decomposition solver error.')
+                result = mock.Mock()
+                result.mle_retvals = {'iterations': 7, 'converged': True}
+                return result
+
+        with mock.patch.object(forecast_engine, 'SARIMAX', FakeModel):
+            _, iterations, cold_retry = forecast_engine._fit_sarimax(pd.Series([1.0]), start_params=[0.1])
+
+        self.assertEqual(calls, [[0.1], None])
+        self.assertTrue(cold_retry)
+        self.assertEqual(iterations, 7)
+
+
+class ModelSelectionTests(unittest.TestCase):
+    def test_short_series_use_fast_models_only(self):
+        engine = ForecastEngine(n_jobs=1)
+        _, fc, smape, acc = engine.fit_forecast(_monthly_series(24), steps=3)
+
+        self.assertIn(engine.last_model, FAST_MODELS)
+        self.assertEqual(engine.fit_stats['fits'], 0)
+        self.assertEqual(len(fc), 3)
+        self.assertEqual(len(acc), 6)
+        self.assertTrue(np.isfinite(smape))
+
+    def test_sparse_series_skip_sarimax(self):
+        serie = _monthly_series(48)
+        serie.iloc[::3] = 0.0
+        engine = ForecastEngine(n_jobs=1)
+        engine.fit_forecast(serie, steps=3)
+        self.assertIn(engine.last_model, FAST_MODELS)
+        self.assertEqual(engine.fit_stats['fits'], 0)
+
+    def test_sarimax_needs_backtest_gain(self):
+        serie = _monthly_series(48)
+        engine = ForecastEngine(n_jobs=1, sarimax_min_gain=1e6)
+        engine.fit_forecast(serie, steps=3, eval_months=3)
+        # SARIMAX se evaluó en el backtest pero no mejora lo suficiente: sin modelo final
+        self.assertEqual(engine.fit_stats['fits'], 3)
+        self.assertIn(engine.last_model, FAST_MODELS)
+        self.assertIsNone(engine.last_params)
+
+    def test_seasonal_naive_repeats_last_season(self):
+        y = pd.Series(np.arange(30, dtype=float), index=pd.date_range('2020-01-01', periods=30, freq='MS'))
+        mean, conf = seasonal_naive_forecast(y, 14)
+        np.testing.assert_array_equal(mean, np.r_[np.arange(18, 30), 18, 19])
+        # Las diferencias estacionales son constantes: intervalo sin ancho
+        np.testing.assert_array_equal(conf[:, 0], mean)
+
+    def test_backtest_and_forecast_use_same_estimator(self):
+        y = np.log1p(_monthly_series(36))
+        for name in FAST_MODELS:
+            mean_backtest, conf = fast_forecast(name, y, 3, with_conf=False)
+            mean_forecast, _ = fast_forecast(name, y, 3)
+            self.assertIsNone(conf)
+            np.testing.assert_allclose(mean_backtest, mean_forecast, err_msg=name)
+
+
+class FitDeadlineTests(unittest.TestCase):
+    def test_worker_returns_result_and_is_killed_on_timeout(self):
+        self.assertEqual(forecast_engine._run_with_deadline(sum, ([1, 2, 3],), 30), 6)
+        self.assertEqual(
+            forecast_engine._run_all_with_deadline([(sum, ([1, 2],)), (max, ([4, 7],))], 30), [3, 7]
+        )
+
+        inicio = time.monotonic()
+        with self.assertRaises(forecast_engine.FitTimeout):
+            forecast_engine._run_with_deadline(time.sleep, (30,), 0.2)
+        self.assertLess(time.monotonic() - inicio, 10)
+
+        # El siguiente ajuste arranca un proceso nuevo
+        self.assertEqual(forecast_engine._run_with_deadline(max, ([4, 7],), 30), 7)
+        with self.assertRaises(ValueError):
+            forecast_engine._run_with_deadline(int, ('x',), 30)
+
+    def test_fit_workers_are_capped(self):
+        forecast_engine._discard_fit_workers()
+        pids = forecast_engine._run_all_with_deadline([(os.getpid, ())] * 3, 30, max_workers=1)
+        self.assertEqual(len(set(pids)), 1)
+        self.assertEqual(forecast_engine._LIVE_FIT_WORKERS, 1)
+
+        # Con el tope ocupado por otro hilo se espera a que devuelva su proceso
+        ocupado = threading.Thread(
+            target=forecast_engine._run_with_deadline, args=(time.sleep, (1,), 30)
+        )
+        ocupado.start()
+        time.sleep(0.2)
+        self.assertEqual(forecast_engine._run_with_deadline(os.getpid, (), 30), pids[0])
+        ocupado.join()
+
+        pids = forecast_engine._run_all_with_deadline([(os.getpid, ())] * 2, 30, max_workers=2)
+        self.assertEqual(len(set(pids)), 2)
+        self.assertEqual(forecast_engine._run_with_deadline(os.getpid, (), 30), pids[-1])
+        self.assertEqual(forecast_engine._LIVE_FIT_WORKERS, 1)
+        self.assertEqual(len(forecast_engine._IDLE_FIT_WORKERS), 1)
+
+    def test_sarimax_timeout_falls_back_to_fast_model(self):
+        serie = _monthly_series(48)
+        engine = ForecastEngine(n_jobs=1, fit_timeout=1e-3)
+        _, fc, smape, acc = engine.fit_forecast(serie, steps=3, eval_months=3)
+
+        self.assertEqual(engine.last_degraded, 'tiempo')
+        self.assertIn(engine.last_model, FAST_MODELS)
+        self.assertEqual(len(fc), 3)
+        self.assertEqual(len(acc), 3)
+        self.assertTrue(np.isfinite(smape))
+
+    def test_timed_out_fit_is_not_served_or_extended_from_store(self):
+        serie = _monthly_series(48)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ForecastStore(Path(tmp) / 'forecasts.sqlite')
+            rapido = ForecastEngine(n_jobs=1, store=store, fit_timeout=1e-3)
+            rapido.fit_forecast(serie.iloc[:-1], steps=3, eval_months=3)
+            self.assertEqual(rapido.last_degraded, 'tiempo')
+            self.assertIsNone(store.get(rapido.store_key(serie.iloc[:-1], 3, 3)))
+
+            # Un respaldo guardado con la marca tampoco se sirve ni se extiende
+            _, fc, _, acc = rapido.fit_forecast(serie.iloc[:-1], steps=3, eval_months=3)
+            store.put(rapido.store_key(serie.iloc[:-1], 3, 3), fc, acc,
+                      meta={'model': 'naive_estacional', 'degraded': 'respaldo'})
+            engine = ForecastEngine(n_jobs=1, store=store, fit_timeout=60)
+            engine.fit_forecast(serie.iloc[:-1], steps=3, eval_months=3)
+            self.assertEqual(engine.last_update, 'fit')
+            self.assertIsNone(engine.last_degraded)
+
+            store.put(engine.store_key(serie.iloc[:-1], 3, 3), fc, acc,
+                      meta={'model': 'naive_estacional', 'degraded': 'respaldo'})
+            engine.fit_forecast(serie, steps=3, eval_months=3)
+            self.assertEqual(engine.last_update, 'fit')
+
+    def test_exhausted_deadline_skips_sarimax(self):
+        series = {'larga': _monthly_series(48), 'corta': _monthly_series(24)}
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ForecastStore(Path(tmp) / 'forecasts.sqlite')
+            engine = ForecastEngine(n_jobs=1, store=store, deadline=time.time() - 1)
+            results = engine.fit_many(series, steps=3, eval_months=3)
+
+            # La serie corta no es elegible para SARIMAX: no se degrada
+            self.assertEqual(engine.degraded, {'larga': 'presupuesto'})
+            self.assertEqual(len(results['larga'][1]), 3)
+            # El ajuste recortado por presupuesto no se guarda: se reintenta
+            engine.fit_forecast(series['larga'], steps=3, eval_months=3)
+            self.assertEqual(engine.fit_stats['fits'], 0)
+            self.assertIsNone(store.get(engine.store_key(series['larga'], 3, 3)))
+
+        engine = ForecastEngine(n_jobs=1, deadline=time.time() + 600)
+        engine.fit_forecast(series['larga'], steps=3, eval_months=3)
+        self.assertIsNone(engine.last_degraded)
+        self.assertGreater(engine.fit_stats['fits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
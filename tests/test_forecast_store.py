@@ -0,0 +1,261 @@
+import sqlite3
+import sys
+import tempfile
+import unittest
+from contextlib import closing
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from modelos.fast_models import FAST_MODELS  # noqa: E402
+from modelos.forecast_engine import ForecastEngine, _filter_forecast  # noqa: E402
+from modelos.forecast_store import ForecastStore, fit_key  # noqa: E402
+from tests.conftest import monthly_series  # noqa: E402
+
+
+def _monthly_series(periods: int = 40) -> pd.Series:
+    return monthly_series(periods, seed=3, start='2020-01-01', scale=1e8)
+
+
+class ForecastStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'forecasts.sqlite'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_is_exact(self):
+        store = ForecastStore(self.path)
+        forecast = pd.DataFrame({
+            'FECHA': pd.date_range('2026-01-01', periods=2, freq='MS'),
+            'Pronostico_mensual': [1 / 3, 2e9 + 0.1],
+            'IC_lo': [0.0, np.nan],
+            'IC_hi': [np.inf, 3.5],
+        })
+        accuracy = pd.DataFrame({
+            'FECHA': pd.date_range('2025-11-01', periods=1, freq='MS'),
+            'Real': [10.0],
+            'Forecast_hist': [9.75],
+        })
+        self.assertTrue(store.put('k', forecast, accuracy, params=[0.1, -0.2]))
+
+        cached = store.get('k')
+        pd.testing.assert_frame_equal(cached['forecast'], forecast, check_exact=True)
+        pd.testing.assert_frame_equal(cached['accuracy'], accuracy, check_exact=True)
+        self.assertEqual(cached['params'], [0.1, -0.2])
+        self.assertIsNone(store.get('otra'))
+
+    def test_get_many_returns_only_found_keys(self):
+        store = ForecastStore(self.path)
+        forecast = pd.DataFrame({'FECHA': pd.date_range('2026-01-01', periods=2, freq='MS'),
+                                 'Pronostico_mensual': [1.0, 2.0]})
+        empty = pd.DataFrame(columns=['FECHA', 'Real', 'Forecast_hist'])
+        store.put('a', forecast, empty, meta={'status': 'ajuste'})
+        store.put('b', forecast, empty)
+
+        found = store.get_many(['a', 'otra', 'b'])
+
+        self.assertEqual(sorted(found), ['a', 'b'])
+        pd.testing.assert_frame_equal(found['a']['forecast'], forecast)
+        self.assertEqual(found['a']['meta'], {'status': 'ajuste'})
+        self.assertEqual(ForecastStore(self.path, enabled=False).get_many(['a']), {})
+
+    def test_reads_share_one_connection_and_one_update(self):
+        store = ForecastStore(self.path)
+        forecast = pd.DataFrame({'FECHA': pd.date_range('2026-01-01', periods=2, freq='MS'),
+                                 'Pronostico_mensual': [1.0, 2.0]})
+        empty = pd.DataFrame(columns=['FECHA', 'Real', 'Forecast_hist'])
+        for key in ('a', 'b', 'c'):
+            store.put(key, forecast, empty)
+        with closing(sqlite3.connect(self.path)) as conn:
+            self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+        sentencias = []
+        connect = sqlite3.connect
+
+        def traced(*args, **kwargs):
+            conn = connect(*args, **kwargs)
+            conn.set_trace_callback(sentencias.append)
+            return conn
+
+        with mock.patch.object(sqlite3, 'connect', side_effect=traced) as conexiones:
+            found = store.get_many(['a', 'otra', 'b', 'c'])
+        self.assertEqual(list(found), ['a', 'b', 'c'])
+        self.assertEqual(conexiones.call_count, 1)
+        self.assertFalse([sql for sql in sentencias if 'CREATE' in sql])
+        self.assertEqual(len([sql for sql in sentencias if sql.startswith('UPDATE')]), 1)
+
+    def test_locked_database_is_not_a_cache_miss(self):
+        store = ForecastStore(self.path)
+        forecast = pd.DataFrame({'FECHA': pd.date_range('2026-01-01', periods=2, freq='MS'),
+                                 'Pronostico_mensual': [1.0, 2.0]})
+        empty = pd.DataFrame(columns=['FECHA', 'Real', 'Forecast_hist'])
+        store.put('a', forecast, empty)
+        store.put_backtest([('o', pd.Timestamp('2026-01-01'), 1.5, None)])
+
+        # Otra sesión escribiendo: la lectura no espera y no marca el acceso
+        with closing(sqlite3.connect(self.path)) as otra:
+            otra.execute('BEGIN IMMEDIATE')
+            otra.execute("UPDATE forecasts SET size = size WHERE key = 'a'")
+            self.assertIsNotNone(store.get('a'))
+            self.assertEqual(store.get_backtest(['o']), {'o': (1.5, None)})
+            otra.rollback()
+
+    def test_evicts_least_recently_used(self):
+        forecast = pd.DataFrame({'FECHA': pd.date_range('2026-01-01', periods=12, freq='MS'),
+                                 'Pronostico_mensual': np.arange(12.0)})
+        empty = pd.DataFrame(columns=['FECHA', 'Real', 'Forecast_hist'])
+        store = ForecastStore(self.path, max_bytes=10**9)
+        store.put('a', forecast, empty)
+        size = store.stats()['bytes']
+        store.max_bytes = int(size * 2.5)
+        store.put('b', forecast, empty)
+        store.get('a')  # 'a' pasa a ser el más reciente
+        store.put('c', forecast, empty)
+
+        self.assertEqual(store.stats()['entries'], 2)
+        self.assertIsNone(store.get('b'))
+        self.assertIsNotNone(store.get('a'))
+        self.assertIsNotNone(store.get('c'))
+
+    def test_key_depends_on_content_and_spec(self):
+        serie = _monthly_series()
+        self.assertEqual(fit_key(serie, 1, 12), fit_key(serie.copy(), 1, 12))
+        self.assertNotEqual(fit_key(serie, 1, 12), fit_key(serie, 2, 12))
+        modificada = serie.copy()
+        modificada.iloc[-1] += 1
+        self.assertNotEqual(fit_key(serie, 1, 12), fit_key(modificada, 1, 12))
+
+    def test_new_engine_serves_stored_fit_without_refitting(self):
+        serie = _monthly_series()
+        first = ForecastEngine(conservative_factor=0.9, n_jobs=1, store=ForecastStore(self.path),
+                               sarimax_min_gain=-1.0)
+        first.fit_forecast(serie, steps=3, eval_months=2)
+        self.assertEqual(first.fit_stats['fits'], 3)
+
+        # Otro proceso/worker: engine y store nuevos sobre el mismo archivo
+        second = ForecastEngine(conservative_factor=0.8, n_jobs=1, store=ForecastStore(self.path),
+                                sarimax_min_gain=-1.0)
+        hist, fc, smape, acc = second.fit_forecast(serie, steps=3, eval_months=2)
+        self.assertEqual(second.fit_stats['fits'], 0)
+        self.assertEqual(second.last_params, first.last_params)
+
+        hist_exp, fc_exp, smape_exp, acc_exp = ForecastEngine(
+            conservative_factor=0.8, n_jobs=1, sarimax_min_gain=-1.0
+        ).fit_forecast(serie, steps=3, eval_months=2)
+        pd.testing.assert_frame_equal(hist, hist_exp)
+        pd.testing.assert_frame_equal(fc, fc_exp)
+        pd.testing.assert_frame_equal(acc, acc_exp)
+        self.assertEqual(smape, smape_exp)
+
+
+class IncrementalUpdateTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ForecastStore(Path(self.tmp.name) / 'forecasts.sqlite')
+        self.serie = _monthly_series(48)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _engine(self, **kwargs):
+        kwargs.setdefault('drift_tolerance', 100.0)
+        return ForecastEngine(n_jobs=1, store=self.store, **kwargs)
+
+    def test_month_close_appends_with_fixed_params(self):
+        previo = self._engine()
+        _, fc_prev, _, acc_prev = previo.fit_forecast(self.serie.iloc[:-1], steps=3, eval_months=4)
+        self.assertEqual(previo.last_update, 'fit')
+
+        engine = self._engine()
+        _, fc, _, acc = engine.fit_forecast(self.serie, steps=3, eval_months=4)
+        self.assertEqual(engine.last_update, 'append')
+        self.assertEqual(engine.fit_stats['fits'], 0)
+        self.assertEqual(engine.last_params, previo.last_params)
+
+        mean_log, _ = _filter_forecast(np.log1p(self.serie), previo.last_params, 3)
+        np.testing.assert_allclose(fc['Pronostico_mensual'], np.expm1(mean_log))
+        self.assertEqual(fc['FECHA'].iloc[0], self.serie.index[-1] + pd.offsets.MonthBegin())
+
+        # Los orígenes anteriores se reutilizan; el nuevo es el primer paso del pronóstico previo
+        self.assertEqual(len(acc), 4)
+        np.testing.assert_allclose(acc['Forecast_hist'].iloc[:3], acc_prev['Forecast_hist'].iloc[1:])
+        self.assertAlmostEqual(acc['Forecast_hist'].iloc[-1], fc_prev['Pronostico_mensual'].iloc[0])
+        self.assertEqual(acc['Real'].iloc[-1], self.serie.iloc[-1])
+
+    def test_month_close_keeps_fast_model_choice(self):
+        corta = self.serie.iloc[:26]
+        previo = self._engine()
+        previo.fit_forecast(corta.iloc[:-1], steps=3, eval_months=4)
+        self.assertIn(previo.last_model, FAST_MODELS)
+
+        engine = self._engine()
+        engine.fit_forecast(corta, steps=3, eval_months=4)
+        self.assertEqual(engine.last_update, 'append')
+        self.assertEqual(engine.last_model, previo.last_model)
+
+    def test_refits_after_refit_every_closes(self):
+        self._engine(refit_every=1).fit_forecast(self.serie.iloc[:-2], steps=3, eval_months=4)
+        engine = self._engine(refit_every=1)
+        engine.fit_forecast(self.serie.iloc[:-1], steps=3, eval_months=4)
+        self.assertEqual(engine.last_update, 'append')
+        engine.fit_forecast(self.serie, steps=3, eval_months=4)
+        self.assertEqual(engine.last_update, 'fit')
+        self.assertGreater(engine.fit_stats['fits'], 0)
+
+    def test_accuracy_drift_forces_refit(self):
+        self._engine().fit_forecast(self.serie.iloc[:-1], steps=3, eval_months=4)
+        engine = self._engine(drift_tolerance=0.0)
+        engine.fit_forecast(self.serie, steps=3, eval_months=4)
+        self.assertEqual(engine.last_update, 'fit')
+
+
+class BacktestStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ForecastStore(Path(self.tmp.name) / 'forecasts.sqlite')
+        self.serie = _monthly_series(48)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_month_close_fits_only_the_new_origin(self):
+        # Ganancia negativa: SARIMAX se usa siempre y se ajusta el modelo final
+        engine = ForecastEngine(n_jobs=1, warm_start=False, store=self.store, refit_every=0,
+                                sarimax_min_gain=-1.0)
+        engine.fit_forecast(self.serie.iloc[:-1], steps=3, eval_months=4)
+        self.assertEqual(engine.fit_stats['fits'], 5)
+        # Cuatro orígenes de SARIMAX y de cada modelo rápido
+        self.assertEqual(self.store.stats()['backtests'], 4 * (1 + len(FAST_MODELS)))
+
+        resultado = engine.fit_forecast(self.serie, steps=3, eval_months=4)
+        self.assertEqual(engine.last_update, 'fit')
+        self.assertEqual(engine.fit_stats['fits'], 2)  # origen nuevo + modelo final
+
+        esperado = ForecastEngine(n_jobs=1, warm_start=False, sarimax_min_gain=-1.0).fit_forecast(
+            self.serie, steps=3, eval_months=4
+        )
+        for got, exp in zip(resultado, esperado):
+            if isinstance(got, pd.DataFrame):
+                pd.testing.assert_frame_equal(got, exp)
+            else:
+                self.assertEqual(got, exp)
+
+    def test_origins_are_shared_across_horizons(self):
+        engine = ForecastEngine(n_jobs=1, store=self.store, refit_every=0, sarimax_min_gain=-1.0)
+        engine.fit_forecast(self.serie, steps=3, eval_months=4)
+        _, _, _, acc = engine.fit_forecast(self.serie, steps=12, eval_months=4)
+        self.assertEqual(engine.fit_stats['fits'], 1)
+        self.assertEqual(len(acc), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
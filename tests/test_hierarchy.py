@@ -0,0 +1,63 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from modelos.hierarchy import bottom_up_accuracy, reconcile_bottom_up  # noqa: E402
+
+
+def _forecast(start: str, values) -> pd.DataFrame:
+    values = np.asarray(values, dtype=float)
+    return pd.DataFrame({
+        'FECHA': pd.date_range(start, periods=len(values), freq='MS'),
+        'Pronostico_mensual': values,
+        'IC_lo': values * 0.5,
+        'IC_hi': values * 2,
+    })
+
+
+def _accuracy(fechas, real, pred) -> pd.DataFrame:
+    return pd.DataFrame({'FECHA': pd.to_datetime(fechas), 'Real': real, 'Forecast_hist': pred})
+
+
+class BottomUpTests(unittest.TestCase):
+    def test_parent_forecast_is_sum_of_leaves_on_parent_dates(self):
+        fechas = pd.date_range('2024-01-01', periods=6, freq='MS')
+        parent = pd.Series(np.arange(6, dtype=float) + 10, index=fechas)
+        vacia = pd.DataFrame(columns=['FECHA', 'Real', 'Forecast_hist'])
+        leaves = [
+            (None, _forecast('2024-07-01', [1, 2, 3]), vacia),
+            # Hoja con ceros finales recortados: su pronóstico arranca antes
+            (None, _forecast('2024-06-01', [5, 6, 7, 8]), vacia),
+        ]
+
+        hist, fc, acc = reconcile_bottom_up(parent, leaves, steps=3)
+
+        self.assertEqual(list(fc['FECHA']), list(pd.date_range('2024-07-01', periods=3, freq='MS')))
+        np.testing.assert_allclose(fc['Pronostico_mensual'], [7, 9, 11])
+        np.testing.assert_allclose(fc['IC_lo'], [3.5, 4.5, 5.5])
+        np.testing.assert_allclose(fc['IC_hi'], [14, 18, 22])
+        np.testing.assert_allclose(hist['Mensual'], parent.to_numpy())
+        self.assertTrue(acc.empty)
+
+    def test_accuracy_uses_origins_common_to_all_leaves(self):
+        acc_a = _accuracy(['2024-01-01', '2024-02-01', '2024-03-01'], [10, 20, 30], [11, 19, 33])
+        acc_b = _accuracy(['2024-02-01', '2024-03-01'], [1, 2], [2, 2])
+        vacia = pd.DataFrame(columns=['FECHA', 'Real', 'Forecast_hist'])
+
+        acc = bottom_up_accuracy([acc_a, vacia, acc_b])
+
+        self.assertEqual(list(acc['FECHA']), list(pd.to_datetime(['2024-02-01', '2024-03-01'])))
+        np.testing.assert_allclose(acc['Real'], [21, 32])
+        np.testing.assert_allclose(acc['Forecast_hist'], [21, 35])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -51,7 +51,6 @@ class LineAdjustmentFactorTests(unittest.TestCase):
         source = APP_PATH.read_text(encoding='utf-8')
 
         expected_snippets = [
-            "pronostico_mes_full = pronostico_mes_full * _line_adjustment_factor(linea)",
             "fc_valores_list = [v * _line_adjustment_factor(linea) for v in fc_valores_list]",
             "proy_total = proy_total * _line_adjustment_factor(filters['linea_plus'])",
             "fc_display['Pronostico_mensual'] = fc_display['Pronostico_mensual'] * _line_adjustment_factor(filters['linea_plus'])",
@@ -61,6 +60,30 @@ class LineAdjustmentFactorTests(unittest.TestCase):
         for snippet in expected_snippets:
             self.assertIn(snippet, source)
 
+    def test_line_summaries_use_adjusted_line_forecasts(self):
+        # El pronóstico del mes completo de cada línea en el resumen sale de
+        # _resumen_line_forecasts, que aplica el factor de la línea
+        module = ast.parse(APP_PATH.read_text(encoding='utf-8'), filename=str(APP_PATH))
+        helpers = [
+            node for node in ast.walk(module)
+            if isinstance(node, ast.FunctionDef) and node.name == '_resumen_line_forecasts'
+        ]
+        self.assertEqual(len(helpers), 1)
+        self.assertIn(
+            "fc_valores_list = [v * _line_adjustment_factor(linea) for v in fc_valores_list]",
+            ast.unparse(helpers[0]),
+        )
+
+        summary_calls = [
+            node for node in ast.walk(module)
+            if isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'build_line_summaries'
+        ]
+        self.assertTrue(summary_calls)
+        for call in summary_calls:
+            forecast_lines = {kw.arg: kw.value for kw in call.keywords}.get('forecast_lines')
+            self.assertIsInstance(forecast_lines, ast.Name)
+            self.assertEqual(forecast_lines.id, '_resumen_line_forecasts')
+
 
 if __name__ == '__main__':
     unittest.main()
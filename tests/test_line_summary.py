@@ -0,0 +1,123 @@
+import sys
+import types
+import unittest
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+UTILS_DIR = ROOT / 'utils'
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+utils_pkg = types.ModuleType('utils')
+utils_pkg.__path__ = [str(UTILS_DIR)]
+sys.modules.setdefault('utils', utils_pkg)
+
+MODULE_PATH = UTILS_DIR / 'line_summary.py'
+SPEC = spec_from_file_location('utils.line_summary', MODULE_PATH)
+line_summary = module_from_spec(SPEC)
+assert SPEC.loader is not None
+sys.modules['utils.line_summary'] = line_summary
+SPEC.loader.exec_module(line_summary)
+
+
+class LineSummaryTests(unittest.TestCase):
+    def setUp(self):
+        fechas = pd.date_range('2025-01-01', '2026-12-01', freq='MS')
+        rows = []
+        for linea, base in (('AUTOS', 100.0), ('SOAT', 10.0)):
+            for fecha in fechas:
+                # Dos filas por celda para verificar que se suman
+                for _ in range(2):
+                    rows.append({
+                        'FECHA': fecha,
+                        'ANIO': fecha.year,
+                        'MES': fecha.month,
+                        'PERIODO': fecha.year * 12 + fecha.month,
+                        'LINEA_PLUS': linea,
+                        'IMP_PRIMA': base / 2 if fecha <= pd.Timestamp('2026-03-01') else 0.0,
+                        'PRESUPUESTO': base,
+                    })
+        self.df_full = pd.DataFrame(rows)
+        self.df_periodo = self.df_full[self.df_full['PERIODO'] <= 2026 * 12 + 3]
+        self.fecha_corte = pd.Timestamp('2026-03-15')
+        self.calls = []
+
+    def forecast_lines(self, series_by_line, ref_year, steps):
+        self.calls.append((sorted(series_by_line), ref_year, steps,
+                           {linea: len(serie) for linea, serie in series_by_line.items()}))
+        fechas = [str(f) for f in pd.date_range('2026-03-01', periods=steps, freq='MS')]
+        return {linea: (fechas, [1000.0] * steps, True) for linea in series_by_line}
+
+    def nowcast(self, prod_parcial, pronostico_full):
+        return prod_parcial + pronostico_full / 2
+
+    def build(self, vista, meses=range(1, 13)):
+        resumen = line_summary.build_line_summary(
+            self.df_periodo, vista, 2026, self.fecha_corte, list(meses),
+            forecast_lines=self.forecast_lines, nowcast=self.nowcast,
+            df_presupuesto=self.df_full,
+        )
+        return resumen.set_index('LINEA_PLUS') if not resumen.empty else resumen
+
+    def test_mes_view(self):
+        resumen = self.build("Mes")
+        autos = resumen.loc['AUTOS']
+
+        self.assertEqual(list(resumen.index), ['AUTOS', 'SOAT'])
+        self.assertEqual(autos['Previo 2025 Mes'], 100.0)
+        self.assertEqual(autos['Actual 2026 Mes'], 100.0)
+        self.assertEqual(autos['Proyectado'], 200.0)
+        self.assertEqual(autos['% Ejec.'], 50.0)
+        self.assertEqual(autos['Pronóstico (mes)'], 600.0)
+        self.assertEqual(autos['Faltante proyectado'], 100.0)
+        self.assertEqual(self.calls, [(['AUTOS', 'SOAT'], 2026, 1, {'AUTOS': 15, 'SOAT': 15})])
+
+    def test_anio_view_uses_full_year_budget_and_remaining_forecast(self):
+        resumen = self.build("Año")
+        autos = resumen.loc['AUTOS']
+
+        self.assertEqual(autos['Previo 2025 Año'], 1200.0)
+        self.assertEqual(autos['Actual 2026 Año'], 200.0)
+        self.assertEqual(autos['Proyectado (anual)'], 2400.0)
+        # YTD + nowcast de marzo + 9 meses restantes pronosticados
+        self.assertEqual(autos['Pronóstico (cierre)'], 200.0 + 600.0 + 9 * 1000.0)
+        self.assertEqual(self.calls[0][2], 10)
+
+    def test_acumulado_view_respects_quarter(self):
+        resumen = self.build("Acumulado Mes", meses=[1, 2, 3])
+        autos = resumen.loc['AUTOS']
+
+        self.assertEqual(autos['Previo 2025 Acumulado Mes'], 300.0)
+        self.assertEqual(autos['Actual 2026 Acumulado Mes'], 300.0)
+        self.assertEqual(autos['Proyectado (YTD)'], 600.0)
+        self.assertEqual(autos['Pronóstico (YTD + mes)'], 200.0 + 600.0)
+        self.assertEqual(autos['% Ejec.'], 50.0)
+
+    def test_mes_view_outside_quarter_is_empty(self):
+        self.assertTrue(self.build("Mes", meses=[10, 11, 12]).empty)
+
+    def test_batched_views_match_single_view_and_forecast_once_per_line(self):
+        quarters = {'Todos': list(range(1, 13)), 'Q1': [1, 2, 3], 'Q4': [10, 11, 12]}
+        batched = line_summary.build_line_summaries(
+            self.df_periodo, 2026, self.fecha_corte, quarters,
+            forecast_lines=self.forecast_lines, nowcast=self.nowcast,
+            df_presupuesto=self.df_full,
+        )
+        # Un solo lote: Mes/Acumulado (1 paso) se recortan del horizonte de Año
+        self.assertEqual([(c[0], c[1], c[2]) for c in self.calls], [(['AUTOS', 'SOAT'], 2026, 10)])
+
+        self.assertEqual(len(batched), len(line_summary.VISTAS) * len(quarters))
+        for (vista, label), resumen in batched.items():
+            expected = self.build(vista, meses=quarters[label])
+            if expected.empty:
+                self.assertTrue(resumen.empty)
+                continue
+            pd.testing.assert_frame_equal(resumen.set_index('LINEA_PLUS'), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from modelos.forecast_engine import ForecastEngine  # noqa: E402
+from modelos import mass_forecast  # noqa: E402
+from modelos.forecast_store import ForecastStore  # noqa: E402
+from modelos.mass_forecast import (  # noqa: E402
+    cell_key,
+    cell_training_series,
+    cell_window_forecast,
+    load_cell_forecasts,
+    run_mass_forecast,
+)
+
+FECHA_CORTE = pd.Timestamp('2025-06-15')
+
+
+def _cube(periods: int = 30) -> pd.DataFrame:
+    """Producción mensual de 2 sucursales × 2 líneas hasta el mes de corte (parcial)."""
+    rng = np.random.default_rng(5)
+    fechas = pd.date_range('2023-01-01', periods=periods, freq='MS')
+    rows = []
+    for sucursal in ('NORTE', 'SUR'):
+        for linea in ('AUTOS', 'VIDA'):
+            base = rng.uniform(5e7, 2e8)
+            for i, fecha in enumerate(fechas):
+                rows.append({
+                    'Suc_agrupada': sucursal,
+                    'LINEA_PLUS': linea,
+                    'FECHA': fecha,
+                    'IMP_PRIMA': base * (1 + 0.2 * np.sin(i / 12 * 2 * np.pi)) * rng.uniform(0.9, 1.1),
+                })
+    return pd.DataFrame(rows)
+
+
+class MassForecastTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ForecastStore(Path(self.tmp.name) / 'forecasts.sqlite')
+        self.cells = cell_training_series(_cube(), 2025, FECHA_CORTE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _engine(self) -> ForecastEngine:
+        return ForecastEngine(conservative_factor=1.0, n_jobs=1, store=self.store)
+
+    def test_cells_exclude_partial_month(self):
+        self.assertEqual(sorted(self.cells), [
+            ('NORTE', 'AUTOS'), ('NORTE', 'VIDA'), ('SUR', 'AUTOS'), ('SUR', 'VIDA'),
+        ])
+        for ts in self.cells.values():
+            self.assertEqual(ts.index.max(), pd.Timestamp('2025-05-01'))
+        self.assertEqual(cell_training_series(_cube().drop(columns='Suc_agrupada'), 2025, FECHA_CORTE), {})
+
+    def test_run_stores_every_cell_once_and_resumes(self):
+        engine = self._engine()
+        report = run_mass_forecast(self.cells, engine, chunk_size=3)
+        self.assertEqual((report['ajustadas'], report['respaldo'], report['guardadas']), (4, 0, 0))
+        # Una sola entrada por celda: la del ajuste del engine
+        self.assertEqual(self.store.stats()['entries'], 4)
+
+        forecasts = load_cell_forecasts(self.cells, engine)
+        self.assertEqual(set(forecasts), set(self.cells))
+        for forecast_df in forecasts.values():
+            self.assertEqual(forecast_df['FECHA'].iloc[0], pd.Timestamp('2025-06-01'))
+            self.assertEqual(len(forecast_df), 12)
+
+        report = run_mass_forecast(self.cells, self._engine())
+        self.assertEqual((report['ajustadas'], report['guardadas']), (0, 4))
+
+    def test_time_budget_stores_fallback_and_next_run_refits(self):
+        engine = self._engine()
+        report = run_mass_forecast(self.cells, engine, time_budget=1e-9)
+        self.assertEqual((report['ajustadas'], report['respaldo']), (0, 4))
+        self.assertIsNone(engine.deadline)
+        cached = self.store.get(cell_key(next(iter(self.cells.values())), engine))
+        self.assertEqual(cached['meta']['degraded'], 'respaldo')
+        # Los respaldos no llegan a la app
+        self.assertEqual(load_cell_forecasts(self.cells, engine), {})
+
+        report = run_mass_forecast(self.cells, self._engine(), time_budget=0)
+        self.assertEqual((report['ajustadas'], report['guardadas']), (4, 0))
+        self.assertEqual(len(load_cell_forecasts(self.cells, engine)), 4)
+
+    def test_time_budget_bounds_fits_inside_a_chunk(self):
+        # Celdas con historia suficiente para SARIMAX, en un solo tramo
+        cells = cell_training_series(_cube(periods=42), 2026, pd.Timestamp('2026-06-15'))
+        engine = self._engine()
+        # El tramo empieza dentro del presupuesto, pero el límite del engine ya pasó
+        reloj = mock.Mock(monotonic=time.monotonic, time=lambda: 0.0)
+        with mock.patch.object(mass_forecast, 'time', reloj), \
+                mock.patch.object(engine, 'fit_many', wraps=engine.fit_many) as fit_many:
+            report = run_mass_forecast(cells, engine, time_budget=60)
+        self.assertEqual(fit_many.call_count, 1)
+        self.assertEqual((report['ajustadas'], report['respaldo']), (0, 4))
+        self.assertEqual(set(engine.degraded.values()), {'presupuesto'})
+
+    def test_window_forecast_mixes_actuals_and_forecast(self):
+        ventana = pd.DataFrame({
+            'Suc_agrupada': ['NORTE', 'NORTE', 'SUR', 'SUR', 'CENTRO'],
+            'LINEA_PLUS': ['AUTOS', 'AUTOS', 'AUTOS', 'AUTOS', 'AUTOS'],
+            'FECHA': pd.to_datetime(['2025-05-01', '2025-06-01', '2025-05-01', '2025-06-01', '2025-05-01']),
+            'IMP_PRIMA': [10.0, 4.0, 20.0, 1.0, 7.0],
+        })
+        celdas = pd.DataFrame({
+            'Suc_agrupada': ['NORTE', 'SUR', 'CENTRO'],
+            'LINEA_PLUS': ['AUTOS', 'AUTOS', 'AUTOS'],
+        })
+        forecast = pd.DataFrame({
+            'FECHA': pd.date_range('2025-06-01', periods=3, freq='MS'),
+            'Pronostico_mensual': [15.0, 16.0, 17.0],
+        })
+
+        valores = cell_window_forecast(ventana, celdas, {('NORTE', 'AUTOS'): forecast, ('SUR', 'AUTOS'): None})
+
+        # Mayo real + junio pronosticado; SUR sin pronóstico guardado; CENTRO sin historia
+        self.assertEqual(valores.iloc[0], 25.0)
+        self.assertTrue(np.isnan(valores.iloc[1]))
+        self.assertEqual(valores.iloc[2], 7.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
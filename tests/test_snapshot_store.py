@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / 'utils' / 'snapshot_store.py'
+SPEC = spec_from_file_location('utils.snapshot_store', MODULE_PATH)
+snapshot_module = module_from_spec(SPEC)
+assert SPEC.loader is not None
+SPEC.loader.exec_module(snapshot_module)
+
+SnapshotStore = snapshot_module.SnapshotStore
+content_hash = snapshot_module.content_hash
+
+
+@unittest.skipUnless(snapshot_module._PARQUET_AVAILABLE, 'pyarrow no disponible')
+class SnapshotStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(self.tmp.name)
+        self.df = pd.DataFrame({
+            'Linea +': ['AUTOS', 'SOAT'],
+            'Imp Prima': ['1.234.567,89', '500'],
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_snapshot_is_reused_only_when_hash_matches(self):
+        digest = content_hash(b'payload-v1')
+        self.assertTrue(self.store.write('hoja1', digest, self.df))
+
+        cached = self.store.read('hoja1', expected_hash=digest)
+        pd.testing.assert_frame_equal(cached, self.df)
+        self.assertEqual(cached.attrs['content_hash'], digest)
+
+        self.assertIsNone(self.store.read('hoja1', expected_hash=content_hash(b'payload-v2')))
+
+    def test_last_good_snapshot_is_available_without_hash(self):
+        self.store.write('hoja1', content_hash(b'payload-v1'), self.df)
+        pd.testing.assert_frame_equal(self.store.read('hoja1'), self.df)
+        self.assertIsNone(self.store.read('otra_hoja'))
+
+
+if __name__ == '__main__':
+    unittest.main()
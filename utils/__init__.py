@@ -2,7 +2,7 @@
 """
 Módulo de utilidades para AseguraView
 """
-from .data_loader import load_data, load_cutoff_date
+from .data_loader import load_data, load_cutoff_date, load_normalized_data, load_cube, load_data_and_cutoff
 from .data_processor import normalize_dataframe, parse_dates
 from .formatters import fmt_cop, badge_pct_html, badge_growth_html
 from .date_utils import business_days_left, get_month_range
@@ -10,6 +10,9 @@ from .date_utils import business_days_left, get_month_range
 __all__ = [
     'load_data',
     'load_cutoff_date',
+    'load_normalized_data',
+    'load_cube',
+    'load_data_and_cutoff',
     'normalize_dataframe',
     'parse_dates',
     'fmt_cop',
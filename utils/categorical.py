@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Codificación categórica de las columnas de dimensión.
+
+``normalize_dataframe`` convierte las dimensiones (sucursal, línea, compañía,
+ramo) a ``category`` con categorías ordenadas alfabéticamente. Los filtros del
+dashboard comparan los códigos enteros en lugar de textos fila por fila; las
+funciones aceptan también columnas de texto para no depender del origen.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+DIMENSION_COLUMNS = (
+    'SUCURSAL',
+    'Suc_agrupada',
+    'LINEA',
+    'LINEA_PLUS',
+    'COMPANIA',
+    'CODIGO_RAMO',
+    'RAMO',
+)
+
+
+def encode_dimensions(df: pd.DataFrame, columns: Iterable[str] = DIMENSION_COLUMNS) -> pd.DataFrame:
+    """Convierte las columnas de dimensión presentes a ``category``.
+
+    Las categorías quedan ordenadas, de modo que ordenar o agrupar por la
+    columna produce el mismo orden que con los textos originales.
+    """
+    for col in columns:
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        values = df[col]
+        categories = np.sort(values.dropna().unique().astype(object))
+        df[col] = pd.Categorical(values, categories=categories)
+    return df
+
+
+def _category_codes(series: pd.Series, values: Iterable) -> np.ndarray:
+    """Códigos de ``values`` en las categorías de ``series`` (sin los ausentes)."""
+    codes = series.cat.categories.get_indexer(pd.Index(list(values), dtype=object))
+    return codes[codes >= 0]
+
+
+def eq_mask(series: pd.Series, value) -> np.ndarray:
+    """Máscara booleana ``series == value`` comparando códigos enteros."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = _category_codes(series, [value])
+        if len(codes) == 0:
+            return np.zeros(len(series), dtype=bool)
+        return series.cat.codes.to_numpy() == codes[0]
+    return (series == value).to_numpy()
+
+
+def isin_mask(series: pd.Series, values: Iterable) -> np.ndarray:
+    """Máscara booleana ``series.isin(values)`` comparando códigos enteros."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return np.isin(series.cat.codes.to_numpy(), _category_codes(series, values))
+    return series.isin(list(values)).to_numpy()
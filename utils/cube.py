@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Cubo pre-agregado de producción y presupuesto.
+
+Hoja1 trae muchas filas por combinación de período × línea × sucursal ×
+código. Todas las vistas del dashboard solo necesitan sumas de ``IMP_PRIMA`` y
+``PRESUPUESTO``, así que el DataFrame normalizado se agrega una vez por carga
+de datos a ese grano y las vistas consultan el cubo en lugar de las filas
+crudas.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+# Incrementar cuando cambie el grano o las columnas del cubo.
+CUBE_VERSION = 1
+
+CUBE_DIMENSIONS = (
+    'PERIODO',
+    'ANIO',
+    'MES',
+    'FECHA',
+    'LINEA_PLUS',
+    'SUCURSAL',
+    'Suc_agrupada',
+    'CODIGO',
+)
+CUBE_MEASURES = ('IMP_PRIMA', 'PRESUPUESTO')
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega el DataFrame normalizado al grano de ``CUBE_DIMENSIONS``.
+
+    Las dimensiones ausentes se omiten del grano y las celdas con claves
+    nulas se conservan (``dropna=False``) para no perder producción.
+
+    Args:
+        df: DataFrame normalizado (salida de ``normalize_dataframe``)
+
+    Returns:
+        DataFrame con una fila por celda del cubo y las medidas sumadas
+    """
+    dimensions = [col for col in CUBE_DIMENSIONS if col in df.columns]
+    measures = [col for col in CUBE_MEASURES if col in df.columns]
+    if df.empty or not dimensions or not measures:
+        return df
+
+    cube = (
+        df
+        .groupby(dimensions, dropna=False, observed=True, sort=True)[measures]
+        .sum()
+        .reset_index()
+    )
+    return cube
@@ -1,15 +1,40 @@
 # -*- coding: utf-8 -*-
 """
-Carga de datos desde Google Sheets
+Carga de datos desde el origen configurado (Google Sheets por defecto)
 """
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import streamlit as st
-from config import SHEET_ID, SHEET_NAME_DATOS, SHEET_NAME_FECHA_CORTE
-
-
-def gsheet_csv_url(sheet_id: str, sheet_name: str) -> str:
-    """Genera URL para leer Google Sheet como CSV"""
-    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from config import (
+    DATA_SOURCE,
+    DATA_SOURCE_PATH,
+    SHEET_ID,
+    SHEET_NAME_DATOS,
+    SHEET_NAME_FECHA_CORTE,
+    SNAPSHOT_DIR,
+    SNAPSHOTS_ENABLED,
+)
+from utils.cube import CUBE_VERSION, build_cube
+from utils.data_processor import NORMALIZE_VERSION, normalize_dataframe
+from utils.data_sources import DataSource, DataSourceError, get_data_source, gsheet_csv_url  # noqa: F401
+from utils.performance import timed
+from utils.snapshot_store import SnapshotStore, snapshot_key
+
+
+def _snapshot_store() -> SnapshotStore:
+    return SnapshotStore(SNAPSHOT_DIR, enabled=SNAPSHOTS_ENABLED)
+
+
+def _data_source(sheet_id: str) -> DataSource:
+    return get_data_source(
+        DATA_SOURCE,
+        DATA_SOURCE_PATH,
+        sheet_id=sheet_id,
+        snapshot_store=_snapshot_store(),
+    )
 
 
 @st.cache_data(ttl=1800, show_spinner=False)
@@ -25,10 +50,8 @@ def load_cutoff_date(sheet_id: str = SHEET_ID,
     Returns:
         pd.Timestamp con la fecha de corte
     """
-    url = gsheet_csv_url(sheet_id, sheet_name)
-
     try:
-        df = pd.read_csv(url, header=None)
+        df = _data_source(sheet_id).read_table(sheet_name, header=False)
         raw = str(df.iloc[0, 0]).strip() if not df.empty else ""
 
         # Parsear fecha con formato colombiano (día primero)
@@ -51,27 +74,148 @@ def load_data(sheet_id: str = SHEET_ID,
     """
     Carga datos principales desde Hoja1.
 
+    Con Google Sheets la descarga se compara por hash contra el último
+    snapshot local: si la hoja no cambió se lee el Parquet guardado en vez de
+    re-parsear el CSV, y si Google Sheets no responde se sirve el último
+    snapshot válido.
+
     Args:
         sheet_id: ID del Google Sheet
         sheet_name: Nombre de la hoja (por defecto Hoja1)
 
     Returns:
-        DataFrame con datos normalizados, o DataFrame vacío si hay error temporal.
+        DataFrame crudo con ``attrs['content_hash']`` del contenido leído.
     """
-    url = gsheet_csv_url(sheet_id, sheet_name)
+    source = _data_source(sheet_id)
 
     try:
-        df = pd.read_csv(url)
-
-        if df.empty:
-            st.error(f"❌ {sheet_name} está vacía. Verifica los datos en Google Sheets.")
-            st.stop()
-
-        return df
-
-    except Exception as e:
+        df = source.read_table(sheet_name)
+    except DataSourceError as e:
         st.error(
-            f"❌ Error cargando datos desde {sheet_name}: {e}\n\n"
+            f"❌ Error cargando datos desde {sheet_name} ({source.describe()}): {e}\n\n"
             "Intenta recargar la página en unos segundos."
         )
         st.stop()
+
+    if df.attrs.get("stale_error"):
+        st.warning(
+            f"⚠️ No se pudo descargar {sheet_name} ({df.attrs['stale_error']}). "
+            "Mostrando el último snapshot local disponible."
+        )
+
+    if df.empty:
+        st.error(f"❌ {sheet_name} está vacía. Verifica los datos en {source.describe()}.")
+        st.stop()
+
+    return df
+
+
+def _load_derived(df_raw: pd.DataFrame, sheet_id: str, sheet_name: str,
+                  kind: str, version: str, build) -> pd.DataFrame:
+    """
+    Devuelve un derivado de Hoja1 reutilizando su snapshot procesado.
+
+    El snapshot se valida con el hash del contenido crudo más ``version``;
+    si no coincide se recalcula con ``build()`` y se guarda.
+    """
+    raw_hash = df_raw.attrs.get("content_hash")
+    if not raw_hash:
+        return build()
+
+    store = _snapshot_store()
+    key = snapshot_key(DATA_SOURCE, sheet_id, sheet_name, kind)
+    version_hash = f"{raw_hash}:{version}"
+
+    df_derived = store.read(key, expected_hash=version_hash)
+    if df_derived is None:
+        df_derived = build()
+        store.write(key, version_hash, df_derived)
+        df_derived.attrs["content_hash"] = version_hash
+    return df_derived
+
+
+def _normalized_from_raw(df_raw: pd.DataFrame, sheet_id: str, sheet_name: str) -> pd.DataFrame:
+    return _load_derived(
+        df_raw, sheet_id, sheet_name, "normalized", f"v{NORMALIZE_VERSION}",
+        lambda: normalize_dataframe(df_raw),
+    )
+
+
+def load_normalized_data(sheet_id: str = SHEET_ID,
+                         sheet_name: str = SHEET_NAME_DATOS) -> pd.DataFrame:
+    """
+    Carga Hoja1 ya normalizada reutilizando el snapshot procesado.
+
+    El snapshot normalizado se valida con el hash del contenido crudo y la
+    versión de ``normalize_dataframe``, de modo que un reinicio con la hoja
+    sin cambios no repite la normalización.
+
+    Args:
+        sheet_id: ID del Google Sheet
+        sheet_name: Nombre de la hoja (por defecto Hoja1)
+
+    Returns:
+        DataFrame normalizado
+    """
+    return _normalized_from_raw(load_data(sheet_id, sheet_name), sheet_id, sheet_name)
+
+
+def load_cube(sheet_id: str = SHEET_ID,
+              sheet_name: str = SHEET_NAME_DATOS) -> pd.DataFrame:
+    """
+    Carga el cubo pre-agregado de Hoja1 (ver ``utils.cube``).
+
+    Con la hoja sin cambios el cubo se lee directo de su snapshot, sin
+    normalizar ni agregar de nuevo. ``attrs['content_hash']`` identifica la
+    versión de los datos.
+
+    Args:
+        sheet_id: ID del Google Sheet
+        sheet_name: Nombre de la hoja (por defecto Hoja1)
+
+    Returns:
+        DataFrame agregado por período × línea × sucursal × código
+    """
+    df_raw = load_data(sheet_id, sheet_name)
+    return _load_derived(
+        df_raw, sheet_id, sheet_name, "cube", f"v{NORMALIZE_VERSION}:c{CUBE_VERSION}",
+        lambda: build_cube(_normalized_from_raw(df_raw, sheet_id, sheet_name)),
+    )
+
+
+def _with_script_context(func, ctx):
+    """Propaga el contexto de Streamlit al hilo que ejecuta ``func``."""
+    def runner(*args, **kwargs):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args, **kwargs)
+    return runner
+
+
+def load_data_and_cutoff(sheet_id: str = SHEET_ID,
+                         sheet_name_datos: str = SHEET_NAME_DATOS,
+                         sheet_name_fecha: str = SHEET_NAME_FECHA_CORTE,
+                         aggregate: bool = False) -> tuple:
+    """
+    Carga Hoja1 normalizada y la fecha de corte de Hoja2 en paralelo.
+
+    Ambas descargas comparten la sesión HTTP, por lo que la latencia en frío
+    es la del request más lento y no la suma de los dos.
+
+    Args:
+        aggregate: True para devolver el cubo pre-agregado en lugar de las filas
+
+    Returns:
+        Tupla (DataFrame normalizado o cubo, pd.Timestamp fecha de corte)
+    """
+    load_datos = load_cube if aggregate else load_normalized_data
+    ctx = get_script_run_ctx()
+    with timed("load.cold_start"):
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="sheets") as pool:
+            fut_datos = pool.submit(
+                _with_script_context(load_datos, ctx), sheet_id, sheet_name_datos
+            )
+            fut_fecha = pool.submit(
+                _with_script_context(load_cutoff_date, ctx), sheet_id, sheet_name_fecha
+            )
+            return fut_datos.result(), fut_fecha.result()
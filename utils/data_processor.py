@@ -4,17 +4,111 @@ Procesamiento y normalización de datos
 """
 import pandas as pd
 import numpy as np
-from config import DATE_PARSE_DAYFIRST
+from config import DATE_FORMAT, DATE_PARSE_DAYFIRST
+from utils.categorical import encode_dimensions
+from utils.periods import add_period_columns
 
+# Incrementar cuando cambie la salida de normalize_dataframe para invalidar
+# los snapshots normalizados guardados en disco.
+NORMALIZE_VERSION = 4
 
-def parse_number_co(series: pd.Series) -> pd.Series:
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    _ARROW_AVAILABLE = True
+except ModuleNotFoundError:  # pragma: no cover - fallback para entornos sin pyarrow
+    _ARROW_AVAILABLE = False
+
+
+def _parse_uniques_pandas(uniques: pd.Series) -> np.ndarray:
+    """Limpia con regex de pandas y convierte con ``pd.to_numeric``."""
+    s = uniques.astype(str)
+    s = s.str.replace(r"[^\d,.\-]", "", regex=True)
+    s = s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    return pd.to_numeric(s, errors="coerce").to_numpy()
+
+
+def _parse_uniques_arrow(uniques: pd.Series) -> np.ndarray:
+    """Misma limpieza con kernels de texto de Arrow y cast nativo a número.
+
+    Si algún valor no es convertible (vacío, "-", etc.) se recurre a
+    ``pd.to_numeric`` para conservar la semántica de ``errors="coerce"``.
+    """
+    arr = pa.array(uniques.astype(str).to_numpy(dtype=object), type=pa.string())
+    arr = pc.replace_substring_regex(arr, pattern=r"[^0-9,.\-]", replacement="")
+    arr = pc.replace_substring(arr, pattern=".", replacement="")
+    arr = pc.replace_substring(arr, pattern=",", replacement=".")
+    try:
+        # pd.to_numeric devuelve int64 solo si ningún valor trae decimales.
+        if pc.any(pc.match_substring(arr, ".")).as_py():
+            return pc.cast(arr, pa.float64()).to_numpy()
+        return pc.cast(arr, pa.int64()).to_numpy()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        cleaned = pd.Series(arr.to_numpy(zero_copy_only=False), dtype=object)
+        return pd.to_numeric(cleaned, errors="coerce").to_numpy()
+
+
+def parse_number_co(series: pd.Series, use_arrow: bool | None = None) -> pd.Series:
     """
     Parsea números en formato colombiano (1.234.567,89)
+
+    Las columnas ya numéricas se devuelven sin re-parsear. En columnas de
+    texto solo se limpian los valores únicos y el resultado se proyecta de
+    vuelta con los códigos de ``pd.factorize``.
+
+    Args:
+        series: Columna a convertir
+        use_arrow: Usa kernels de Arrow; None los usa si pyarrow está instalado
     """
-    s = series.astype(str)
-    s = s.str.replace(r"[^\d,.\-]", "", regex=True)
-    s = s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
-    return pd.to_numeric(s, errors="coerce")
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return pd.to_numeric(series, errors="coerce")
+
+    if use_arrow is None:
+        use_arrow = _ARROW_AVAILABLE
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = pd.Series(uniques, dtype=object)
+    if use_arrow and _ARROW_AVAILABLE:
+        parsed = _parse_uniques_arrow(uniques)
+    else:
+        parsed = _parse_uniques_pandas(uniques)
+
+    missing = codes < 0
+    if missing.any() or len(parsed) == 0:
+        # Los nulos originales ("nan" tras astype(str)) terminan en NaN.
+        parsed = np.append(parsed.astype(np.float64), np.nan)
+        codes = np.where(missing, len(parsed) - 1, codes)
+
+    return pd.Series(parsed.take(codes), index=series.index, name=series.name)
+
+
+def parse_month_text(series: pd.Series) -> pd.Series:
+    """
+    Convierte textos de mes (p. ej. ``1/1/2026``) al primer día del mes.
+
+    La columna tiene pocos valores distintos, así que cada texto único se
+    parsea una sola vez: primero con ``DATE_FORMAT`` explícito y, solo para
+    los que fallen, con inferencia. El resultado se proyecta a todas las filas
+    con los códigos de ``pd.factorize``.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = pd.Series(uniques, dtype=object).astype(str).str.strip()
+
+    fechas = pd.to_datetime(uniques, format=DATE_FORMAT, errors='coerce')
+    pendientes = fechas.isna() & uniques.ne('')
+    if pendientes.any():
+        fechas[pendientes] = pd.to_datetime(
+            uniques[pendientes],
+            format='mixed',
+            dayfirst=DATE_PARSE_DAYFIRST,
+            errors='coerce'
+        )
+
+    fechas = fechas.dt.to_period('M').dt.to_timestamp()
+    valores = np.append(fechas.to_numpy(), np.datetime64('NaT'))
+    codes = np.where(codes < 0, len(valores) - 1, codes)
+    return pd.Series(valores.take(codes), index=series.index, name='FECHA')
 
 
 def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
@@ -24,14 +118,12 @@ def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     
     if 'MES_TXT' in df.columns:
-        df['FECHA'] = pd.to_datetime(
-            df['MES_TXT'], 
-            dayfirst=DATE_PARSE_DAYFIRST,
-            errors='coerce'
-        )
-    elif 'ANIO' in df.columns and 'MES' in df.columns:
+        df['FECHA'] = parse_month_text(df['MES_TXT'])
+        return df
+    
+    if 'ANIO' in df.columns and 'MES' in df.columns:
         try:
-            df['FECHA'] = pd.to_datetime(
+            fecha = pd.to_datetime(
                 dict(
                     year=df['ANIO'].astype(int),
                     month=df['MES'].astype(int),
@@ -40,19 +132,16 @@ def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
                 errors='coerce'
             )
         except Exception:
-            df['FECHA'] = pd.NaT
+            fecha = pd.Series(pd.NaT, index=df.index, dtype='datetime64[us]')
     elif 'ANIO' in df.columns:
-        df['FECHA'] = pd.to_datetime(
+        fecha = pd.to_datetime(
             df['ANIO'].astype(str) + "-01-01",
             errors='coerce'
         )
     else:
-        df['FECHA'] = pd.NaT
+        fecha = pd.Series(pd.NaT, index=df.index, dtype='datetime64[us]')
     
-    df['FECHA'] = df['FECHA'].apply(
-        lambda x: pd.Timestamp(year=x.year, month=x.month, day=1) 
-        if pd.notna(x) else pd.NaT
-    )
+    df['FECHA'] = fecha.dt.to_period('M').dt.to_timestamp()
     
     return df
 
@@ -105,9 +194,9 @@ def normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     if 'CODIGO_RAMO' in df.columns and 'RAMO' not in df.columns:
         df['RAMO'] = df['CODIGO_RAMO']
     
-    if 'ANIO' not in df.columns and 'FECHA' in df.columns:
-        df['ANIO'] = df['FECHA'].dt.year
+    df = encode_dimensions(df)
     
     df = df.dropna(subset=['FECHA'])
+    df = add_period_columns(df)
     
     return df
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""Orígenes de datos intercambiables para las hojas de AseguraView.
+
+El backend se selecciona con ``ASEGURAVIEW_DATA_SOURCE`` (``gsheets``, ``csv``,
+``parquet`` o ``sqlite``). Los backends locales permiten correr el dashboard y
+los benchmarks sin red, por ejemplo contra datasets sintéticos grandes.
+
+Todas las implementaciones devuelven el DataFrame crudo (mismas columnas que
+la hoja original) con ``attrs['content_hash']`` para revalidar snapshots.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import closing
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.performance import timed
+from utils.snapshot_store import SnapshotStore, content_hash, snapshot_key
+
+_DOWNLOAD_TIMEOUT_SECONDS = 60
+_HTTP_POOL_SIZE = 4
+
+_session_lock = threading.Lock()
+_http_session: requests.Session | None = None
+
+
+class DataSourceError(Exception):
+    """Error al leer una tabla desde el origen de datos configurado."""
+
+
+def gsheet_csv_url(sheet_id: str, sheet_name: str) -> str:
+    """Genera URL para leer Google Sheet como CSV"""
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
+
+
+def _get_http_session() -> requests.Session:
+    """Sesión HTTP compartida (keep-alive + gzip) para todas las descargas."""
+    global _http_session
+    with _session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=_HTTP_POOL_SIZE, pool_maxsize=_HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            })
+            _http_session = session
+        return _http_session
+
+
+def _download_csv(url: str) -> bytes:
+    """Descarga el CSV completo de una hoja como bytes."""
+    response = _get_http_session().get(url, timeout=_DOWNLOAD_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response.content
+
+
+def _file_fingerprint(path: Path) -> str:
+    """Hash barato de un archivo local basado en ruta, tamaño y mtime."""
+    stat = path.stat()
+    return content_hash(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+
+class DataSource(ABC):
+    """Interfaz común de los orígenes de datos."""
+
+    kind = ""
+
+    @abstractmethod
+    def read_table(self, table: str, header: bool = True) -> pd.DataFrame:
+        """Lee una tabla (hoja) completa.
+
+        Args:
+            table: Nombre de la hoja/tabla (p. ej. Hoja1)
+            header: False para leer la primera fila como dato (hoja de fecha de corte)
+
+        Returns:
+            DataFrame crudo con ``attrs['content_hash']``
+
+        Raises:
+            DataSourceError: si la tabla no se puede leer
+        """
+
+    def describe(self) -> str:
+        """Descripción corta del origen para mensajes al usuario."""
+        return self.kind
+
+
+class GoogleSheetsSource(DataSource):
+    """Lee hojas por el endpoint gviz de Google Sheets con snapshots locales."""
+
+    kind = "gsheets"
+
+    def __init__(self, sheet_id: str, snapshot_store: SnapshotStore | None = None):
+        self.sheet_id = sheet_id
+        self.snapshot_store = snapshot_store
+
+    def describe(self) -> str:
+        return "Google Sheets"
+
+    def read_table(self, table: str, header: bool = True) -> pd.DataFrame:
+        url = gsheet_csv_url(self.sheet_id, table)
+        # Solo las tablas con encabezado se guardan: Parquet exige nombres de
+        # columna de texto y la hoja de fecha de corte es una sola celda.
+        store = self.snapshot_store if header else None
+        key = snapshot_key(self.sheet_id, table, "raw")
+
+        try:
+            with timed(f"download.{table}"):
+                payload = _download_csv(url)
+        except Exception as e:
+            df_snapshot = store.read(key) if store is not None else None
+            if df_snapshot is None:
+                raise DataSourceError(str(e)) from e
+            # Último snapshot válido: se marca como desactualizado para avisar.
+            df_snapshot.attrs["stale_error"] = str(e)
+            return df_snapshot
+
+        digest = content_hash(payload)
+        if store is not None:
+            df = store.read(key, expected_hash=digest)
+            if df is not None:
+                return df
+
+        try:
+            df = pd.read_csv(BytesIO(payload), header=0 if header else None)
+        except Exception as e:
+            raise DataSourceError(str(e)) from e
+
+        if store is not None and not df.empty:
+            store.write(key, digest, df)
+        df.attrs["content_hash"] = digest
+        return df
+
+
+class CsvSource(DataSource):
+    """Lee ``<directorio>/<tabla>.csv``."""
+
+    kind = "csv"
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def describe(self) -> str:
+        return f"CSV local ({self.directory})"
+
+    def read_table(self, table: str, header: bool = True) -> pd.DataFrame:
+        path = self.directory / f"{table}.csv"
+        try:
+            df = pd.read_csv(path, header=0 if header else None)
+        except Exception as e:
+            raise DataSourceError(str(e)) from e
+        df.attrs["content_hash"] = _file_fingerprint(path)
+        return df
+
+
+class ParquetSource(DataSource):
+    """Lee ``<directorio>/<tabla>.parquet``."""
+
+    kind = "parquet"
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def describe(self) -> str:
+        return f"Parquet local ({self.directory})"
+
+    def read_table(self, table: str, header: bool = True) -> pd.DataFrame:
+        path = self.directory / f"{table}.parquet"
+        try:
+            df = pd.read_parquet(path)
+        except Exception as e:
+            raise DataSourceError(str(e)) from e
+        df.attrs["content_hash"] = _file_fingerprint(path)
+        return df
+
+
+class SqliteSource(DataSource):
+    """Lee cada hoja como una tabla de un archivo SQLite."""
+
+    kind = "sqlite"
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def describe(self) -> str:
+        return f"SQLite local ({self.path})"
+
+    def read_table(self, table: str, header: bool = True) -> pd.DataFrame:
+        if not self.path.exists():
+            raise DataSourceError(f"No existe el archivo {self.path}")
+        quoted = '"' + table.replace('"', '""') + '"'
+        try:
+            with closing(sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)) as conn:
+                df = pd.read_sql_query(f"SELECT * FROM {quoted}", conn)
+        except Exception as e:
+            raise DataSourceError(str(e)) from e
+        df.attrs["content_hash"] = _file_fingerprint(self.path)
+        return df
+
+
+def get_data_source(kind: str, location: str | Path, sheet_id: str = "",
+                    snapshot_store: SnapshotStore | None = None) -> DataSource:
+    """Construye el origen de datos configurado.
+
+    Args:
+        kind: gsheets, csv, parquet o sqlite
+        location: Directorio (csv/parquet) o archivo (sqlite); ignorado en gsheets
+        sheet_id: ID del Google Sheet (solo gsheets)
+        snapshot_store: Snapshots locales para revalidar descargas (solo gsheets)
+    """
+    kind = (kind or "gsheets").strip().lower()
+    if kind == "gsheets":
+        return GoogleSheetsSource(sheet_id, snapshot_store=snapshot_store)
+    if kind == "csv":
+        return CsvSource(location)
+    if kind == "parquet":
+        return ParquetSource(location)
+    if kind == "sqlite":
+        return SqliteSource(location)
+    raise ValueError(f"Origen de datos no soportado: {kind!r}")
@@ -11,6 +11,7 @@ import pandas as pd
 
 from utils.formatters import fmt_cop
 from utils.performance import calculate_increments, fast_proportional_distribution
+from utils.periods import ensure_period_columns
 
 MONTH_ABBR = {
     1: "Ene",
@@ -98,21 +99,23 @@ def build_monthly_distribution(
 
     previous_year, previous_month = _previous_cutoff_period(ref_year, cutoff_date)
 
-    df_work = df_filtered[['FECHA', 'Suc_agrupada', 'LINEA_PLUS', 'PRESUPUESTO', 'IMP_PRIMA']].copy()
+    df_work = ensure_period_columns(df_filtered)[
+        ['ANIO', 'MES', 'Suc_agrupada', 'LINEA_PLUS', 'PRESUPUESTO', 'IMP_PRIMA']
+    ].copy()
     df_work = df_work[df_work['LINEA_PLUS'].notna()].copy()
     df_work['PRESUPUESTO'] = pd.to_numeric(df_work['PRESUPUESTO'], errors='coerce').fillna(0.0)
     df_work['IMP_PRIMA'] = pd.to_numeric(df_work['IMP_PRIMA'], errors='coerce').fillna(0.0)
 
     df_ytd = df_work[
-        (df_work['FECHA'].dt.year == previous_year) &
-        (df_work['FECHA'].dt.month <= previous_month)
+        (df_work['ANIO'] == previous_year) &
+        (df_work['MES'] <= previous_month)
     ]
     if df_ytd.empty:
         return pd.DataFrame(), remaining_months
 
     faltante_by_row = (
         df_ytd
-        .groupby(['Suc_agrupada', 'LINEA_PLUS'], dropna=False)[['PRESUPUESTO', 'IMP_PRIMA']]
+        .groupby(['Suc_agrupada', 'LINEA_PLUS'], dropna=False, observed=True)[['PRESUPUESTO', 'IMP_PRIMA']]
         .sum()
         .rename(columns={
             'PRESUPUESTO': 'Presupuesto_Acumulado_Anterior',
@@ -125,17 +128,15 @@ def build_monthly_distribution(
     )
 
     df_budget = df_work[
-        (df_work['FECHA'].dt.year == int(ref_year)) &
-        (df_work['FECHA'].dt.month.isin(remaining_months))
-    ][['Suc_agrupada', 'LINEA_PLUS', 'FECHA', 'PRESUPUESTO']].copy()
+        (df_work['ANIO'] == int(ref_year)) &
+        (df_work['MES'].isin(remaining_months))
+    ][['Suc_agrupada', 'LINEA_PLUS', 'MES', 'PRESUPUESTO']]
     if df_budget.empty:
         return pd.DataFrame(), remaining_months
 
-    df_budget['MES'] = df_budget['FECHA'].dt.month
-
     monthly_budget = (
         df_budget
-        .groupby(['Suc_agrupada', 'LINEA_PLUS', 'MES'], dropna=False)['PRESUPUESTO']
+        .groupby(['Suc_agrupada', 'LINEA_PLUS', 'MES'], dropna=False, observed=True)['PRESUPUESTO']
         .sum()
         .unstack(fill_value=0.0)
         .reindex(columns=list(remaining_months), fill_value=0.0)
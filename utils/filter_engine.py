@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""Motor de filtros por índices de posición.
+
+Para cada dimensión filtrable se precalculan, una vez por versión de datos,
+las posiciones de fila de cada valor (ordenadas). Un filtro del sidebar se
+resuelve intersectando esos arreglos de posiciones, sin ``df.copy()`` ni
+máscaras booleanas sobre todo el DataFrame, y el resultado se memoriza por la
+tupla de filtros: repetir una selección no vuelve a tocar los datos.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from utils.snapshot_store import content_hash
+
+FILTER_DIMENSIONS = ('LINEA_PLUS', 'CODIGO', 'SUCURSAL', 'Suc_agrupada')
+RANGE_DIMENSIONS = ('ANIO', 'PERIODO')
+_MAX_CACHED_SELECTIONS = 32
+
+
+def data_version(df: pd.DataFrame) -> str:
+    """Identificador de la versión de los datos para llaves de caché.
+
+    Usa ``attrs['content_hash']`` (hash del snapshot) y, si no existe, un
+    hash del contenido del DataFrame.
+    """
+    version = df.attrs.get('content_hash')
+    if version:
+        return str(version)
+    hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return content_hash(hashed.tobytes())
+
+
+def _value_positions(series: pd.Series) -> dict:
+    """Posiciones ordenadas de las filas de cada valor distinto de ``series``."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    # Las filas nulas (código -1) quedan al inicio del orden y no se indexan.
+    start = int((codes < 0).sum())
+    positions = {}
+    for value, count in zip(list(uniques), counts):
+        positions[value] = order[start:start + count]
+        start += count
+    return positions
+
+
+class FilterEngine:
+    """Filtra un DataFrame con índices de posición precalculados por dimensión."""
+
+    def __init__(self, df: pd.DataFrame, dimensions: Iterable[str] = FILTER_DIMENSIONS):
+        self.df = df
+        self._n_rows = len(df)
+        self._positions = {
+            col: _value_positions(df[col]) for col in dimensions if col in df.columns
+        }
+        self._ranges = {}
+        for col in RANGE_DIMENSIONS:
+            if col in df.columns:
+                values = df[col].to_numpy()
+                order = np.argsort(values, kind='stable')
+                self._ranges[col] = (values[order], order)
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _isin_positions(self, col: str, values: Iterable) -> np.ndarray:
+        index = self._positions[col]
+        parts = [index[value] for value in values if value in index]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts))
+
+    def _max_positions(self, col: str, max_value: int) -> np.ndarray:
+        sorted_values, order = self._ranges[col]
+        stop = np.searchsorted(sorted_values, max_value, side='right')
+        return np.sort(order[:stop])
+
+    def select(self, linea_plus: str | None = None, codigos: Iterable = (),
+               sucursales: Iterable = (), suc_agrupadas: Iterable = (),
+               anio_max: int | None = None, periodo_max: int | None = None) -> np.ndarray | None:
+        """
+        Posiciones de fila que cumplen todos los filtros activos.
+
+        Un filtro vacío o ``None`` no restringe. Devuelve ``None`` cuando
+        ningún filtro aplica (todas las filas).
+        """
+        requested = [
+            ('LINEA_PLUS', [linea_plus] if linea_plus is not None else []),
+            ('CODIGO', list(codigos or [])),
+            ('SUCURSAL', list(sucursales or [])),
+            ('Suc_agrupada', list(suc_agrupadas or [])),
+        ]
+        selected = None
+        for col, values in requested:
+            if not values or col not in self._positions:
+                continue
+            positions = self._isin_positions(col, values)
+            selected = positions if selected is None else np.intersect1d(
+                selected, positions, assume_unique=True
+            )
+
+        for col, max_value in (('ANIO', anio_max), ('PERIODO', periodo_max)):
+            if max_value is None or col not in self._ranges:
+                continue
+            positions = self._max_positions(col, max_value)
+            if selected is None and len(positions) == self._n_rows:
+                continue
+            selected = positions if selected is None else np.intersect1d(
+                selected, positions, assume_unique=True
+            )
+        return selected
+
+    def filter(self, linea_plus: str | None = None, codigos: Iterable = (),
+               sucursales: Iterable = (), suc_agrupadas: Iterable = (),
+               anio_max: int | None = None, periodo_max: int | None = None) -> pd.DataFrame:
+        """
+        Devuelve las filas seleccionadas, memorizadas por la tupla de filtros.
+
+        Sin filtros activos se devuelve el DataFrame original sin copiarlo. El
+        resultado se comparte entre llamadas: tratarlo como solo lectura.
+        """
+        key = (
+            linea_plus,
+            tuple(codigos or ()),
+            tuple(sucursales or ()),
+            tuple(suc_agrupadas or ()),
+            anio_max,
+            periodo_max,
+        )
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        positions = self.select(linea_plus, codigos, sucursales, suc_agrupadas, anio_max, periodo_max)
+        result = self.df if positions is None else self.df.take(positions)
+
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > _MAX_CACHED_SELECTIONS:
+                self._cache.popitem(last=False)
+        return result
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""Resumen por Línea+ para las vistas Mes, Año y Acumulado Mes.
+
+Las sumas de producción y presupuesto se obtienen de una sola agregación por
+``LINEA_PLUS × ANIO × MES`` convertida en matrices línea × mes. Todas las
+combinaciones vista × trimestre salen de productos de esas matrices con los
+meses de cada trimestre, y los pronósticos se piden una sola vez por línea,
+de modo que cambiar de vista o trimestre no recalcula nada.
+
+El módulo no depende de Streamlit: el pronóstico (un lote con todas las
+líneas) y el nowcast llegan como funciones, para que la app use sus versiones cacheadas y las pruebas puedan
+inyectar versiones simples.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+from modelos.forecast_engine import ForecastEngine
+
+# forecast_lines({linea: serie_mensual}, ref_year, steps) -> {linea: (fechas, valores, is_partial)}
+ForecastLinesFn = Callable[[dict, int, int], dict]
+# nowcast(prod_parcial, pronostico_mes_completo) -> float
+NowcastFn = Callable[[float, float], float]
+
+VISTAS = ("Mes", "Año", "Acumulado Mes")
+
+FALTANTE_COL = "Faltante proyectado"
+PROYECTADO_VS_PRONOSTICO_COL = "Proyectado(-)Pronóstico"
+COMPENSACION_COL = "Compensación de faltante"
+REQ_DIA_FC_COL = "Req x día Fc (días calendario)"
+REQ_DIA_PRES_COL = "Req x día Pres (días calendario)"
+
+
+def summary_columns(vista_mes: str, ref_year: int) -> dict:
+    """Nombres de columnas del resumen según la vista."""
+    if vista_mes == "Año":
+        sufijo, proyectado, pronostico = "Año", "Proyectado (anual)", "Pronóstico (cierre)"
+    elif vista_mes == "Mes":
+        sufijo, proyectado, pronostico = "Mes", "Proyectado", "Pronóstico (mes)"
+    else:
+        sufijo, proyectado, pronostico = "Acumulado Mes", "Proyectado (YTD)", "Pronóstico (YTD + mes)"
+    return {
+        'previo': f"Previo {ref_year - 1} {sufijo}",
+        'actual': f"Actual {ref_year} {sufijo}",
+        'proyectado': proyectado,
+        'pronostico': pronostico,
+        'faltante': FALTANTE_COL,
+        'proyectado_vs_pronostico': PROYECTADO_VS_PRONOSTICO_COL,
+        'compensacion': COMPENSACION_COL,
+        'req_dia_fc': REQ_DIA_FC_COL,
+        'req_dia_pres': REQ_DIA_PRES_COL,
+    }
+
+
+def aggregate_line_periods(df: pd.DataFrame) -> pd.DataFrame:
+    """Suma IMP_PRIMA/PRESUPUESTO por LINEA_PLUS × ANIO × MES en una pasada."""
+    measures = [col for col in ('IMP_PRIMA', 'PRESUPUESTO') if col in df.columns]
+    agg = (
+        df.groupby(['LINEA_PLUS', 'ANIO', 'MES'], observed=True)[measures]
+        .sum()
+        .reset_index()
+    )
+    if 'PRESUPUESTO' not in agg.columns:
+        agg['PRESUPUESTO'] = 0.0
+    return agg
+
+
+def _month_matrix(agg: pd.DataFrame, year: int, col: str, lineas: list) -> np.ndarray:
+    """Matriz línea × mes (12 columnas) con la suma de ``col`` en ``year``."""
+    matrix = np.zeros((len(lineas), 12), dtype=np.float64)
+    rows = agg[agg['ANIO'].to_numpy() == year]
+    if rows.empty:
+        return matrix
+    line_idx = pd.Index(lineas).get_indexer(rows['LINEA_PLUS'].astype(object))
+    valid = line_idx >= 0
+    np.add.at(
+        matrix,
+        (line_idx[valid], rows['MES'].to_numpy()[valid] - 1),
+        rows[col].to_numpy(dtype=np.float64)[valid],
+    )
+    return matrix
+
+
+def _safe_ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """``num / den`` con 0.0 donde ``den <= 0``."""
+    out = np.zeros_like(num, dtype=np.float64)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def _growth_pct(value: np.ndarray, base: np.ndarray) -> np.ndarray:
+    return np.where(base > 0, (_safe_ratio(value, base) - 1) * 100, 0.0)
+
+
+def _steps_to_year_end(serie: pd.Series, ref_year: int, fecha_corte: pd.Timestamp) -> int:
+    """Meses por pronosticar desde el último mes completo hasta diciembre."""
+    engine = ForecastEngine()
+    serie_clean = engine.sanitize_series(serie, ref_year)
+    serie_train, cur_month, is_partial = engine.split_series_exclude_partial(
+        serie_clean, ref_year, fecha_corte
+    )
+    # last_month = 0 cuando el mes parcial es enero (no hay meses completados)
+    if is_partial and cur_month:
+        last_month = max(0, cur_month.month - 1)
+    else:
+        last_month = serie_train.index.max().month if not serie_train.empty else fecha_corte.month
+    return max(1, 12 - last_month)
+
+
+def _month_weights(meses: Iterable[int]) -> np.ndarray:
+    """Vector 0/1 de 12 posiciones con los meses seleccionados."""
+    weights = np.zeros(12, dtype=np.float64)
+    for month in meses:
+        weights[int(month) - 1] = 1.0
+    return weights
+
+
+def build_line_summaries(
+    df_periodo: pd.DataFrame,
+    ref_year: int,
+    fecha_corte: pd.Timestamp,
+    quarters: dict,
+    forecast_lines: ForecastLinesFn,
+    nowcast: NowcastFn,
+    df_presupuesto: pd.DataFrame | None = None,
+    vistas: Iterable[str] = VISTAS,
+) -> dict:
+    """
+    Construye ``df_resumen`` para cada combinación vista × trimestre.
+
+    Args:
+        df_periodo: Datos filtrados hasta el período de corte
+        ref_year: Año de análisis
+        fecha_corte: Fecha de corte de los datos
+        quarters: Etiqueta del trimestre -> meses que incluye
+        forecast_lines: Pronóstico de un lote de líneas; por línea devuelve
+            fechas, valores ya ajustados por línea e indicador de mes parcial.
+            Se llama una vez por año de referencia con el horizonte máximo
+            que necesitan las vistas; los horizontes cortos se recortan
+        nowcast: Nowcast del mes en curso a partir de la producción parcial
+        df_presupuesto: Datos filtrados sin corte de período para el
+            presupuesto anual (vista Año); por defecto ``df_periodo``
+        vistas: Vistas a calcular ("Mes", "Año", "Acumulado Mes")
+
+    Returns:
+        Dict ``{(vista, trimestre): DataFrame}``; cada DataFrame tiene una fila
+        por línea (sin fila TOTAL) y las columnas de ``summary_columns``.
+    """
+    vistas = list(vistas)
+    results = {(vista, label): pd.DataFrame() for vista in vistas for label in quarters}
+    if df_periodo.empty or 'LINEA_PLUS' not in df_periodo.columns:
+        return results
+
+    agg = aggregate_line_periods(df_periodo)
+    lineas = sorted(agg['LINEA_PLUS'].dropna().unique())
+    if not lineas:
+        return results
+
+    n_lineas = len(lineas)
+    mes_corte = int(fecha_corte.month)
+    labels = list(quarters)
+    # Pesos trimestre × mes: una multiplicación suma cada trimestre a la vez
+    weights = np.vstack([_month_weights(quarters[label]) for label in labels])
+    hasta_corte = np.arange(1, 13) <= mes_corte
+    antes_corte = np.arange(1, 13) < mes_corte
+    en_quarter = {label: mes_corte in set(int(m) for m in quarters[label]) for label in labels}
+
+    prod_previo = _month_matrix(agg, ref_year - 1, 'IMP_PRIMA', lineas)
+    prod_actual = _month_matrix(agg, ref_year, 'IMP_PRIMA', lineas)
+    presup_actual = _month_matrix(agg, ref_year, 'PRESUPUESTO', lineas)
+    prod_anio_corte = _month_matrix(agg, fecha_corte.year, 'IMP_PRIMA', lineas)
+    presup_anio_corte = _month_matrix(agg, fecha_corte.year, 'PRESUPUESTO', lineas)
+    prod_mes_corte = prod_anio_corte[:, mes_corte - 1]
+    presup_mes_corte = presup_anio_corte[:, mes_corte - 1]
+
+    series = df_periodo.groupby(['LINEA_PLUS', 'FECHA'], observed=True)['IMP_PRIMA'].sum()
+    series_by_line = {
+        linea: series.xs(linea, level='LINEA_PLUS').sort_index() for linea in lineas
+    }
+
+    steps_anio = {}
+    if "Año" in vistas:
+        steps_anio = {
+            linea: _steps_to_year_end(series_by_line[linea], ref_year, fecha_corte)
+            for linea in lineas
+        }
+    # Un lote por año de referencia, al horizonte máximo que piden las vistas
+    horizons = {}
+    if "Mes" in vistas:
+        horizons[fecha_corte.year] = 1
+    if "Acumulado Mes" in vistas:
+        horizons.setdefault(ref_year, 1)
+    if steps_anio:
+        horizons[ref_year] = max(horizons.get(ref_year, 1), max(steps_anio.values()))
+    batches = {}
+    for fc_ref_year, horizon in horizons.items():
+        batch = forecast_lines(series_by_line, fc_ref_year, horizon)
+        batches[fc_ref_year] = {
+            linea: (pd.to_datetime(list(fechas)), list(valores), bool(is_partial))
+            for linea, (fechas, valores, is_partial) in batch.items()
+        }
+
+    def forecast(linea: str, fc_ref_year: int, steps: int) -> tuple:
+        fechas, valores, is_partial = batches[fc_ref_year][linea]
+        return fechas[:steps], valores[:steps], is_partial
+
+    nowcasts = {}
+
+    def nowcast_cached(prod_parcial: float, pronostico_full: float) -> float:
+        key = (float(prod_parcial), float(pronostico_full))
+        if key not in nowcasts:
+            nowcasts[key] = nowcast(prod_parcial, pronostico_full)
+        return nowcasts[key]
+
+    cols_by_vista = {vista: summary_columns(vista, ref_year) for vista in vistas}
+
+    if "Mes" in vistas:
+        cols = cols_by_vista["Mes"]
+        previo = prod_previo[:, mes_corte - 1]
+        actual = prod_mes_corte
+        presup = presup_mes_corte
+        pronostico = np.zeros(n_lineas)
+        for i, linea in enumerate(lineas):
+            _, valores, is_partial = forecast(linea, fecha_corte.year, 1)
+            pronostico_full = valores[0] if valores else 0.0
+            # Nowcast: producción parcial + proporción restante del pronóstico
+            pronostico[i] = nowcast_cached(actual[i], pronostico_full) if is_partial else pronostico_full
+
+        periodo_actual = pd.Timestamp(year=fecha_corte.year, month=mes_corte, day=1)
+        ultimo_dia_mes = periodo_actual + pd.offsets.MonthEnd(0)
+        fecha_corte_dia = pd.Timestamp(fecha_corte).normalize()
+        dias_restantes = max((ultimo_dia_mes.normalize() - fecha_corte_dia).days + 1, 0)
+        if dias_restantes > 0:
+            req_dia_fc = (pronostico - actual) / dias_restantes
+            req_dia_pres = (presup - actual) / dias_restantes
+        else:
+            req_dia_fc = np.zeros(n_lineas)
+            req_dia_pres = np.zeros(n_lineas)
+
+        proyectado_vs_pronostico = presup - pronostico
+        df_mes = pd.DataFrame({
+            'LINEA_PLUS': lineas,
+            cols['previo']: previo,
+            cols['actual']: actual,
+            cols['proyectado']: presup,
+            cols['faltante']: presup - actual,
+            '% Ejec.': _safe_ratio(actual, presup) * 100,
+            cols['pronostico']: pronostico,
+            'Crec. Fc (%)': _growth_pct(pronostico, previo),
+            'Pronóstico ejecución': _safe_ratio(pronostico, presup) * 100,
+            cols['proyectado_vs_pronostico']: proyectado_vs_pronostico,
+            cols['compensacion']: _safe_ratio(proyectado_vs_pronostico, presup) * 100,
+            cols['req_dia_fc']: req_dia_fc,
+            cols['req_dia_pres']: req_dia_pres,
+        })
+        # La vista Mes solo aplica si el mes de corte está en el trimestre
+        for label in labels:
+            if en_quarter[label]:
+                results[("Mes", label)] = df_mes.copy()
+
+    if "Año" in vistas:
+        cols = cols_by_vista["Año"]
+        if df_presupuesto is None:
+            presup_anual = presup_actual
+        else:
+            presup_anual = _month_matrix(
+                aggregate_line_periods(df_presupuesto), ref_year, 'PRESUPUESTO', lineas
+            )
+        previo_q = prod_previo @ weights.T
+        # YTD: solo meses COMPLETADOS del año actual dentro del trimestre
+        ytd_q = (prod_actual * antes_corte) @ weights.T
+        presup_q = presup_anual @ weights.T
+
+        fc_anio = [forecast(linea, ref_year, steps_anio[linea]) for linea in lineas]
+
+        for j, label in enumerate(labels):
+            meses = set(int(m) for m in quarters[label])
+            parcial = prod_mes_corte if en_quarter[label] else np.zeros(n_lineas)
+            cierre = np.zeros(n_lineas)
+            for i in range(n_lineas):
+                fechas, valores, is_partial = fc_anio[i]
+                if valores and is_partial and en_quarter[label]:
+                    nowcast_mes = nowcast_cached(parcial[i], valores[0])
+                    restante = sum(v for d, v in zip(fechas[1:], valores[1:]) if d.month in meses)
+                elif valores:
+                    nowcast_mes = parcial[i]
+                    restante = sum(v for d, v in zip(fechas, valores) if d.month in meses)
+                else:
+                    nowcast_mes = parcial[i]
+                    restante = 0.0
+                cierre[i] = ytd_q[i, j] + nowcast_mes + restante
+
+            previo, ytd, presup = previo_q[:, j], ytd_q[:, j], presup_q[:, j]
+            proyectado_vs_pronostico = presup - cierre
+            results[("Año", label)] = pd.DataFrame({
+                'LINEA_PLUS': lineas,
+                cols['previo']: previo,
+                cols['actual']: ytd,
+                cols['proyectado']: presup,
+                cols['faltante']: presup - ytd,
+                '% Ejec.': _safe_ratio(ytd + parcial, presup) * 100,
+                cols['pronostico']: cierre,
+                'Crec. Fc (%)': _growth_pct(cierre, previo),
+                'Pronóstico ejecución': _safe_ratio(cierre, presup) * 100,
+                cols['proyectado_vs_pronostico']: proyectado_vs_pronostico,
+                cols['compensacion']: _safe_ratio(proyectado_vs_pronostico, presup) * 100,
+            })
+
+    if "Acumulado Mes" in vistas:
+        cols = cols_by_vista["Acumulado Mes"]
+        previo_q = (prod_previo * hasta_corte) @ weights.T
+        ytd_q = (prod_actual * hasta_corte) @ weights.T
+        presup_q = (presup_actual * hasta_corte) @ weights.T
+        cerrados_q = (prod_actual * antes_corte) @ weights.T
+
+        pronostico_full = np.zeros(n_lineas)
+        is_partial = np.zeros(n_lineas, dtype=bool)
+        for i, linea in enumerate(lineas):
+            _, valores, is_partial[i] = forecast(linea, ref_year, 1)
+            pronostico_full[i] = valores[0] if valores else 0.0
+
+        for j, label in enumerate(labels):
+            if en_quarter[label]:
+                pronostico_mes = np.array([
+                    nowcast_cached(prod_mes_corte[i], pronostico_full[i]) if is_partial[i]
+                    else pronostico_full[i]
+                    for i in range(n_lineas)
+                ], dtype=np.float64)
+            else:
+                pronostico_mes = np.zeros(n_lineas)
+
+            previo, ytd, presup = previo_q[:, j], ytd_q[:, j], presup_q[:, j]
+            ytd_con_forecast = cerrados_q[:, j] + pronostico_mes
+            proyectado_vs_pronostico = presup - ytd_con_forecast
+            results[("Acumulado Mes", label)] = pd.DataFrame({
+                'LINEA_PLUS': lineas,
+                cols['previo']: previo,
+                cols['actual']: ytd,
+                cols['proyectado']: presup,
+                cols['faltante']: presup - ytd,
+                '% Ejec.': _safe_ratio(ytd, presup) * 100,
+                cols['pronostico']: ytd_con_forecast,
+                'Crec. Fc (%)': _growth_pct(ytd_con_forecast, previo),
+                'Pronóstico ejecución': _safe_ratio(ytd_con_forecast, presup) * 100,
+                cols['proyectado_vs_pronostico']: proyectado_vs_pronostico,
+                cols['compensacion']: _safe_ratio(proyectado_vs_pronostico, presup) * 100,
+            })
+
+    return results
+
+
+def build_line_summary(
+    df_periodo: pd.DataFrame,
+    vista_mes: str,
+    ref_year: int,
+    fecha_corte: pd.Timestamp,
+    meses_quarter: Iterable[int],
+    forecast_lines: ForecastLinesFn,
+    nowcast: NowcastFn,
+    df_presupuesto: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Construye ``df_resumen`` de una sola vista y trimestre.
+
+    Ver ``build_line_summaries`` para la descripción de los argumentos.
+    """
+    results = build_line_summaries(
+        df_periodo,
+        ref_year,
+        fecha_corte,
+        {'sel': list(meses_quarter)},
+        forecast_lines=forecast_lines,
+        nowcast=nowcast,
+        df_presupuesto=df_presupuesto,
+        vistas=[vista_mes],
+    )
+    return results[(vista_mes, 'sel')]
@@ -3,6 +3,10 @@
 
 from __future__ import annotations
 
+import logging
+import time
+from contextlib import contextmanager
+
 import numpy as np
 
 try:
@@ -14,6 +18,33 @@ except ModuleNotFoundError:  # pragma: no cover - fallback para entornos sin num
         return decorator
 
 
+_perf_logger = logging.getLogger("aseguraview.performance")
+
+# Última duración (segundos) registrada por cada etiqueta de ``timed``.
+LAST_TIMINGS: dict[str, float] = {}
+
+
+def configure_performance_logging(level: str = "WARNING") -> None:
+    """Habilita la salida por consola de los tiempos registrados con ``timed``."""
+    _perf_logger.setLevel(level.upper())
+    if not _perf_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        _perf_logger.addHandler(handler)
+
+
+@contextmanager
+def timed(label: str):
+    """Mide la duración de un bloque y la registra en el log de performance."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        LAST_TIMINGS[label] = elapsed
+        _perf_logger.info("%s: %.3fs", label, elapsed)
+
+
 @jit(nopython=True, cache=True, parallel=True)
 def fast_proportional_distribution(deficit_array, budget_matrix):
     """Distribuye cada déficit de fila según el peso presupuestal mensual."""
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Llaves enteras de período (año/mes) para filtrar sin accesores ``.dt``.
+
+El DataFrame normalizado trae ``ANIO``, ``MES`` y ``PERIODO`` (``año*12+mes``)
+como enteros, de modo que los filtros por mes, año o acumulado son
+comparaciones enteras en lugar de recalcular ``FECHA.dt.year``/``.dt.month``
+en cada pasada.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+PERIOD_COLUMNS = ('ANIO', 'MES', 'PERIODO')
+
+
+def period_key(fecha) -> int:
+    """Llave entera ``año*12+mes`` de una fecha (Timestamp, date o texto)."""
+    fecha = pd.Timestamp(fecha)
+    return int(fecha.year) * 12 + int(fecha.month)
+
+
+def add_period_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega ``ANIO``, ``MES`` y ``PERIODO`` enteros derivados de ``FECHA``.
+
+    Modifica ``df`` en sitio; ``FECHA`` no debe tener nulos.
+    """
+    if 'FECHA' not in df.columns:
+        return df
+    df['ANIO'] = df['FECHA'].dt.year.astype('int64')
+    df['MES'] = df['FECHA'].dt.month.astype('int64')
+    df['PERIODO'] = df['ANIO'] * 12 + df['MES']
+    return df
+
+
+def ensure_period_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Devuelve ``df`` con las columnas de período, calculándolas si faltan."""
+    if 'FECHA' not in df.columns or all(col in df.columns for col in PERIOD_COLUMNS):
+        return df
+    df = df[df['FECHA'].notna()].copy()
+    return add_period_columns(df)
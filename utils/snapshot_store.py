@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Snapshots locales en Parquet de las hojas descargadas de Google Sheets.
+
+Cada snapshot guarda el último DataFrame válido junto con el hash SHA-256 del
+contenido que lo originó. Si la hoja no cambió, el hash coincide y se reutiliza
+el Parquet sin volver a parsear el CSV.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    _PARQUET_AVAILABLE = True
+except ModuleNotFoundError:  # pragma: no cover - fallback para entornos sin pyarrow
+    _PARQUET_AVAILABLE = False
+
+
+def content_hash(payload: bytes) -> str:
+    """Calcula el hash SHA-256 de una respuesta descargada."""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def snapshot_key(*parts: str) -> str:
+    """Construye un nombre de archivo seguro a partir de sus componentes."""
+    raw = "__".join(str(part) for part in parts)
+    return re.sub(r"[^0-9A-Za-z_.-]+", "_", raw)
+
+
+class SnapshotStore:
+    """Almacén de snapshots Parquet con metadatos de revalidación."""
+
+    def __init__(self, base_dir: str | os.PathLike, enabled: bool = True):
+        self.base_dir = Path(base_dir)
+        self.enabled = enabled and _PARQUET_AVAILABLE
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.base_dir / f"{key}.parquet", self.base_dir / f"{key}.meta.json"
+
+    def read_meta(self, key: str) -> dict:
+        """Retorna los metadatos del snapshot, o dict vacío si no existe."""
+        if not self.enabled:
+            return {}
+        _, meta_path = self._paths(key)
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def read(self, key: str, expected_hash: str | None = None) -> pd.DataFrame | None:
+        """Lee el snapshot si existe y, cuando se indica, si su hash coincide.
+
+        Args:
+            key: Identificador del snapshot
+            expected_hash: Hash del contenido actual; None acepta cualquier versión
+
+        Returns:
+            DataFrame del snapshot o None si no hay uno válido
+        """
+        if not self.enabled:
+            return None
+        meta = self.read_meta(key)
+        if not meta:
+            return None
+        if expected_hash is not None and meta.get("content_hash") != expected_hash:
+            return None
+
+        data_path, _ = self._paths(key)
+        try:
+            df = pd.read_parquet(data_path)
+        except Exception:
+            return None
+        df.attrs["content_hash"] = meta.get("content_hash")
+        return df
+
+    def write(self, key: str, payload_hash: str, df: pd.DataFrame) -> bool:
+        """Persiste el DataFrame de forma atómica junto con su hash.
+
+        Returns:
+            True si el snapshot quedó escrito, False si no fue posible
+        """
+        if not self.enabled:
+            return False
+        data_path, meta_path = self._paths(key)
+        tmp_data = data_path.with_suffix(".parquet.tmp")
+        tmp_meta = meta_path.with_suffix(".json.tmp")
+        try:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(tmp_data, index=False)
+            tmp_meta.write_text(
+                json.dumps({
+                    "content_hash": payload_hash,
+                    "rows": int(len(df)),
+                    "saved_at": time.time(),
+                }),
+                encoding="utf-8",
+            )
+            # El meta se retira antes y se restituye al final: un snapshot a
+            # medio escribir nunca queda asociado a un hash válido.
+            meta_path.unlink(missing_ok=True)
+            os.replace(tmp_data, data_path)
+            os.replace(tmp_meta, meta_path)
+            return True
+        except Exception:
+            for tmp in (tmp_data, tmp_meta):
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+            return False